@@ -7,7 +7,26 @@ class Settings:
     MONGODB_URL = os.getenv("MONGODB_URL")
     DB_NAME = os.getenv("DB_NAME")
     COLLECTION_NAME = os.getenv("COLLECTION_NAME")
+    # Concurrent MongoDB operations per process; further requests wait for
+    # a pooled connection rather than opening more
+    MONGODB_MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE", "100"))
     OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL")
     EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL")
 
+    # Shared Ollama client: connection pool, keep-alive and timeouts
+    OLLAMA_MAX_CONNECTIONS = int(os.getenv("OLLAMA_MAX_CONNECTIONS", "100"))
+    OLLAMA_MAX_KEEPALIVE = int(os.getenv("OLLAMA_MAX_KEEPALIVE", "20"))
+    OLLAMA_KEEPALIVE_EXPIRY = float(os.getenv("OLLAMA_KEEPALIVE_EXPIRY", "30"))
+    OLLAMA_CONNECT_TIMEOUT = float(os.getenv("OLLAMA_CONNECT_TIMEOUT", "5"))
+    OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", "30"))
+    # Transient failures (connection errors, 429/502/503/504) are retried
+    # with full-jitter exponential backoff
+    OLLAMA_RETRIES = int(os.getenv("OLLAMA_RETRIES", "3"))
+    OLLAMA_RETRY_BACKOFF = float(os.getenv("OLLAMA_RETRY_BACKOFF", "0.2"))
+
+    # POST /documents/bulk: texts per /api/embed call and calls in flight
+    BULK_MAX_DOCUMENTS = int(os.getenv("BULK_MAX_DOCUMENTS", "1000"))
+    BULK_EMBED_BATCH_SIZE = int(os.getenv("BULK_EMBED_BATCH_SIZE", "32"))
+    BULK_EMBED_CONCURRENCY = int(os.getenv("BULK_EMBED_CONCURRENCY", "4"))
+
 settings = Settings()
@@ -1,6 +1,9 @@
-from pymongo import MongoClient
+from pymongo import AsyncMongoClient
 from app.core.config import settings
 
-client = MongoClient(settings.MONGODB_URL)
+# Native asyncio driver: operations are awaited on the event loop instead
+# of blocking it. The client binds to the loop of its first operation, so
+# it is only used from the app's loop.
+client = AsyncMongoClient(settings.MONGODB_URL, maxPoolSize=settings.MONGODB_MAX_POOL_SIZE)
 db = client[settings.DB_NAME]
 collection = db[settings.COLLECTION_NAME]
@@ -1,6 +1,20 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from app.core.database import client as mongo_client
 from app.routes import documents
+from app.services.embeddings import start_client, close_client
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled Ollama client per process, reused by every request
+    start_client()
+    yield
+    await close_client()
+    await mongo_client.close()
+
 
-app = FastAPI(title="Vector Search API")
+app = FastAPI(title="Vector Search API", lifespan=lifespan)
 
 app.include_router(documents.router)
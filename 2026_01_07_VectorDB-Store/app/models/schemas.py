@@ -1,9 +1,13 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from app.core.config import settings
 
 class DocumentCreate(BaseModel):
     title: str
     content: str
 
+class BulkDocumentCreate(BaseModel):
+    documents: list[DocumentCreate] = Field(min_length=1, max_length=settings.BULK_MAX_DOCUMENTS)
+
 class SearchRequest(BaseModel):
     query: str
     top_k: int = 5
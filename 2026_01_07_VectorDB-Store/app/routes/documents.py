@@ -1,6 +1,12 @@
-from fastapi import APIRouter, HTTPException
-from app.models.schemas import DocumentCreate, SearchRequest
-from app.services.embeddings import generate_embedding
+import asyncio
+
+import httpx
+from bson import ObjectId
+from fastapi import APIRouter
+from pymongo.errors import BulkWriteError, PyMongoError
+from app.core.config import settings
+from app.models.schemas import BulkDocumentCreate, DocumentCreate, SearchRequest
+from app.services.embeddings import generate_embedding, generate_embeddings
 from app.core.database import collection
 
 router = APIRouter(prefix="/documents", tags=["Documents"])
@@ -15,10 +21,60 @@ async def create_document(doc: DocumentCreate):
         "embedding": embedding
     }
 
-    result = collection.insert_one(document)
+    result = await collection.insert_one(document)
     return {"id": str(result.inserted_id)}
 
 
+@router.post("/bulk")
+async def create_documents_bulk(payload: BulkDocumentCreate):
+    docs = payload.documents
+    results = [{"index": index} for index in range(len(docs))]
+    embed_slots = asyncio.Semaphore(settings.BULK_EMBED_CONCURRENCY)
+
+    async def ingest_batch(indexes):
+        async with embed_slots:
+            try:
+                embeddings = await generate_embeddings([docs[i].content for i in indexes])
+            except (httpx.HTTPError, KeyError, ValueError) as exc:
+                for i in indexes:
+                    results[i]["error"] = f"Embedding failed: {exc}"
+                return
+
+        # ids are assigned here so they are known even when some writes fail
+        documents = [
+            {
+                "_id": ObjectId(),
+                "title": docs[i].title,
+                "content": docs[i].content,
+                "embedding": embedding
+            }
+            for i, embedding in zip(indexes, embeddings)
+        ]
+        failed = {}
+        try:
+            # Unordered: one bad document does not stop the rest of the batch
+            await collection.insert_many(documents, ordered=False)
+        except BulkWriteError as exc:
+            failed = {e["index"]: e["errmsg"] for e in exc.details["writeErrors"]}
+        except PyMongoError as exc:
+            failed = {position: str(exc) for position in range(len(documents))}
+
+        for position, (i, document) in enumerate(zip(indexes, documents)):
+            if position in failed:
+                results[i]["error"] = f"Insert failed: {failed[position]}"
+            else:
+                results[i]["id"] = str(document["_id"])
+
+    size = settings.BULK_EMBED_BATCH_SIZE
+    await asyncio.gather(*(
+        ingest_batch(range(start, min(start + size, len(docs))))
+        for start in range(0, len(docs), size)
+    ))
+
+    inserted = sum(1 for result in results if "id" in result)
+    return {"inserted": inserted, "failed": len(results) - inserted, "results": results}
+
+
 @router.post("/search")
 async def search_documents(payload: SearchRequest):
     query_embedding = await generate_embedding(payload.query)
@@ -42,5 +98,6 @@ async def search_documents(payload: SearchRequest):
         }
     ]
 
-    results = list(collection.aggregate(pipeline))
+    cursor = await collection.aggregate(pipeline)
+    results = await cursor.to_list()
     return results
@@ -1,18 +1,70 @@
+import asyncio
+import random
+
 import httpx
 from app.core.config import settings
 
+RETRY_STATUSES = {429, 502, 503, 504}
+
+_client = None
+
+
+def start_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.OLLAMA_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.OLLAMA_MAX_KEEPALIVE,
+                keepalive_expiry=settings.OLLAMA_KEEPALIVE_EXPIRY
+            ),
+            timeout=httpx.Timeout(settings.OLLAMA_TIMEOUT, connect=settings.OLLAMA_CONNECT_TIMEOUT)
+        )
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_client() -> httpx.AsyncClient:
+    # Opened by the app lifespan; created on first use elsewhere (scripts, tests)
+    return _client or start_client()
+
+
+async def post_with_retry(path: str, payload: dict) -> httpx.Response:
+    client = get_client()
+    for attempt in range(settings.OLLAMA_RETRIES + 1):
+        last_attempt = attempt == settings.OLLAMA_RETRIES
+        try:
+            response = await client.post(f"{settings.OLLAMA_BASE_URL}{path}", json=payload)
+            if response.status_code not in RETRY_STATUSES or last_attempt:
+                response.raise_for_status()
+                return response
+        except httpx.TransportError:
+            if last_attempt:
+                raise
+        await asyncio.sleep(random.uniform(0, settings.OLLAMA_RETRY_BACKOFF * 2 ** attempt))
+
+
 async def generate_embedding(text: str) -> list[float]:
+    # Same endpoint as the batch path, so single and bulk ingest and search
+    # vectors are all normalized and truncated alike
+    return (await generate_embeddings([text]))[0]
+
+
+async def generate_embeddings(texts: list[str]) -> list[list[float]]:
+    # One /api/embed round trip for the whole batch
     payload = {
         "model": settings.EMBEDDING_MODEL,
-        "prompt": text
+        "input": texts
     }
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{settings.OLLAMA_BASE_URL}/api/embeddings",
-            json=payload,
-            timeout=30
-        )
-    print(response)
-    response.raise_for_status()
-    return response.json()["embedding"]
+    response = await post_with_retry("/api/embed", payload)
+    embeddings = response.json()["embeddings"]
+    if len(embeddings) != len(texts):
+        raise ValueError(f"Expected {len(texts)} embeddings, got {len(embeddings)}")
+    return embeddings
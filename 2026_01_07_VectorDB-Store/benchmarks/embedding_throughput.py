@@ -0,0 +1,119 @@
+"""Embeddings/sec at N concurrent requests: a new AsyncClient per call
+(the previous behaviour) against the shared pooled client.
+
+By default a local stand-in for Ollama's /api/embed answers after
+--delay seconds, so the numbers isolate connection handling; pass --url
+to measure a real Ollama instead.
+
+    python -m benchmarks.embedding_throughput --concurrency 50 --requests 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    delay = 0.0
+    body = json.dumps({"embeddings": [[0.1] * 768]}).encode()
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.delay:
+            time.sleep(self.delay)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+
+class StandInServer(ThreadingHTTPServer):
+    # A backlog large enough that bursts of new connections are not reset
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+def start_standin(delay: float):
+    StandInHandler.delay = delay
+    server = StandInServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+async def per_call_embedding(text: str):
+    from app.core.config import settings
+
+    async with httpx.AsyncClient() as client:
+        response = await client.post(
+            f"{settings.OLLAMA_BASE_URL}/api/embed",
+            json={"model": settings.EMBEDDING_MODEL, "input": [text]},
+            timeout=30
+        )
+    response.raise_for_status()
+    return response.json()["embeddings"][0]
+
+
+async def measure(embed, requests: int, concurrency: int):
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with slots:
+            await embed(f"document {i}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return requests / (time.perf_counter() - started)
+
+
+async def run(requests: int, concurrency: int):
+    from app.services import embeddings
+
+    report = {"per_call": await measure(per_call_embedding, requests, concurrency)}
+    embeddings.start_client()
+    try:
+        report["pooled"] = await measure(embeddings.generate_embedding, requests, concurrency)
+    finally:
+        await embeddings.close_client()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--delay", type=float, default=0.005, help="Stand-in latency per embedding")
+    parser.add_argument("--url", help="A real Ollama base URL instead of the stand-in")
+    args = parser.parse_args()
+
+    server = None
+    if args.url is None:
+        server, url = start_standin(args.delay)
+        os.environ["OLLAMA_BASE_URL"] = url
+    else:
+        os.environ["OLLAMA_BASE_URL"] = args.url
+    os.environ.setdefault("EMBEDDING_MODEL", "nomic-embed-text")
+
+    try:
+        report = asyncio.run(run(args.requests, args.concurrency))
+    finally:
+        if server:
+            server.shutdown()
+
+    print(f"{args.requests} embeddings at concurrency {args.concurrency}")
+    for name, rate in report.items():
+        print(f"{name:>9}: {rate:8.1f} embeddings/s")
+    print(f"  speedup: {report['pooled'] / report['per_call']:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
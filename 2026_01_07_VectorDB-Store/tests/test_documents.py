@@ -1,10 +1,15 @@
+import asyncio
 import sys
+import time
 from pathlib import Path
 from unittest.mock import MagicMock, AsyncMock
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 sys.path.append(str(ROOT_DIR))
 
+import anyio
+import httpx
+from pymongo.errors import BulkWriteError
 from fastapi.testclient import TestClient
 from app.main import app
 
@@ -23,7 +28,7 @@ def test_create_document(monkeypatch):
     )
 
     mock_collection = MagicMock()
-    mock_collection.insert_one.return_value.inserted_id = "fake_id"
+    mock_collection.insert_one = AsyncMock(return_value=MagicMock(inserted_id="fake_id"))
 
     monkeypatch.setattr(
         "app.routes.documents.collection",
@@ -50,10 +55,12 @@ def test_search_documents(monkeypatch):
         fake_generate_embedding
     )
 
-    mock_collection = MagicMock()
-    mock_collection.aggregate.return_value = [
+    mock_cursor = MagicMock()
+    mock_cursor.to_list = AsyncMock(return_value=[
         {"title": "Doc1", "content": "Text", "score": 0.99}
-    ]
+    ])
+    mock_collection = MagicMock()
+    mock_collection.aggregate = AsyncMock(return_value=mock_cursor)
 
     monkeypatch.setattr(
         "app.routes.documents.collection",
@@ -68,3 +75,93 @@ def test_search_documents(monkeypatch):
     assert response.status_code == 200
     assert len(response.json()) == 1
     assert response.json()[0]["title"] == "Doc1"
+
+
+def test_concurrent_searches_overlap(monkeypatch):
+    in_flight = 0
+    peak = 0
+
+    async def fake_generate_embedding(text):
+        return [0.5, 0.6]
+
+    class SlowCursor:
+        async def to_list(self):
+            return [{"title": "Doc1", "content": "Text", "score": 0.99}]
+
+    async def slow_aggregate(pipeline):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.2)
+        in_flight -= 1
+        return SlowCursor()
+
+    mock_collection = MagicMock()
+    mock_collection.aggregate = slow_aggregate
+    monkeypatch.setattr("app.routes.documents.generate_embedding", fake_generate_embedding)
+    monkeypatch.setattr("app.routes.documents.collection", mock_collection)
+
+    async def run_searches():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await asyncio.gather(*(
+                http.post("/documents/search", json={"query": f"q{i}", "top_k": 1})
+                for i in range(5)
+            ))
+
+    started = time.perf_counter()
+    responses = anyio.run(run_searches)
+    elapsed = time.perf_counter() - started
+
+    assert all(r.status_code == 200 for r in responses)
+    # Queued searches would take 5 x 0.2s; overlapping ones about 0.2s
+    assert peak == 5
+    assert elapsed < 0.6
+
+
+def test_bulk_create_documents(monkeypatch):
+    batches = []
+
+    async def fake_generate_embeddings(texts):
+        batches.append(list(texts))
+        if "broken" in texts:
+            raise httpx.HTTPStatusError("500", request=MagicMock(), response=MagicMock())
+        return [[0.1, 0.2] for _ in texts]
+
+    inserts = []
+
+    async def fake_insert_many(documents, ordered=True):
+        inserts.append((len(documents), ordered))
+        if any(d["title"] == "duplicate" for d in documents):
+            raise BulkWriteError({"writeErrors": [{"index": 0, "errmsg": "E11000 duplicate key"}]})
+
+    mock_collection = MagicMock()
+    mock_collection.insert_many = fake_insert_many
+    monkeypatch.setattr("app.routes.documents.generate_embeddings", fake_generate_embeddings)
+    monkeypatch.setattr("app.routes.documents.collection", mock_collection)
+    monkeypatch.setattr("app.routes.documents.settings.BULK_EMBED_BATCH_SIZE", 2)
+
+    documents = [
+        {"title": "a", "content": "one"},
+        {"title": "b", "content": "two"},
+        {"title": "c", "content": "broken"},
+        {"title": "d", "content": "four"},
+        {"title": "duplicate", "content": "five"}
+    ]
+    response = client.post("/documents/bulk", json={"documents": documents})
+
+    data = response.json()
+    assert response.status_code == 200
+    assert sorted(len(b) for b in batches) == [1, 2, 2]
+    assert all(ordered is False for _, ordered in inserts)
+    assert (data["inserted"], data["failed"]) == (2, 3)
+    assert [r["index"] for r in data["results"]] == [0, 1, 2, 3, 4]
+    assert "id" in data["results"][0] and "id" in data["results"][1]
+    assert data["results"][2]["error"].startswith("Embedding failed")
+    assert data["results"][4]["error"].startswith("Insert failed")
+
+
+def test_bulk_create_rejects_empty_batch():
+    response = client.post("/documents/bulk", json={"documents": []})
+
+    assert response.status_code == 422
@@ -6,20 +6,71 @@ ROOT_DIR = Path(__file__).resolve().parents[1]
 sys.path.append(str(ROOT_DIR))
 
 import anyio
+import httpx
 from app.services import embeddings
 
 
 def test_generate_embedding():
     async def run_test():
         mock_response = MagicMock()
-        mock_response.json.return_value = {"embedding": [1.0, 2.0, 3.0]}
+        mock_response.json.return_value = {"embeddings": [[1.0, 2.0, 3.0]]}
         mock_response.raise_for_status.return_value = None
 
         with patch(
             "httpx.AsyncClient.post",
             new=AsyncMock(return_value=mock_response)
-        ):
+        ) as post:
             result = await embeddings.generate_embedding("hello")
             assert result == [1.0, 2.0, 3.0]
+            # Same endpoint as bulk ingest, so all stored vectors match
+            assert post.await_args.args[0].endswith("/api/embed")
+            assert post.await_args.kwargs["json"]["input"] == ["hello"]
+
+    anyio.run(run_test)
+
+
+def test_generate_embedding_reuses_shared_client():
+    async def run_test():
+        mock_response = MagicMock(status_code=200)
+        mock_response.json.return_value = {"embeddings": [[1.0]]}
+
+        with patch("httpx.AsyncClient.post", new=AsyncMock(return_value=mock_response)) as post:
+            client = embeddings.start_client()
+            await embeddings.generate_embedding("a")
+            await embeddings.generate_embedding("b")
+            assert embeddings.get_client() is client
+            assert post.await_count == 2
+        await embeddings.close_client()
+
+    anyio.run(run_test)
+
+
+def test_generate_embedding_retries_transient_errors(monkeypatch):
+    async def run_test():
+        ok = MagicMock(status_code=200)
+        ok.json.return_value = {"embeddings": [[4.0]]}
+        busy = MagicMock(status_code=503)
+        monkeypatch.setattr(embeddings.settings, "OLLAMA_RETRY_BACKOFF", 0)
+
+        post = AsyncMock(side_effect=[httpx.ConnectError("refused"), busy, ok])
+        with patch("httpx.AsyncClient.post", new=post):
+            assert await embeddings.generate_embedding("hello") == [4.0]
+            assert post.await_count == 3
+        await embeddings.close_client()
+
+    anyio.run(run_test)
+
+
+def test_generate_embeddings_batches_texts():
+    async def run_test():
+        mock_response = MagicMock(status_code=200)
+        mock_response.json.return_value = {"embeddings": [[1.0], [2.0]]}
+
+        with patch("httpx.AsyncClient.post", new=AsyncMock(return_value=mock_response)) as post:
+            result = await embeddings.generate_embeddings(["a", "b"])
+            assert result == [[1.0], [2.0]]
+            assert post.await_args.kwargs["json"]["input"] == ["a", "b"]
+            assert post.await_args.args[0].endswith("/api/embed")
+        await embeddings.close_client()
 
     anyio.run(run_test)
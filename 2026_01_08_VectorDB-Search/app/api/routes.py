@@ -1,10 +1,27 @@
-from fastapi import APIRouter, UploadFile, File
-from pydantic import BaseModel
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query, Header
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Literal
+import json
 import shutil
 import os
-from app.services.ingestion_service import ingest_document
+import tempfile
+from app.core.config import settings
+from app.core.admission import admission_metrics
+from app.core.cache import answer_cache, cache_metrics
+from app.core.deadline import deadline_scope, request_deadline_seconds
+from app.core.generation import generation_scope
+from app.core.ollama_pool import get_pool
+from app.core.query_log import logged_query
+from app.core.tracing import with_timing
+from app.services.ingestion_service import ingest_document, delete_document
 from app.services.query_service import query_document
-from app.services.pdf_ingestion_service import ingest_pdf, check_upload_pdf
+from app.services.batch_query_service import query_batch
+from app.services import embedding_migration
+from app.services.pdf_ingestion_service import ingest_pdf
+from app.services.bulk_ingestion_service import TooManyFiles, ingest_pdf_files, stage_uploads
+from app.services.work_queue import queue_status
+from app.services.cache_warmup import record_query_stat
 
 router = APIRouter()
 
@@ -13,8 +30,18 @@ class DocumentRequest(BaseModel):
     text: str
 
 
+class MigrationRequest(BaseModel):
+    model: str
+    dim: int = Field(gt=0)
+
+
+class BatchQueryRequest(BaseModel):
+    questions: list[str] = Field(min_length=1, max_length=settings.BATCH_MAX_QUESTIONS)
+    top_k: int = Field(default=5, ge=1, le=settings.MAX_TOP_K)
+
+
 @router.post("/upload-pdf")
-def upload_pdf(file: UploadFile = File(...)):
+def upload_pdf(file: UploadFile = File(...), debug: str = None):
     if not file.filename.endswith(".pdf"):
         return {"error": "Only PDF files are supported"}
 
@@ -23,13 +50,156 @@ def upload_pdf(file: UploadFile = File(...)):
     with open(temp_path, "wb") as buffer:
         shutil.copyfileobj(file.file, buffer)
 
-    return ingest_pdf(temp_path)
+    result = ingest_pdf(temp_path)
+    answer_cache.clear()
+    return with_timing(result, debug)
+
+@router.post("/upload-pdfs")
+def upload_pdfs(files: list[UploadFile] = File(...), debug: str = None):
+    # Refuse oversized uploads before anything is written to disk; ZIPs
+    # are counted by stage_uploads as they are expanded
+    if len(files) > settings.BULK_MAX_FILES:
+        raise HTTPException(413, f"At most {settings.BULK_MAX_FILES} PDFs per upload")
+
+    directory = tempfile.mkdtemp(prefix="bulk_upload_")
+    try:
+        try:
+            staged, rejected = stage_uploads(files, directory)
+        except TooManyFiles as exc:
+            raise HTTPException(413, str(exc))
+        if not staged:
+            return {"error": "No PDF files found in upload", "files": rejected}
+
+        result = ingest_pdf_files(staged)
+        answer_cache.clear()
+        result["files"].extend(rejected)
+        return with_timing(result, debug)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
 
 @router.post("/documents")
-def upload_document(request: DocumentRequest):
-    return ingest_document(request.text)
+def upload_document(request: DocumentRequest, debug: str = None):
+    result = ingest_document(request.text)
+    # Cached answers predate the new chunks
+    answer_cache.clear()
+    return with_timing(result, debug)
+
+
+@router.delete("/documents/{doc_id}")
+def remove_document(doc_id: str):
+    deleted = delete_document(doc_id)
+    answer_cache.clear()
+    if deleted == 0:
+        raise HTTPException(404, "Document not found")
+    return {
+        "message": "Document deleted",
+        "doc_id": doc_id,
+        "chunks_deleted": deleted
+    }
 
 
 @router.get("/query")
-def ask_question(q: str):
-    return query_document(q)
+def ask_question(
+    q: str,
+    mode: Literal["retrieve", "answer", "answer+sources"] = "answer",
+    top_k: int = Query(default=5, ge=1, le=settings.MAX_TOP_K),
+    debug: str = None,
+    deadline_ms: int = Query(default=None, ge=1),
+    x_request_deadline_ms: int = Header(default=None, ge=1),
+    neighbors: int = Query(default=None, ge=0, le=settings.MAX_NEIGHBOR_CHUNKS),
+    num_predict: int = Query(default=None, ge=1, le=settings.LLM_MAX_NUM_PREDICT),
+    num_ctx: int = Query(default=None, ge=256),
+    temperature: float = Query(default=None, ge=0, le=2),
+    stop: list[str] = Query(default=None),
+    budget: bool = None
+):
+    seconds = request_deadline_seconds(deadline_ms or x_request_deadline_ms)
+    options = {
+        "num_predict": num_predict,
+        "num_ctx": num_ctx,
+        "temperature": temperature,
+        "stop": stop,
+        "budget": budget
+    }
+    params = {
+        "q": q,
+        "mode": mode,
+        "top_k": top_k,
+        "neighbors": neighbors,
+        "deadline_ms": deadline_ms or x_request_deadline_ms,
+        **options
+    }
+    with logged_query(params) as entry, deadline_scope(seconds), generation_scope(options):
+        entry["response"] = query_document(q, top_k, mode, neighbors)
+    if settings.QUERY_STATS:
+        record_query_stat(params)
+    return with_timing(entry["response"], debug)
+
+
+@router.post("/query/batch")
+def ask_questions(request: BatchQueryRequest):
+    results = query_batch(request.questions, request.top_k)
+    lines = (json.dumps(result) + "\n" for result in results)
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+
+@router.post("/migrations/embedding")
+def start_embedding_migration(request: MigrationRequest):
+    try:
+        embedding_migration.start_migration(request.model, request.dim)
+    except embedding_migration.MigrationError as exc:
+        raise HTTPException(409, str(exc))
+    embedding_migration.start_worker()
+    return embedding_migration.migration_progress()
+
+
+@router.get("/migrations/embedding")
+def embedding_migration_progress():
+    return embedding_migration.migration_progress()
+
+
+@router.post("/migrations/embedding/resume")
+def resume_embedding_migration():
+    embedding_migration.reopen_migration()
+    embedding_migration.start_worker()
+    return embedding_migration.migration_progress()
+
+
+@router.post("/migrations/embedding/pause")
+def pause_embedding_migration():
+    embedding_migration.stop_worker()
+    return embedding_migration.migration_progress()
+
+
+@router.post("/migrations/embedding/cutover")
+def cutover_embedding_migration():
+    try:
+        active = embedding_migration.cutover_migration()
+    except embedding_migration.MigrationError as exc:
+        raise HTTPException(409, str(exc))
+    return {"message": "Embedding model switched", "active": active}
+
+
+@router.get("/metrics/admission")
+def get_admission_metrics():
+    return admission_metrics()
+
+
+@router.get("/metrics/cache")
+def get_cache_metrics():
+    return cache_metrics()
+
+
+@router.get("/health/ollama")
+def ollama_nodes():
+    pool = get_pool()
+    if pool is None:
+        return {"pool": False, "nodes": []}
+    return {"pool": True, "hedge_delay_ms": pool.hedge_delay() * 1000, "nodes": pool.status()}
+
+
+@router.get("/jobs")
+def ingest_jobs(doc_id: str = None):
+    # Progress of queued ingestion (INGEST_QUEUE), optionally for one document
+    return {"queue": settings.INGEST_QUEUE, "jobs": queue_status(doc_id)}
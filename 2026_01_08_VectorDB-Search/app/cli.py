@@ -0,0 +1,265 @@
+"""Offline tools that talk to MongoDB and Ollama directly, without HTTP.
+
+    python -m app.cli ingest <dir> [--checkpoint FILE] [--processes N]
+    python -m app.cli export <dir> [--format parquet|jsonl]
+    python -m app.cli import <dir> [--drop]
+    python -m app.cli normalize [--batch-size N]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+
+from app.core.config import settings
+from app.core.embedding_profile import active_profile
+from app.db.partitions import group_by_partition
+from app.services.bulk_ingestion_service import run_pipeline, TEXT_EXTENSIONS
+from app.services.embedding_migration import load_profiles, normalize_chunks
+from app.services.snapshot_service import export_snapshot, import_snapshot
+
+INGEST_EXTENSIONS = (".pdf",) + TEXT_EXTENSIONS
+CHECKPOINT_NAME = ".ingest-checkpoint.jsonl"
+
+
+def discover_files(directory: str):
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        paths.extend(
+            os.path.abspath(os.path.join(root, name))
+            for name in sorted(files)
+            if name.lower().endswith(INGEST_EXTENSIONS)
+        )
+    return paths
+
+
+def stable_doc_id(path: str) -> str:
+    # Re-running an ingest reuses the same doc_id for the same file, so a
+    # resumed run can clean up what a crashed one left half written
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, "file://" + os.path.abspath(path)))
+
+
+def load_checkpoint(path: str):
+    """Return {file path: entry} for every file a previous run completed."""
+    done = {}
+    if not os.path.exists(path):
+        return done
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # A crash can leave the last line truncated
+                continue
+            done[entry["path"]] = entry
+    return done
+
+
+class Progress:
+    """Periodic throughput and ETA lines for long-running ingests."""
+
+    def __init__(self, total: int, out=sys.stderr, interval: float = 2.0):
+        self.total = total
+        self.out = out
+        self.interval = interval
+        self.files = 0
+        self.failed = 0
+        self.chunks = 0
+        self.started = time.perf_counter()
+        self.last_report = self.started
+
+    def update(self, report):
+        self.files += 1
+        if "error" in report:
+            self.failed += 1
+        else:
+            self.chunks += report.get("chunks", 0)
+
+        now = time.perf_counter()
+        if now - self.last_report >= self.interval:
+            self.last_report = now
+            self.report()
+
+    def line(self) -> str:
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        files_per_second = self.files / elapsed
+        left = self.total - self.files
+        eta = left / files_per_second if files_per_second else float("inf")
+
+        return (
+            f"{self.files}/{self.total} files ({self.failed} failed), "
+            f"{self.chunks} chunks, {self.chunks / elapsed:.1f} chunks/s, "
+            f"{files_per_second:.2f} files/s, ETA {format_eta(eta)}"
+        )
+
+    def report(self):
+        print(self.line(), file=self.out, flush=True)
+
+
+def format_eta(seconds: float) -> str:
+    if seconds == float("inf"):
+        return "--:--:--"
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def ingest_directory(directory: str, checkpoint: str = None, out=sys.stderr):
+    """Ingest every PDF and text file under directory, resuming from the
+    checkpoint file. Returns a summary of the run."""
+    checkpoint = checkpoint or os.path.join(directory, CHECKPOINT_NAME)
+
+    paths = discover_files(directory)
+    done = load_checkpoint(checkpoint)
+    todo = [path for path in paths if path not in done]
+    doc_ids = [stable_doc_id(path) for path in todo]
+
+    print(
+        f"{len(paths)} files found, {len(paths) - len(todo)} already ingested, "
+        f"{len(todo)} to go",
+        file=out, flush=True
+    )
+
+    # Drop chunks a crashed run stored for files it never finished
+    for collection, ids in group_by_partition(doc_ids):
+        for start in range(0, len(ids), 1000):
+            collection.delete_many({"doc_id": {"$in": ids[start:start + 1000]}})
+
+    progress = Progress(len(todo), out)
+    errors = []
+
+    with open(checkpoint, "a", encoding="utf-8") as log:
+        def on_file_done(index, report):
+            if "error" in report:
+                errors.append({"path": todo[index], "error": report["error"]})
+            else:
+                # Only completed files are recorded; failed ones are retried
+                # on the next run
+                log.write(json.dumps({
+                    "path": todo[index],
+                    "doc_id": report["doc_id"],
+                    "chunks": report["chunks"]
+                }) + "\n")
+                log.flush()
+            progress.update(report)
+
+        run_pipeline(todo, doc_ids, on_file_done)
+
+    progress.report()
+    for error in errors:
+        print(f"failed: {error['path']}: {error['error']}", file=out)
+
+    return {
+        "files": len(paths),
+        "skipped": len(paths) - len(todo),
+        "ingested": progress.files - progress.failed,
+        "failed": progress.failed,
+        "chunks": progress.chunks,
+        "errors": errors
+    }
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="Ingest a directory of PDF and text files")
+    ingest.add_argument("directory")
+    ingest.add_argument("--checkpoint", help=f"Checkpoint file (default: <directory>/{CHECKPOINT_NAME})")
+    ingest.add_argument("--processes", type=int, help="Extraction processes (INGEST_PROCESSES)")
+    ingest.add_argument("--batch-size", type=int, help="Chunks per embedding call (BULK_EMBED_BATCH_SIZE)")
+    ingest.add_argument("--concurrency", type=int, help="Embedding calls in flight (BULK_EMBED_CONCURRENCY)")
+
+    export = commands.add_parser("export", help="Dump chunks to a columnar snapshot")
+    export.add_argument("directory")
+    export.add_argument("--format", choices=("parquet", "jsonl"), help="Metadata format (default: parquet when pyarrow is installed)")
+    export.add_argument("--batch-size", type=int, help="Rows per batch (SNAPSHOT_BATCH_SIZE)")
+
+    restore = commands.add_parser("import", help="Bulk-load a snapshot written by export")
+    restore.add_argument("directory")
+    restore.add_argument("--drop", action="store_true", help="Delete every existing chunk first")
+    restore.add_argument("--batch-size", type=int, help="Rows per insert_many (SNAPSHOT_BATCH_SIZE)")
+
+    normalize = commands.add_parser("normalize", help="Store existing vectors as unit vectors plus their norm")
+    normalize.add_argument("--batch-size", type=int, help="Chunks per bulk write (MIGRATION_BATCH_SIZE)")
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.command == "ingest":
+        if not os.path.isdir(args.directory):
+            print(f"Not a directory: {args.directory}", file=sys.stderr)
+            return 2
+
+        for option, name in (
+            ("processes", "INGEST_PROCESSES"),
+            ("batch_size", "BULK_EMBED_BATCH_SIZE"),
+            ("concurrency", "BULK_EMBED_CONCURRENCY")
+        ):
+            value = getattr(args, option)
+            if value is not None:
+                setattr(settings, name, value)
+
+        # Chunks are dual-written while a re-embedding migration runs
+        load_profiles()
+        summary = ingest_directory(args.directory, args.checkpoint)
+        return 1 if summary["failed"] else 0
+
+    if args.command == "export":
+        load_profiles()
+        summary = export_snapshot(args.directory, args.format, args.batch_size)
+        print(
+            f"Exported {summary['count']} chunks ({', '.join(v['field'] for v in summary['vectors'])}) "
+            f"in {summary['elapsed_ms'] / 1000:.1f}s",
+            file=sys.stderr
+        )
+        return 0
+
+    if args.command == "import":
+        if not os.path.isdir(args.directory):
+            print(f"Not a directory: {args.directory}", file=sys.stderr)
+            return 2
+
+        load_profiles()
+        summary = import_snapshot(args.directory, args.drop, args.batch_size)
+        print(
+            f"Imported {summary['inserted']} chunks in {summary['elapsed_ms'] / 1000:.1f}s "
+            f"({summary['chunks_per_second']:.0f} chunks/s)",
+            file=sys.stderr
+        )
+        if active_profile()["field"] not in summary["vectors"]:
+            print(
+                f"warning: the snapshot has no {active_profile()['field']} vectors, "
+                "which the active embedding profile searches",
+                file=sys.stderr
+            )
+        return 0
+
+    if args.command == "normalize":
+        load_profiles()
+        updated = normalize_chunks(
+            args.batch_size,
+            on_batch=lambda field, count: print(f"{field}: {count} chunks normalized", file=sys.stderr)
+        )
+        print(
+            ", ".join(f"{field}: {count} updated" for field, count in updated.items()),
+            file=sys.stderr
+        )
+        if settings.VECTOR_SIMILARITY != "dotProduct":
+            print(
+                "Every stored vector is now unit length; set VECTOR_SIMILARITY=dotProduct "
+                "to search with it (the vector index is updated on the next start)",
+                file=sys.stderr
+            )
+        return 0
+
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
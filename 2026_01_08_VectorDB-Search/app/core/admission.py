@@ -0,0 +1,168 @@
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from app.core.config import settings
+from app.core.deadline import remaining_seconds
+
+# Set for bulk ingest, queue workers and migrations, which must neither be
+# turned away by nor crowd out the interactive limits
+_background = ContextVar("background_work", default=False)
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot be admitted in time; maps to 429/503."""
+
+    def __init__(self, limiter: str, reason: str, status_code: int, retry_after: int):
+        super().__init__(f"{limiter} capacity exhausted: {reason}")
+        self.limiter = limiter
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class AdmissionLimiter:
+    """Bounded concurrency with a bounded wait queue in front of Ollama.
+
+    At most max_concurrency calls run at once. Up to max_queue callers may
+    wait for a slot, each for at most max_wait seconds; anyone beyond that
+    fails fast instead of piling up inside Ollama's own queue. With
+    max_queue and max_wait None callers simply block until a slot frees
+    up (or their deadline passes), which suits background work.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, max_wait: float):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=1024)
+        self._service_time = 0.0
+
+        self.waiting = 0
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    def _retry_after(self):
+        # Rough time for the current backlog to drain
+        backlog = (self.waiting + self.in_flight) / self.max_concurrency
+        return max(1, math.ceil(backlog * self._service_time))
+
+    def _reject(self, reason: str, status_code: int):
+        self.rejected += 1
+        return Overloaded(self.name, reason, status_code, self._retry_after())
+
+    def _wait_for_slot(self):
+        with self._lock:
+            if self.max_queue is not None and self.waiting >= self.max_queue:
+                raise self._reject("queue full", 429)
+            self.waiting += 1
+
+        # Never queue past the request's own deadline
+        if self.max_wait is None:
+            timeout = remaining_seconds()
+        else:
+            timeout = min(self.max_wait, remaining_seconds(self.max_wait))
+        started = time.monotonic()
+        acquired = self._slots.acquire(timeout=timeout)
+        waited = time.monotonic() - started
+
+        with self._lock:
+            self.waiting -= 1
+            self._waits.append(waited)
+            if not acquired:
+                raise self._reject("queue wait exceeded", 503)
+
+    @contextmanager
+    def slot(self):
+        if self._slots.acquire(blocking=False):
+            with self._lock:
+                self._waits.append(0.0)
+        else:
+            self._wait_for_slot()
+
+        with self._lock:
+            self.admitted += 1
+            self.in_flight += 1
+
+        began = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - began
+            with self._lock:
+                self.in_flight -= 1
+                # Exponentially weighted service time for Retry-After hints
+                self._service_time = 0.8 * self._service_time + 0.2 * elapsed
+            self._slots.release()
+
+    def metrics(self):
+        with self._lock:
+            waits = sorted(self._waits)
+            return {
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "in_flight": self.in_flight,
+                "queue_depth": self.waiting,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "wait_ms": {
+                    "p50": _percentile(waits, 0.50) * 1000,
+                    "p95": _percentile(waits, 0.95) * 1000,
+                    "max": (waits[-1] if waits else 0.0) * 1000
+                },
+                "service_ms": self._service_time * 1000
+            }
+
+
+def _percentile(values, fraction: float):
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+embed_limiter = AdmissionLimiter(
+    "embed",
+    settings.EMBED_MAX_CONCURRENCY,
+    settings.EMBED_MAX_QUEUE,
+    settings.EMBED_MAX_WAIT_SECONDS
+)
+background_embed_limiter = AdmissionLimiter(
+    "background_embed",
+    settings.BACKGROUND_EMBED_MAX_CONCURRENCY,
+    max_queue=None,
+    max_wait=None
+)
+generate_limiter = AdmissionLimiter(
+    "generate",
+    settings.GENERATE_MAX_CONCURRENCY,
+    settings.GENERATE_MAX_QUEUE,
+    settings.GENERATE_MAX_WAIT_SECONDS
+)
+
+
+@contextmanager
+def background_scope():
+    token = _background.set(True)
+    try:
+        yield
+    finally:
+        _background.reset(token)
+
+
+def embedding_limiter():
+    return background_embed_limiter if _background.get() else embed_limiter
+
+
+def admission_metrics():
+    return {
+        "embed": embed_limiter.metrics(),
+        "background_embed": background_embed_limiter.metrics(),
+        "generate": generate_limiter.metrics()
+    }
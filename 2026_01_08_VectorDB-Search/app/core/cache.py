@@ -0,0 +1,88 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from app.core.config import settings
+
+
+class LRUCache:
+    """Thread-safe LRU cache with an optional per-entry TTL.
+
+    A max_size of 0 disables the cache: every get misses and put is a no-op.
+    """
+
+    def __init__(self, name: str, max_size: int, ttl: float = None):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl and entry[1] < time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        if not self.enabled:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and not (self.ttl and entry[1] < time.monotonic())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+# Query vectors are deterministic per (model, dim, question)
+embedding_cache = LRUCache("query_embeddings", settings.EMBED_CACHE_SIZE)
+# Whole /query responses, keyed by question, parameters and generation
+# options; see ANSWER_CACHE_SIZE for why entries expire
+answer_cache = LRUCache("answers", settings.ANSWER_CACHE_SIZE, settings.ANSWER_CACHE_TTL)
+
+
+def cached_copy(value):
+    # Responses are nested dicts callers may extend; never hand out the stored one
+    return copy.deepcopy(value)
+
+
+def clear_caches():
+    embedding_cache.clear()
+    answer_cache.clear()
+
+
+def cache_metrics():
+    return {cache.name: cache.stats() for cache in (embedding_cache, answer_cache)}
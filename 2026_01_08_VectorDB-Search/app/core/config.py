@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 
@@ -5,12 +7,136 @@ class Settings(BaseSettings):
     MONGO_URI: str
     DB_NAME: str = "vector_search"
     CHUNKS_COLLECTION: str = "document_chunks"
+    MIGRATIONS_COLLECTION: str = "embedding_migrations"
+    JOBS_COLLECTION: str = "ingest_jobs"
+    QUERY_STATS_COLLECTION: str = "query_stats"
+
+    # Chunks are spread over CHUNK_PARTITIONS collections by a hash of
+    # doc_id, optionally across clusters (comma-separated URIs), and
+    # queries fan out to every partition
+    CHUNK_PARTITIONS: int = 1
+    CHUNK_PARTITION_URIS: str = ""
+    PARTITION_TIMEOUT_MS: int = 2000
+    PARTITION_SEARCH_THREADS: int = 16
 
     VECTOR_INDEX_NAME: str = "vector_index"
+    # mxbai-embed-large is Matryoshka-trained: 256 or 512 keep most of the
+    # recall at a fraction of the index size. Changing it needs a re-embed.
+    EMBEDDING_DIM: int = 1024
+    # Use dotProduct once every stored vector is unit length
+    # (NORMALIZE_EMBEDDINGS plus `python -m app.cli normalize`)
+    VECTOR_SIMILARITY: Literal["cosine", "dotProduct", "euclidean"] = "cosine"
+    NORMALIZE_EMBEDDINGS: bool = True
+    # > 0: fetch top_k * RESCORE_FACTOR candidates with their vectors and
+    # re-rank them exactly, e.g. on top of a quantized vector index
+    RESCORE_FACTOR: int = 0
+
+    # "none", "zlib" or "zstd" (needs the zstandard package)
+    CHUNK_TEXT_COMPRESSION: str = "none"
 
     EMBEDDING_MODEL: str = "mxbai-embed-large:latest"
     LLM_MODEL: str = "llama3.2:latest"
 
+    # Generation options sent with every answer; None keeps the model's
+    # default. Stop sequences are comma-separated.
+    LLM_NUM_PREDICT: int | None = 512
+    LLM_NUM_CTX: int | None = None
+    LLM_TEMPERATURE: float | None = None
+    LLM_STOP: str = ""
+    LLM_MAX_NUM_PREDICT: int = 2048
+    # Latency budget: cap num_predict to the tokens the model can produce
+    # in the time left before the request deadline, at the observed rate
+    LLM_BUDGET_MODE: bool = False
+    LLM_TOKENS_PER_SECOND: float = 20.0
+    LLM_PREFILL_MS: int = 500
+    LLM_MIN_PREDICT: int = 16
+
+    INGEST_PROCESSES: int = 4
+    BULK_EMBED_BATCH_SIZE: int = 32
+    BULK_EMBED_CONCURRENCY: int = 4
+    BULK_MAX_FILES: int = 500
+    BULK_MAX_ZIP_BYTES: int = 1024 * 1024 * 1024
+
+    # When enabled the API only splits and enqueues; `python -m app.worker`
+    # processes embed and store the chunks
+    INGEST_QUEUE: bool = False
+    JOB_VISIBILITY_TIMEOUT: float = 300.0
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BACKOFF: float = 5.0
+    JOB_POLL_INTERVAL: float = 1.0
+
+    SNAPSHOT_BATCH_SIZE: int = 5000
+    SNAPSHOT_INSERT_CONCURRENCY: int = 4
+
+    # Per-request deadline for /query; clients can override it with the
+    # deadline_ms parameter or the X-Request-Deadline-Ms header
+    QUERY_DEADLINE_MS: int = 30000
+    QUERY_DEADLINE_MAX_MS: int = 120000
+    # Below this much time left the LLM answer is skipped, and below the
+    # search threshold $vectorSearch considers fewer candidates
+    DEADLINE_MIN_GENERATE_MS: int = 2000
+    DEADLINE_REDUCED_SEARCH_MS: int = 1000
+    DEADLINE_THREADS: int = 32
+    VECTOR_NUM_CANDIDATES: int = 100
+    MAX_TOP_K: int = 100
+
+    # Adjacent chunks (±N by chunk_index) added around each hit for answers
+    NEIGHBOR_CHUNKS: int = 0
+    MAX_NEIGHBOR_CHUNKS: int = 5
+
+    # Opt-in sample of /query requests with timings, answers and chunk ids,
+    # appended as JSON lines for benchmarks/replay.py. Questions are logged
+    # verbatim, so point this at storage fit for user data.
+    QUERY_LOG_PATH: str = ""
+    QUERY_LOG_SAMPLE_RATE: float = 0.01
+    # Per-question counts in QUERY_STATS_COLLECTION (unacknowledged writes)
+    QUERY_STATS: bool = False
+
+    # In-process caches. Only the local answer cache is cleared when this
+    # process ingests or deletes, so answers from other workers can be up
+    # to ANSWER_CACHE_TTL seconds stale: the answer cache is opt-in.
+    EMBED_CACHE_SIZE: int = 1024
+    ANSWER_CACHE_SIZE: int = 0
+    ANSWER_CACHE_TTL: float = 300.0
+    # Pre-warm the caches at startup from the most frequent recent
+    # questions: "log" reads QUERY_LOG_PATH, "stats" QUERY_STATS_COLLECTION
+    CACHE_WARMUP_SOURCE: Literal["none", "log", "stats"] = "none"
+    CACHE_WARMUP_QUERIES: int = 100
+    CACHE_WARMUP_BUDGET_SECONDS: float = 30.0
+    CACHE_WARMUP_LOOKBACK_HOURS: float = 24.0
+
+    BATCH_MAX_QUESTIONS: int = 256
+    BATCH_SEARCH_CONCURRENCY: int = 8
+    BATCH_GENERATE_CONCURRENCY: int = 2
+
+    MIGRATION_BATCH_SIZE: int = 64
+    MIGRATION_PAUSE_SECONDS: float = 0.5
+    PROFILE_REFRESH_INTERVAL: int = 30
+
+    # Admission control in front of Ollama, see app/core/admission.py
+    EMBED_MAX_CONCURRENCY: int = 4
+    EMBED_MAX_QUEUE: int = 64
+    EMBED_MAX_WAIT_SECONDS: float = 2.0
+    # Bulk ingest, queue workers and migrations: their own slots, waited
+    # for without a queue bound or time limit
+    BACKGROUND_EMBED_MAX_CONCURRENCY: int = 2
+    GENERATE_MAX_CONCURRENCY: int = 2
+    GENERATE_MAX_QUEUE: int = 16
+    GENERATE_MAX_WAIT_SECONDS: float = 10.0
+
+    # Comma-separated Ollama base URLs; empty uses the default local host
+    OLLAMA_HOSTS: str = ""
+    OLLAMA_TIMEOUT: float = 120.0
+    OLLAMA_FAILURE_THRESHOLD: int = 3
+    OLLAMA_EJECT_SECONDS: float = 30.0
+    OLLAMA_HEALTH_INTERVAL: int = 10
+    OLLAMA_HEDGE_EMBEDDINGS: bool = False
+    OLLAMA_HEDGE_MIN_DELAY_MS: int = 50
+
+    OLLAMA_KEEP_ALIVE: str = "30m"
+    OLLAMA_WARMUP: bool = True
+    OLLAMA_KEEP_WARM_INTERVAL: int = 300
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,106 @@
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from app.core.config import settings
+
+_current_deadline = ContextVar("request_deadline", default=None)
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a stage cannot finish before the request deadline; maps to 504."""
+
+    def __init__(self, stage: str):
+        super().__init__(f"Request deadline exceeded during {stage}")
+        self.stage = stage
+
+
+class Deadline:
+    """Time budget of one request, plus the degradations taken to meet it."""
+
+    def __init__(self, seconds: float):
+        self.budget = seconds
+        self.expires_at = time.monotonic() + seconds
+        self.degraded = []
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def remaining_ms(self) -> int:
+        return int(self.remaining() * 1000)
+
+    def degrade(self, reason: str):
+        if reason not in self.degraded:
+            self.degraded.append(reason)
+
+
+def request_deadline_seconds(requested_ms: int = None) -> float:
+    # Clients may ask for less time than the default, or more up to the cap
+    ms = requested_ms or settings.QUERY_DEADLINE_MS
+    return min(ms, settings.QUERY_DEADLINE_MAX_MS) / 1000
+
+
+@contextmanager
+def deadline_scope(seconds: float):
+    deadline = Deadline(seconds)
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def current_deadline():
+    return _current_deadline.get()
+
+
+def remaining_seconds(default=None):
+    deadline = _current_deadline.get()
+    return default if deadline is None else deadline.remaining()
+
+
+def _deadline_executor():
+    global _executor, _executor_pid
+
+    pid = os.getpid()
+    if _executor is None or _executor_pid != pid:
+        with _executor_lock:
+            if _executor is None or _executor_pid != pid:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.DEADLINE_THREADS,
+                    thread_name_prefix="deadline"
+                )
+                _executor_pid = pid
+    return _executor
+
+
+def run_within_deadline(stage: str, fn, *args, **kwargs):
+    """Call fn, giving up with DeadlineExceeded once the request deadline
+    passes. Without a deadline (CLI, workers) fn is simply called.
+
+    A blocking Ollama call cannot be interrupted, so it is run on a helper
+    thread that is abandoned on timeout; its result is discarded.
+    """
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return fn(*args, **kwargs)
+
+    remaining = deadline.remaining()
+    if remaining <= 0:
+        raise DeadlineExceeded(stage)
+
+    # The copied context keeps tracing spans and the deadline visible
+    context = contextvars.copy_context()
+    future = _deadline_executor().submit(context.run, fn, *args, **kwargs)
+    try:
+        return future.result(timeout=remaining)
+    except FutureTimeout:
+        raise DeadlineExceeded(stage)
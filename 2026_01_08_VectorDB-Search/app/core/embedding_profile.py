@@ -0,0 +1,61 @@
+import re
+
+from app.core.config import settings
+from app.utils.vectors import normalize_with_norm
+
+# An embedding profile describes which model produced a stored vector and
+# where that vector lives: {"model", "dim", "field", "index"}. Queries use
+# the active profile; while a migration is running, ingestion also writes
+# vectors for the migration target so nothing is missed before cut-over.
+
+_active = None
+_target = None
+
+
+def default_profile():
+    return {
+        "model": settings.EMBEDDING_MODEL,
+        "dim": settings.EMBEDDING_DIM,
+        "field": "embedding",
+        "index": settings.VECTOR_INDEX_NAME
+    }
+
+
+def make_profile(model: str, dim: int):
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", f"{model}_{dim}").strip("_").lower()
+    return {
+        "model": model,
+        "dim": dim,
+        "field": f"embedding_{slug}",
+        "index": f"{settings.VECTOR_INDEX_NAME}_{slug}"
+    }
+
+
+def active_profile():
+    return _active or default_profile()
+
+
+def migration_target():
+    return _target
+
+
+def set_profiles(active=None, target=None):
+    global _active, _target
+    _active = active
+    _target = target
+
+
+def vector_fields(profile, embedding):
+    field = profile["field"]
+    fields = {
+        field: embedding,
+        f"{field}_model": profile["model"],
+        f"{field}_dim": profile["dim"]
+    }
+
+    if settings.NORMALIZE_EMBEDDINGS:
+        # Unit vectors make dotProduct equal cosine, and local scoring a
+        # plain dot product; the original magnitude is kept alongside
+        fields[field], fields[f"{field}_norm"] = normalize_with_norm(embedding)
+
+    return fields
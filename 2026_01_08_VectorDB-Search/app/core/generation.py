@@ -0,0 +1,96 @@
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from app.core.config import settings
+from app.core.deadline import current_deadline
+
+# Per-request overrides: num_predict, num_ctx, temperature, stop, budget
+_request_options = ContextVar("generation_options", default=None)
+
+_rate_lock = threading.Lock()
+_observed = {"tokens_per_second": None, "prefill_ms": None}
+# Weight of the newest generation in the moving averages
+RATE_SMOOTHING = 0.2
+
+
+@contextmanager
+def generation_scope(overrides=None):
+    token = _request_options.set(
+        {key: value for key, value in (overrides or {}).items() if value is not None}
+    )
+    try:
+        yield
+    finally:
+        _request_options.reset(token)
+
+
+def default_options():
+    options = {
+        "num_predict": settings.LLM_NUM_PREDICT,
+        "num_ctx": settings.LLM_NUM_CTX,
+        "temperature": settings.LLM_TEMPERATURE,
+        "stop": [s for s in settings.LLM_STOP.split(",") if s] or None
+    }
+    return {key: value for key, value in options.items() if value is not None}
+
+
+def record_generation(response):
+    """Fold the timings Ollama reports for a generation into the rates
+    the latency budget is computed from."""
+    tokens = response.get("eval_count")
+    eval_ns = response.get("eval_duration")
+    if not tokens or not eval_ns:
+        return
+
+    samples = {
+        "tokens_per_second": tokens / (eval_ns / 1e9),
+        "prefill_ms": response.get("prompt_eval_duration", 0) / 1e6
+    }
+    with _rate_lock:
+        for key, sample in samples.items():
+            current = _observed[key]
+            _observed[key] = sample if current is None else (
+                current + RATE_SMOOTHING * (sample - current)
+            )
+
+
+def generation_rates():
+    with _rate_lock:
+        tokens_per_second = _observed["tokens_per_second"] or settings.LLM_TOKENS_PER_SECOND
+        prefill_ms = _observed["prefill_ms"]
+    return tokens_per_second, settings.LLM_PREFILL_MS if prefill_ms is None else prefill_ms
+
+
+def budget_num_predict(remaining_seconds: float) -> int:
+    """Tokens the model can emit in the time left after prompt evaluation."""
+    tokens_per_second, prefill_ms = generation_rates()
+    usable = remaining_seconds - prefill_ms / 1000
+    return max(settings.LLM_MIN_PREDICT, int(usable * tokens_per_second))
+
+
+def requested_options():
+    """Configured defaults overlaid with the request's overrides, capped at
+    LLM_MAX_NUM_PREDICT, and whether budget mode is on; unlike
+    generation_options this does not depend on the time left."""
+    overrides = dict(_request_options.get() or {})
+    budget = bool(overrides.pop("budget", settings.LLM_BUDGET_MODE))
+
+    options = default_options()
+    options.update(overrides)
+    if options.get("num_predict", -1) < 0 or options["num_predict"] > settings.LLM_MAX_NUM_PREDICT:
+        # -1 is unbounded for Ollama; requests may not lift the cap either
+        options["num_predict"] = settings.LLM_MAX_NUM_PREDICT
+    return options, budget
+
+
+def generation_options():
+    """Options for the next generate call: configured defaults, then the
+    request's overrides, then the latency-budget cap on num_predict."""
+    options, budget = requested_options()
+
+    deadline = current_deadline()
+    if budget and deadline is not None:
+        options["num_predict"] = min(options["num_predict"], budget_num_predict(deadline.remaining()))
+
+    return options
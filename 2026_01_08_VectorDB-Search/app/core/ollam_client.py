@@ -1,15 +1,56 @@
-import ollama
+from app.core.config import settings
+from app.core.admission import embedding_limiter, generate_limiter
+from app.core.embedding_profile import active_profile
+from app.core.generation import generation_options, record_generation
+from app.core.ollama_pool import get_pool
+from app.core.tracing import span
+from app.utils.lazy_import import lazy_import
+from app.utils.vectors import truncate_embedding
 
-EMBED_MODEL = "mxbai-embed-large:latest"
-LLM_MODEL = "llama3.2:latest"
+# Deferred: importing ollama costs ~0.3s and is only needed on first call
+ollama = lazy_import("ollama")
 
+EMBED_MODEL = settings.EMBEDDING_MODEL
+LLM_MODEL = settings.LLM_MODEL
 
-def get_embedding(text: str):
-    response = ollama.embeddings(
-        model=EMBED_MODEL,
-        prompt=text
-    )
-    return response["embedding"]
+
+def _call(method: str, hedge: bool = False, **kwargs):
+    pool = get_pool()
+    if pool is None:
+        return getattr(ollama, method)(**kwargs)
+    return pool.call(method, hedge=hedge, **kwargs)
+
+
+def get_embedding(text: str, profile=None):
+    profile = profile or active_profile()
+    # /api/embed like the batch paths, so every stored vector comes from
+    # the same endpoint whether it was ingested alone or in bulk
+    with span("embed"), embedding_limiter().slot():
+        response = _call(
+            "embed",
+            hedge=True,
+            model=profile["model"],
+            input=[text],
+            keep_alive=settings.OLLAMA_KEEP_ALIVE
+        )
+    return truncate_embedding(response["embeddings"][0], profile["dim"])
+
+
+def get_embeddings(texts, profile=None):
+    # One /api/embed round trip for the whole batch
+    profile = profile or active_profile()
+    with span("embed"), embedding_limiter().slot():
+        response = _call(
+            "embed",
+            hedge=True,
+            model=profile["model"],
+            input=texts,
+            keep_alive=settings.OLLAMA_KEEP_ALIVE
+        )
+    return [
+        truncate_embedding(embedding, profile["dim"])
+        for embedding in response["embeddings"]
+    ]
 
 
 def generate_answer(context: str, question: str):
@@ -23,8 +64,32 @@ Context:
 Question:
 {question}
 """
-    response = ollama.generate(
-        model=LLM_MODEL,
-        prompt=prompt
-    )
+    with span("generate"), generate_limiter.slot():
+        response = _call(
+            "generate",
+            model=LLM_MODEL,
+            prompt=prompt,
+            options=generation_options(),
+            keep_alive=settings.OLLAMA_KEEP_ALIVE
+        )
+    record_generation(response)
     return response["response"]
+
+
+def preload_models():
+    # An empty generate prompt only loads the model; the embedding model
+    # needs a real (tiny) input to be loaded. Every pool node is warmed.
+    pool = get_pool()
+    clients = [node.client for node in pool.nodes] if pool else [ollama]
+
+    for client in clients:
+        client.embed(
+            model=active_profile()["model"],
+            input=["warm-up"],
+            keep_alive=settings.OLLAMA_KEEP_ALIVE
+        )
+        client.generate(
+            model=LLM_MODEL,
+            prompt="",
+            keep_alive=settings.OLLAMA_KEEP_ALIVE
+        )
@@ -0,0 +1,248 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, TimeoutError, wait
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.utils.lazy_import import lazy_import
+
+ollama = lazy_import("ollama")
+
+logger = logging.getLogger(__name__)
+
+
+class NoHealthyNode(ConnectionError):
+    pass
+
+
+def is_client_error(exc: Exception) -> bool:
+    # Ollama answers a missing model or a malformed request with a 4xx
+    # ResponseError: the request is at fault, and every node would refuse it
+    status = getattr(exc, "status_code", None)
+    return isinstance(status, int) and 400 <= status < 500
+
+
+class OllamaNode:
+    def __init__(self, host: str, timeout: float):
+        self.host = host
+        self.client = ollama.Client(host=host, timeout=timeout)
+        self.outstanding = 0
+        self.failures = 0
+        self.ejected_until = 0.0
+
+    def available(self, now: float):
+        return self.ejected_until <= now
+
+    def status(self, now: float):
+        return {
+            "host": self.host,
+            "healthy": self.available(now),
+            "outstanding": self.outstanding,
+            "consecutive_failures": self.failures
+        }
+
+
+class OllamaPool:
+    """Spreads Ollama calls over several hosts.
+
+    Each call goes to the available node with the fewest outstanding
+    requests. A node that fails failure_threshold times in a row, or fails
+    an active health check, is ejected for eject_seconds and then tried
+    again; only transport errors, timeouts and 5xx responses count, while
+    client errors (a missing model, a bad request) are raised as they are.
+    Embedding calls can be hedged: if the first node has not answered
+    within the recent p95 latency, the same request is sent to a second node
+    and whichever answers first wins.
+    """
+
+    def __init__(
+        self,
+        hosts,
+        timeout: float = 120.0,
+        failure_threshold: int = 3,
+        eject_seconds: float = 30.0,
+        hedge: bool = False,
+        hedge_min_delay: float = 0.05
+    ):
+        self.nodes = [OllamaNode(host, timeout) for host in hosts]
+        self.failure_threshold = failure_threshold
+        self.eject_seconds = eject_seconds
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=256)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(4, 4 * len(self.nodes)),
+            thread_name_prefix="ollama-pool"
+        )
+
+    def _pick(self, exclude=()):
+        now = time.monotonic()
+        with self._lock:
+            candidates = [n for n in self.nodes if n not in exclude and n.available(now)]
+            if not candidates:
+                return None
+            node = min(candidates, key=lambda n: n.outstanding)
+            node.outstanding += 1
+            return node
+
+    def _record(self, node: OllamaNode, elapsed: float = None, failed: bool = False):
+        with self._lock:
+            node.outstanding -= 1
+            if failed:
+                node.failures += 1
+                if node.failures >= self.failure_threshold:
+                    node.ejected_until = time.monotonic() + self.eject_seconds
+                    logger.warning("Ejecting Ollama node %s", node.host)
+            elif elapsed is not None:
+                node.failures = 0
+                self._latencies.append(elapsed)
+
+    def _invoke(self, node: OllamaNode, method: str, kwargs):
+        started = time.monotonic()
+        try:
+            result = getattr(node.client, method)(**kwargs)
+        except Exception as exc:
+            # A client error says nothing about the node's health
+            self._record(node, failed=not is_client_error(exc))
+            raise
+        self._record(node, time.monotonic() - started)
+        return result
+
+    def hedge_delay(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if len(latencies) < 20:
+            return self.hedge_min_delay
+        return max(self.hedge_min_delay, latencies[int(0.95 * (len(latencies) - 1))])
+
+    def call(self, method: str, hedge: bool = False, **kwargs):
+        node = self._pick()
+        if node is None:
+            raise NoHealthyNode("No healthy Ollama node available")
+
+        if not (hedge and self.hedge):
+            try:
+                return self._invoke(node, method, kwargs)
+            except Exception as exc:
+                # One failover attempt on a different node, unless the
+                # request itself was refused
+                if is_client_error(exc):
+                    raise
+                backup = self._pick(exclude={node})
+                if backup is None:
+                    raise
+                return self._invoke(backup, method, kwargs)
+
+        return self._call_hedged(node, method, kwargs)
+
+    def _call_hedged(self, primary: OllamaNode, method: str, kwargs):
+        first = self._executor.submit(self._invoke, primary, method, kwargs)
+        try:
+            return first.result(timeout=self.hedge_delay())
+        except TimeoutError:
+            pass
+        except Exception as exc:
+            # Failed fast: the backup becomes a plain failover
+            if is_client_error(exc):
+                raise
+            if (backup := self._pick(exclude={primary})) is None:
+                raise
+            return self._invoke(backup, method, kwargs)
+
+        backup = self._pick(exclude={primary})
+        if backup is None:
+            return first.result()
+
+        second = self._executor.submit(self._invoke, backup, method, kwargs)
+        pending = {first, second}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+                if is_client_error(error):
+                    raise error
+        raise error
+
+    def check_health(self):
+        now = time.monotonic()
+        for node in self.nodes:
+            try:
+                node.client.list()
+            except Exception as exc:
+                with self._lock:
+                    node.failures = max(node.failures, self.failure_threshold)
+                    node.ejected_until = now + self.eject_seconds
+                logger.warning("Ollama node %s failed health check: %s", node.host, exc)
+            else:
+                with self._lock:
+                    node.failures = 0
+                    node.ejected_until = 0.0
+        return self.status()
+
+    def status(self):
+        now = time.monotonic()
+        with self._lock:
+            return [node.status(now) for node in self.nodes]
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def configured_hosts():
+    return [h.strip() for h in settings.OLLAMA_HOSTS.split(",") if h.strip()]
+
+
+def get_pool():
+    # None when no hosts are configured: callers then use the default client
+    global _pool, _pool_pid
+
+    hosts = configured_hosts()
+    if not hosts:
+        return None
+
+    pid = os.getpid()
+    if _pool is None or _pool_pid != pid:
+        with _pool_lock:
+            if _pool is None or _pool_pid != pid:
+                _pool = OllamaPool(
+                    hosts,
+                    timeout=settings.OLLAMA_TIMEOUT,
+                    failure_threshold=settings.OLLAMA_FAILURE_THRESHOLD,
+                    eject_seconds=settings.OLLAMA_EJECT_SECONDS,
+                    hedge=settings.OLLAMA_HEDGE_EMBEDDINGS,
+                    hedge_min_delay=settings.OLLAMA_HEDGE_MIN_DELAY_MS / 1000
+                )
+                _pool_pid = pid
+    return _pool
+
+
+def close_pool():
+    global _pool, _pool_pid
+
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.close()
+        _pool = None
+        _pool_pid = None
+
+
+async def keep_pool_healthy(pool: OllamaPool, interval: int):
+    # Active checks also bring ejected nodes back once they recover
+    while True:
+        await asyncio.sleep(interval)
+        await run_in_threadpool(pool.check_health)
@@ -0,0 +1,95 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from app.core.config import settings
+from app.core.deadline import DeadlineExceeded
+from app.core.tracing import current_trace
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_file = None
+_file_pid = None
+
+
+def sampled() -> bool:
+    return bool(settings.QUERY_LOG_PATH) and random.random() < settings.QUERY_LOG_SAMPLE_RATE
+
+
+def _log_file():
+    # One append handle per process; every record is a single write, so
+    # workers sharing the file do not interleave lines
+    global _file, _file_pid
+
+    pid = os.getpid()
+    if _file is None or _file_pid != pid:
+        _file = open(settings.QUERY_LOG_PATH, "a", encoding="utf-8")
+        _file_pid = pid
+    return _file
+
+
+def write_record(record):
+    line = json.dumps(record, default=str) + "\n"
+    try:
+        with _lock:
+            f = _log_file()
+            f.write(line)
+            f.flush()
+    except OSError as exc:
+        # Losing a sample must never fail the query it describes
+        logger.warning("Query log write failed: %s", exc)
+
+
+def close_log():
+    global _file
+    with _lock:
+        if _file is not None:
+            _file.close()
+            _file = None
+
+
+def query_record(params, response, status: int, latency_ms: float):
+    """One log line; benchmarks/replay.py writes replay results in the
+    same shape so a log can serve as the baseline of a comparison."""
+    trace = current_trace()
+    response = response or {}
+    return {
+        "ts": time.time(),
+        "params": {key: value for key, value in params.items() if value is not None},
+        "status": status,
+        "latency_ms": round(latency_ms, 2),
+        "stages": trace.as_dict()["stages"] if trace else {},
+        "answer": response.get("answer"),
+        "chunks": [[c.get("doc_id"), c["chunk_index"]] for c in response.get("chunks_used", [])],
+        "degraded": response.get("degraded", [])
+    }
+
+
+@contextmanager
+def logged_query(params):
+    """Log the query run inside the block if it is sampled; the block
+    stores its response in the yielded dict."""
+    entry = {}
+    if not sampled():
+        yield entry
+        return
+
+    started = time.perf_counter()
+    status = 200
+    try:
+        yield entry
+    except DeadlineExceeded:
+        status = 504
+        raise
+    except Exception as exc:
+        status = getattr(exc, "status_code", 500)
+        raise
+    finally:
+        write_record(query_record(
+            params, entry.get("response"), status, (time.perf_counter() - started) * 1000
+        ))
@@ -0,0 +1,75 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current_trace = ContextVar("request_trace", default=None)
+
+
+class Trace:
+    """Per-request stage timings; repeated stages (e.g. one embed per chunk)
+    are summed and counted."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+        # Stages can be recorded from helper threads (bulk embedding)
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float):
+        with self._lock:
+            stage = self.stages.setdefault(name, {"ms": 0.0, "count": 0})
+            stage["ms"] += seconds * 1000
+            stage["count"] += 1
+
+    def total_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def as_dict(self):
+        return {
+            "stages": {
+                name: {"ms": round(stage["ms"], 2), "count": stage["count"]}
+                for name, stage in self.stages.items()
+            },
+            "total_ms": round(self.total_ms(), 2)
+        }
+
+    def server_timing(self):
+        entries = [f"{name};dur={stage['ms']:.2f}" for name, stage in self.stages.items()]
+        entries.append(f"total;dur={self.total_ms():.2f}")
+        return ", ".join(entries)
+
+
+def start_trace():
+    trace = Trace()
+    return trace, _current_trace.set(trace)
+
+
+def end_trace(token):
+    _current_trace.reset(token)
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name: str):
+    # No-op outside a traced request (CLI, background workers)
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, time.perf_counter() - started)
+
+
+def with_timing(result: dict, debug: str = None):
+    trace = current_trace()
+    if debug == "timing" and trace is not None and isinstance(result, dict):
+        return {**result, "timing": trace.as_dict()}
+    return result
@@ -0,0 +1,25 @@
+import asyncio
+import logging
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.ollam_client import preload_models
+
+logger = logging.getLogger(__name__)
+
+
+async def warm_up_models():
+    try:
+        await run_in_threadpool(preload_models)
+        return True
+    except Exception as exc:
+        # Warm-up is best effort, requests will load the models on demand
+        logger.warning("Ollama model warm-up failed: %s", exc)
+        return False
+
+
+async def keep_models_warm(interval: int):
+    # Re-touch the models before keep_alive expires so they stay resident
+    while True:
+        await asyncio.sleep(interval)
+        await warm_up_models()
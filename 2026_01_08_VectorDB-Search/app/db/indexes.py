@@ -0,0 +1,95 @@
+import logging
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+from pymongo.operations import SearchIndexModel
+
+from app.core.config import settings
+from app.core.embedding_profile import active_profile, migration_target
+from app.db.mongodb import jobs_collection, query_stats_collection
+from app.db.partitions import chunk_partitions
+
+logger = logging.getLogger(__name__)
+
+
+def vector_index_definition(profile=None):
+    profile = profile or active_profile()
+    return {
+        "fields": [
+            {
+                "type": "vector",
+                "path": profile["field"],
+                "numDimensions": profile["dim"],
+                "similarity": settings.VECTOR_SIMILARITY
+            },
+            {
+                "type": "filter",
+                "path": "doc_id"
+            }
+        ]
+    }
+
+
+def ensure_btree_indexes():
+    # create_index is a no-op when an identical index already exists
+    for collection in chunk_partitions():
+        collection.create_index([("doc_id", ASCENDING)])
+        collection.create_index(
+            [("doc_id", ASCENDING), ("chunk_index", ASCENDING)]
+        )
+
+    # Work queue: leasing scans visible jobs by status, progress is per doc
+    jobs_collection.create_index([("status", ASCENDING), ("visible_at", ASCENDING)])
+    jobs_collection.create_index([("doc_ids", ASCENDING)])
+
+    if settings.QUERY_STATS:
+        # Cache warm-up reads the most counted recent queries
+        query_stats_collection.create_index([("count", DESCENDING)])
+
+
+def ensure_vector_index(profile=None):
+    """Provision the profile's vector index on every chunk partition."""
+    profile = profile or active_profile()
+    statuses = {
+        _ensure_vector_index_on(collection, profile)
+        for collection in chunk_partitions()
+    }
+    if len(statuses) == 1:
+        return statuses.pop()
+    return "unsupported" if "unsupported" in statuses else "updated"
+
+
+def _ensure_vector_index_on(collection, profile):
+    definition = vector_index_definition(profile)
+
+    try:
+        existing = list(collection.list_search_indexes(profile["index"]))
+    except OperationFailure as exc:
+        # Search indexes are only available on Atlas deployments
+        logger.warning("Skipping vector index provisioning: %s", exc)
+        return "unsupported"
+
+    if not existing:
+        collection.create_search_index(
+            SearchIndexModel(
+                definition=definition,
+                name=profile["index"],
+                type="vectorSearch"
+            )
+        )
+        return "created"
+
+    current = existing[0].get("latestDefinition", {})
+    if current.get("fields") != definition["fields"]:
+        collection.update_search_index(profile["index"], definition)
+        return "updated"
+
+    return "unchanged"
+
+
+def ensure_indexes():
+    ensure_btree_indexes()
+    target = migration_target()
+    if target:
+        ensure_vector_index(target)
+    return ensure_vector_index()
@@ -1,6 +1,90 @@
+import os
+import threading
+
 from pymongo import MongoClient
 from app.core.config import settings
 
-client = MongoClient(settings.MONGO_URI)
-db = client[settings.DB_NAME]
-chunks_collection = db["document_chunks"]
+_client = None
+_client_pid = None
+_lock = threading.Lock()
+
+# Clients for other clusters (chunk partitions), keyed by URI
+_extra_clients = {}
+
+
+def get_client():
+    # One client per process: a client created before a fork must not be
+    # reused by the child, so a pid change forces a fresh client
+    global _client, _client_pid
+
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _lock:
+            if _client is None or _client_pid != pid:
+                _client = MongoClient(settings.MONGO_URI, connect=False)
+                _client_pid = pid
+    return _client
+
+
+def get_cluster_client(uri: str = None):
+    # Same per-process rule as get_client, for clusters other than MONGO_URI
+    if not uri or uri == settings.MONGO_URI:
+        return get_client()
+
+    pid = os.getpid()
+    entry = _extra_clients.get(uri)
+    if entry is None or entry[1] != pid:
+        with _lock:
+            entry = _extra_clients.get(uri)
+            if entry is None or entry[1] != pid:
+                entry = (MongoClient(uri, connect=False), pid)
+                _extra_clients[uri] = entry
+    return entry[0]
+
+
+def get_db(uri: str = None):
+    return get_cluster_client(uri)[settings.DB_NAME]
+
+
+def close_client():
+    global _client, _client_pid
+
+    with _lock:
+        pid = os.getpid()
+        if _client is not None and _client_pid == pid:
+            _client.close()
+        _client = None
+        _client_pid = None
+
+        for client, client_pid in _extra_clients.values():
+            if client_pid == pid:
+                client.close()
+        _extra_clients.clear()
+
+
+class LazyCollection:
+    """Resolves the collection on the current process' client on each access."""
+
+    def __init__(self, name: str, uri: str = None):
+        self._name = name
+        self._uri = uri
+
+    def __getattr__(self, attr):
+        return getattr(get_db(self._uri)[self._name], attr)
+
+    def __repr__(self):
+        return f"LazyCollection({self._name!r})"
+
+
+chunks_collection = LazyCollection(settings.CHUNKS_COLLECTION)
+migrations_collection = LazyCollection(settings.MIGRATIONS_COLLECTION)
+jobs_collection = LazyCollection(settings.JOBS_COLLECTION)
+query_stats_collection = LazyCollection(settings.QUERY_STATS_COLLECTION)
+
+
+def __getattr__(name):
+    if name == "client":
+        return get_client()
+    if name == "db":
+        return get_db()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,64 @@
+import zlib
+
+from app.core.config import settings
+from app.db.mongodb import LazyCollection, chunks_collection
+
+_partitions = None
+_partitions_key = None
+
+
+def partition_count() -> int:
+    return max(settings.CHUNK_PARTITIONS, 1)
+
+
+def partitioned() -> bool:
+    return partition_count() > 1
+
+
+def _cluster_uris():
+    return [uri.strip() for uri in settings.CHUNK_PARTITION_URIS.split(",") if uri.strip()]
+
+
+def chunk_partitions():
+    """Chunk collections, one per partition.
+
+    With a single partition this is just chunks_collection. Otherwise
+    partition i is <CHUNKS_COLLECTION>_p<i>, on cluster i modulo the
+    CHUNK_PARTITION_URIS list (MONGO_URI when it is empty).
+    """
+    global _partitions, _partitions_key
+
+    key = (partition_count(), settings.CHUNKS_COLLECTION, settings.CHUNK_PARTITION_URIS)
+    if _partitions is None or _partitions_key != key:
+        count = partition_count()
+        if count == 1:
+            _partitions = [chunks_collection]
+        else:
+            uris = _cluster_uris() or [None]
+            _partitions = [
+                LazyCollection(f"{settings.CHUNKS_COLLECTION}_p{i}", uris[i % len(uris)])
+                for i in range(count)
+            ]
+        _partitions_key = key
+    return _partitions
+
+
+def partition_index(doc_id: str) -> int:
+    # crc32 is stable across processes and hosts, unlike hash()
+    return zlib.crc32(doc_id.encode("utf-8")) % partition_count()
+
+
+def partition_for(doc_id: str):
+    return chunk_partitions()[partition_index(doc_id)]
+
+
+def group_by_partition(items, doc_id=lambda item: item):
+    """Split items into [(collection, items)] by the partition of their doc_id."""
+    partitions = chunk_partitions()
+    if len(partitions) == 1:
+        return [(partitions[0], list(items))] if items else []
+
+    groups = {}
+    for item in items:
+        groups.setdefault(partition_index(doc_id(item)), []).append(item)
+    return [(partitions[index], group) for index, group in sorted(groups.items())]
@@ -1,6 +1,105 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from pymongo.errors import PyMongoError
+from starlette.concurrency import run_in_threadpool
+
 from app.api.routes import router
+from app.core.admission import Overloaded
+from app.core.config import settings
+from app.core.deadline import DeadlineExceeded
+from app.core.ollama_pool import get_pool, close_pool, keep_pool_healthy
+from app.core.query_log import close_log
+from app.core.tracing import start_trace, end_trace
+from app.core.warmup import warm_up_models, keep_models_warm
+from app.db.indexes import ensure_indexes
+from app.db.mongodb import get_client, close_client
+from app.services.cache_warmup import warm_up_caches
+from app.services.embedding_migration import load_profiles, keep_profiles_fresh, stop_worker
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Clients are created here, inside each worker, never at import time
+    get_client()
+
+    try:
+        await run_in_threadpool(load_profiles)
+        await run_in_threadpool(ensure_indexes)
+    except PyMongoError as exc:
+        logger.warning("Index provisioning failed: %s", exc)
+
+    background = []
+    if settings.PROFILE_REFRESH_INTERVAL > 0:
+        background.append(asyncio.create_task(
+            keep_profiles_fresh(settings.PROFILE_REFRESH_INTERVAL)
+        ))
+
+    pool = get_pool()
+    if pool and settings.OLLAMA_HEALTH_INTERVAL > 0:
+        background.append(asyncio.create_task(
+            keep_pool_healthy(pool, settings.OLLAMA_HEALTH_INTERVAL)
+        ))
+
+    if settings.OLLAMA_WARMUP:
+        await warm_up_models()
+        if settings.OLLAMA_KEEP_WARM_INTERVAL > 0:
+            background.append(asyncio.create_task(
+                keep_models_warm(settings.OLLAMA_KEEP_WARM_INTERVAL)
+            ))
+
+    # Before yield: no traffic is served until the caches are warm or the
+    # warm-up budget is spent
+    if settings.CACHE_WARMUP_SOURCE != "none":
+        await warm_up_caches()
+
+    yield
+
+    stop_worker()
+    for task in background:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+    close_pool()
+    close_client()
+    close_log()
+
+
+app = FastAPI(title="Mongo + Ollama RAG", lifespan=lifespan)
+
+
+@app.middleware("http")
+async def server_timing(request: Request, call_next):
+    # Services record stages into the request's trace via tracing.span
+    trace, token = start_trace()
+    try:
+        response = await call_next(request)
+    finally:
+        end_trace(token)
+    response.headers["Server-Timing"] = trace.server_timing()
+    return response
+
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"error": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 
-app = FastAPI(title="Mongo + Ollama RAG")
+@app.exception_handler(DeadlineExceeded)
+async def deadline_handler(request: Request, exc: DeadlineExceeded):
+    return JSONResponse(
+        status_code=504,
+        content={"error": str(exc), "stage": exc.stage}
+    )
 
-app.include_router(router)
\ No newline at end of file
+app.include_router(router)
@@ -0,0 +1,38 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from app.core.config import settings
+from app.core.ollam_client import get_embeddings
+from app.services.query_service import search_chunks, answer_from_chunks, query_vector
+
+
+def query_batch(questions, top_k: int = 5):
+    """Answer many questions, yielding each result as soon as it is ready.
+
+    All questions are embedded up front in one Ollama call, so an Ollama
+    failure surfaces before any result is streamed. Vector searches then run
+    concurrently and at most BATCH_GENERATE_CONCURRENCY generations hit the
+    LLM at a time. Results come back in completion order tagged with the
+    index of the question in the request.
+    """
+    embeddings = get_embeddings(questions)
+    return _answer_stream(questions, embeddings, top_k)
+
+
+def _answer_stream(questions, embeddings, top_k: int):
+    generate_slots = threading.BoundedSemaphore(settings.BATCH_GENERATE_CONCURRENCY)
+
+    def answer(index: int):
+        question = questions[index]
+        try:
+            results = search_chunks(query_vector(embeddings[index]), top_k)
+            with generate_slots:
+                response = answer_from_chunks(question, results)
+        except Exception as exc:
+            return {"index": index, "question": question, "error": str(exc)}
+        return {"index": index, "question": question, **response}
+
+    with ThreadPoolExecutor(max_workers=settings.BATCH_SEARCH_CONCURRENCY) as pool:
+        futures = [pool.submit(answer, index) for index in range(len(questions))]
+        for future in as_completed(futures):
+            yield future.result()
@@ -0,0 +1,281 @@
+import itertools
+import multiprocessing
+import os
+import shutil
+import time
+import uuid
+import zipfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextvars import copy_context
+
+from app.core.admission import background_scope
+from app.core.config import settings
+from app.core.embedding_profile import migration_target
+from app.core.ollam_client import get_embeddings
+from app.core.tracing import span
+from app.db.partitions import group_by_partition
+from app.services.chunk_documents import build_chunk_document
+from app.services.work_queue import enqueue_batch
+from app.utils.pdf_reader import extract_text_from_pdf
+from app.utils.text_splitter import split_text
+
+TEXT_EXTENSIONS = (".txt", ".md")
+
+
+class TooManyFiles(Exception):
+    pass
+
+
+def extract_chunks(path: str):
+    # Runs in a worker process: PDF parsing and splitting are CPU bound
+    if path.lower().endswith(TEXT_EXTENSIONS):
+        with open(path, encoding="utf-8", errors="replace") as f:
+            text = f.read().strip()
+    else:
+        text = extract_text_from_pdf(path)
+    return split_text(text) if text else []
+
+
+def _process_pool(workers: int):
+    # forkserver children start from a clean process instead of forking the
+    # threaded API worker and its Mongo client
+    methods = multiprocessing.get_all_start_methods()
+    method = "forkserver" if "forkserver" in methods else "spawn"
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context(method)
+    )
+
+
+def _extract_all(paths):
+    """Yield (index, chunks, error) for each path as soon as it is split."""
+    workers = min(settings.INGEST_PROCESSES, len(paths))
+
+    if workers <= 0:
+        for index, path in enumerate(paths):
+            try:
+                yield index, extract_chunks(path), None
+            except Exception as exc:
+                yield index, [], exc
+        return
+
+    # Only a small window of files is extracted ahead of the embedder, so
+    # memory stays flat on directories of any size
+    queue = iter(enumerate(paths))
+    window = workers * 4
+    futures = {}
+
+    with _process_pool(workers) as pool:
+        def fill():
+            for index, path in itertools.islice(queue, window - len(futures)):
+                futures[pool.submit(extract_chunks, path)] = index
+
+        fill()
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = futures.pop(future)
+                try:
+                    yield index, future.result(), None
+                except Exception as exc:
+                    yield index, [], exc
+            fill()
+
+
+def embed_and_insert(batch):
+    """Embed one batch of (doc_id, chunk_index, text), possibly spanning
+    documents, with a single Ollama call and insert it in bulk."""
+    texts = [text for _, _, text in batch]
+    target = migration_target()
+    with background_scope():
+        embeddings = get_embeddings(texts)
+        target_embeddings = get_embeddings(texts, target) if target else [None] * len(texts)
+
+    documents = [
+        build_chunk_document(doc_id, idx, text, embedding, target_embedding)
+        for (doc_id, idx, text), embedding, target_embedding
+        in zip(batch, embeddings, target_embeddings)
+    ]
+
+    with span("insert"):
+        for collection, group in group_by_partition(documents, doc_id=lambda d: d["doc_id"]):
+            collection.insert_many(group, ordered=False)
+
+
+def run_pipeline(paths, doc_ids=None, on_file_done=None):
+    """Ingest files through one shared, pipelined embedding stage.
+
+    Extraction runs in parallel processes and, as each file is split, its
+    chunks join a shared buffer that is embedded in BULK_EMBED_BATCH_SIZE
+    batches spanning documents, with up to BULK_EMBED_CONCURRENCY batches
+    in flight. Extraction and embedding overlap, so wall time tracks
+    embedding throughput rather than the sum of per-file latencies.
+
+    Returns one report per path ({"doc_id", "chunks"} or {"error"}).
+    on_file_done(index, report) is called once every chunk of a file has
+    been stored, or the file has failed. With INGEST_QUEUE the batches are
+    queued for workers instead, and "stored" means queued.
+    """
+    stage = enqueue_batch if settings.INGEST_QUEUE else embed_and_insert
+    batch_size = settings.BULK_EMBED_BATCH_SIZE
+    max_in_flight = settings.BULK_EMBED_CONCURRENCY * 2
+
+    reports = [{} for _ in paths]
+    remaining = [0] * len(paths)
+    pending = []
+    in_flight = {}
+
+    def finish(index):
+        if on_file_done:
+            on_file_done(index, reports[index])
+
+    def settle(done):
+        for future in done:
+            batch = in_flight.pop(future)
+            error = future.exception()
+            for index, count in Counter(item[0] for item in batch).items():
+                if error is not None:
+                    reports[index]["error"] = str(error)
+                remaining[index] -= count
+                if remaining[index] == 0:
+                    finish(index)
+
+    with ThreadPoolExecutor(max_workers=settings.BULK_EMBED_CONCURRENCY) as embedders:
+        def submit(batch):
+            while len(in_flight) >= max_in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                settle(done)
+            # The copied context keeps the request's trace, so the embed and
+            # insert spans of every batch are recorded
+            future = embedders.submit(copy_context().run, stage, [item[1:] for item in batch])
+            in_flight[future] = batch
+
+        extracted = _extract_all(paths)
+        while True:
+            # Only the wait for the next split file counts as extraction;
+            # time blocked on in-flight embeds below is not
+            with span("extract"):
+                item = next(extracted, None)
+            if item is None:
+                break
+
+            index, chunks, error = item
+            report = reports[index]
+            if error is not None or not chunks:
+                report["error"] = str(error) if error else "No readable text found"
+                finish(index)
+                continue
+
+            report["doc_id"] = doc_ids[index] if doc_ids else str(uuid.uuid4())
+            report["chunks"] = len(chunks)
+            remaining[index] = len(chunks)
+            pending.extend(
+                (index, report["doc_id"], idx, chunk)
+                for idx, chunk in enumerate(chunks)
+            )
+
+            while len(pending) >= batch_size:
+                submit(pending[:batch_size])
+                del pending[:batch_size]
+
+        if pending:
+            submit(pending)
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            settle(done)
+
+    # Never leave half-ingested documents behind
+    failed = [r["doc_id"] for r in reports if "doc_id" in r and "error" in r]
+    for collection, doc_ids in group_by_partition(failed):
+        collection.delete_many({"doc_id": {"$in": doc_ids}})
+
+    return reports
+
+
+def ingest_pdf_files(files):
+    """Ingest uploaded PDFs ({"filename", "path"}) and remove the files."""
+    started = time.perf_counter()
+
+    reports = run_pipeline([file["path"] for file in files])
+    reports = [{"filename": file["filename"], **report} for file, report in zip(files, reports)]
+
+    for file in files:
+        try:
+            os.remove(file["path"])
+        except OSError:
+            pass
+
+    elapsed = time.perf_counter() - started
+    stored = sum(r["chunks"] for r in reports if "doc_id" in r and "error" not in r)
+
+    return {
+        "message": (
+            "PDFs queued for embedding" if settings.INGEST_QUEUE
+            else "PDFs processed and stored in MongoDB Atlas"
+        ),
+        "files": reports,
+        "stats": {
+            "files": len(files),
+            "failed": sum(1 for r in reports if "error" in r),
+            "chunks": stored,
+            "elapsed_ms": round(elapsed * 1000, 1),
+            "chunks_per_second": round(stored / elapsed, 1) if elapsed else 0.0
+        }
+    }
+
+
+def stage_uploads(uploads, directory: str, max_files: int = None):
+    """Write uploaded PDFs, and the PDFs inside uploaded ZIPs, to directory.
+
+    Returns (files, rejected): files ready for ingest_pdf_files and
+    per-upload errors for anything that is neither a PDF nor a ZIP.
+    Raises TooManyFiles as soon as more than max_files PDFs would be
+    written, before copying the one over the limit.
+    """
+    max_files = settings.BULK_MAX_FILES if max_files is None else max_files
+    files = []
+    rejected = []
+
+    def add(filename: str, source):
+        if len(files) >= max_files:
+            raise TooManyFiles(f"At most {max_files} PDFs per upload")
+        path = os.path.join(directory, f"{len(files)}_{os.path.basename(filename)}")
+        with open(path, "wb") as buffer:
+            shutil.copyfileobj(source, buffer)
+        files.append({"filename": filename, "path": path})
+
+    for upload in uploads:
+        name = upload.filename or ""
+        lowered = name.lower()
+
+        if lowered.endswith(".pdf"):
+            add(name, upload.file)
+        elif lowered.endswith(".zip"):
+            try:
+                archive = zipfile.ZipFile(upload.file)
+            except zipfile.BadZipFile:
+                rejected.append({"filename": name, "error": "Invalid ZIP archive"})
+                continue
+
+            with archive:
+                members = [
+                    m for m in archive.infolist()
+                    if not m.is_dir()
+                    and m.filename.lower().endswith(".pdf")
+                    and not m.filename.startswith("__MACOSX/")
+                ]
+                if sum(m.file_size for m in members) > settings.BULK_MAX_ZIP_BYTES:
+                    rejected.append({"filename": name, "error": "ZIP archive is too large"})
+                    continue
+                if len(files) + len(members) > max_files:
+                    raise TooManyFiles(f"At most {max_files} PDFs per upload")
+                for member in members:
+                    # Only the base name is kept, so archive paths cannot escape
+                    with archive.open(member) as source:
+                        add(f"{name}/{member.filename}", source)
+        else:
+            rejected.append({"filename": name, "error": "Only PDF or ZIP files are supported"})
+
+    return files, rejected
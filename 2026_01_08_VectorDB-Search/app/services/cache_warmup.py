@@ -0,0 +1,154 @@
+import json
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from pymongo import WriteConcern
+from starlette.concurrency import run_in_threadpool
+
+from app.core.cache import answer_cache, embedding_cache
+from app.core.config import settings
+from app.core.deadline import DeadlineExceeded, deadline_scope, request_deadline_seconds, run_within_deadline
+from app.core.embedding_profile import active_profile
+from app.core.generation import generation_scope
+from app.core.ollam_client import get_embeddings
+from app.db.mongodb import query_stats_collection
+from app.services.query_service import query_document, query_vector
+
+logger = logging.getLogger(__name__)
+
+# /query parameters that identify a cacheable query; the rest (deadline)
+# only shape how long it may take
+QUERY_KEYS = ("q", "mode", "top_k", "neighbors", "num_predict", "num_ctx", "temperature", "stop", "budget")
+
+
+def query_params(params):
+    return {key: params[key] for key in QUERY_KEYS if params.get(key) is not None}
+
+
+def record_query_stat(params):
+    # Unacknowledged: counting a query must not add a round trip to it
+    params = query_params(params)
+    query_stats_collection.with_options(write_concern=WriteConcern(w=0)).update_one(
+        {"_id": json.dumps(params, sort_keys=True)},
+        {
+            "$inc": {"count": 1},
+            "$set": {"params": params, "last_seen": datetime.now(timezone.utc)}
+        },
+        upsert=True
+    )
+
+
+def popular_from_log(path: str, limit: int, since: float):
+    """Most frequent successful queries logged after since (epoch seconds)."""
+    counts = Counter()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A worker may be mid-write on the last line
+                continue
+            if record.get("status") == 200 and record.get("ts", 0) >= since:
+                counts[json.dumps(query_params(record["params"]), sort_keys=True)] += 1
+    return [json.loads(key) for key, _ in counts.most_common(limit)]
+
+
+def popular_from_stats(limit: int, since: float):
+    cursor = (
+        query_stats_collection
+        .find({"last_seen": {"$gte": datetime.fromtimestamp(since, timezone.utc)}}, {"params": 1})
+        .sort("count", -1)
+        .limit(limit)
+    )
+    return [doc["params"] for doc in cursor]
+
+
+def popular_queries(source: str = None, limit: int = None):
+    source = source or settings.CACHE_WARMUP_SOURCE
+    limit = limit or settings.CACHE_WARMUP_QUERIES
+    since = time.time() - settings.CACHE_WARMUP_LOOKBACK_HOURS * 3600
+
+    if source == "log":
+        return popular_from_log(settings.QUERY_LOG_PATH, limit, since)
+    if source == "stats":
+        return popular_from_stats(limit, since)
+    return []
+
+
+def _warm_embeddings(queries):
+    profile = active_profile()
+    pending = list(dict.fromkeys(
+        q["q"] for q in queries
+        if (profile["model"], profile["dim"], q["q"]) not in embedding_cache
+    ))
+
+    warmed = 0
+    for start in range(0, len(pending), settings.BULK_EMBED_BATCH_SIZE):
+        batch = pending[start:start + settings.BULK_EMBED_BATCH_SIZE]
+        vectors = run_within_deadline("warmup", get_embeddings, batch)
+        for question, vector in zip(batch, vectors):
+            embedding_cache.put((profile["model"], profile["dim"], question), query_vector(vector))
+        warmed += len(batch)
+    return warmed
+
+
+def _warm_answers(queries, deadline, summary):
+    for params in queries:
+        if deadline.remaining() <= 0 or deadline.remaining_ms() < settings.DEADLINE_MIN_GENERATE_MS:
+            raise DeadlineExceeded("warmup")
+
+        options = {key: params.get(key) for key in ("num_predict", "num_ctx", "temperature", "stop", "budget")}
+        # Each query gets its own deadline so one degraded answer does not
+        # mark the rest, but none may outlive the warm-up budget
+        seconds = min(deadline.remaining(), request_deadline_seconds())
+        try:
+            with deadline_scope(seconds), generation_scope(options):
+                response = query_document(
+                    params["q"], params.get("top_k", 5), params.get("mode", "answer"), params.get("neighbors")
+                )
+        except DeadlineExceeded:
+            continue
+        except Exception as exc:
+            logger.warning("Cache warm-up query failed: %s", exc)
+            continue
+        if "degraded" not in response:
+            summary["answers"] += 1
+
+
+def warm_caches(source: str = None, limit: int = None, budget_seconds: float = None):
+    """Pre-populate the query-embedding and answer caches with the most
+    frequent recent questions, giving up once budget_seconds have passed.
+
+    Embeddings are warmed first, in batches, since they are cheap and serve
+    every mode; answers only when the answer cache is enabled.
+    """
+    budget_seconds = budget_seconds or settings.CACHE_WARMUP_BUDGET_SECONDS
+    started = time.perf_counter()
+    summary = {"queries": 0, "embeddings": 0, "answers": 0, "complete": False}
+
+    with deadline_scope(budget_seconds) as deadline:
+        try:
+            queries = popular_queries(source, limit)
+            summary["queries"] = len(queries)
+            summary["embeddings"] = _warm_embeddings(queries)
+            if answer_cache.enabled:
+                _warm_answers(queries, deadline, summary)
+            summary["complete"] = True
+        except DeadlineExceeded:
+            logger.info("Cache warm-up stopped at its %.0fs budget", budget_seconds)
+
+    summary["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return summary
+
+
+async def warm_up_caches():
+    try:
+        summary = await run_in_threadpool(warm_caches)
+    except Exception as exc:
+        # Best effort, like model warm-up: a cold cache only costs latency
+        logger.warning("Cache warm-up failed: %s", exc)
+        return None
+    logger.info("Cache warm-up: %s", summary)
+    return summary
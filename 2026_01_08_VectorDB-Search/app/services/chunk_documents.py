@@ -0,0 +1,18 @@
+from app.core.embedding_profile import active_profile, migration_target, vector_fields
+from app.utils.chunk_codec import encode_chunk_text
+
+
+def build_chunk_document(doc_id: str, chunk_index: int, text: str, embedding, target_embedding=None):
+    document = {
+        "doc_id": doc_id,
+        "chunk_index": chunk_index,
+        **encode_chunk_text(text),
+        **vector_fields(active_profile(), embedding)
+    }
+
+    # Dual-write while a re-embedding migration is back-filling
+    target = migration_target()
+    if target and target_embedding is not None:
+        document.update(vector_fields(target, target_embedding))
+
+    return document
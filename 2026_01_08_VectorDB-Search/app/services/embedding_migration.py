@@ -0,0 +1,310 @@
+import asyncio
+import logging
+import threading
+from datetime import datetime, timezone
+
+from pymongo import UpdateOne
+from starlette.concurrency import run_in_threadpool
+
+from app.core.admission import background_scope
+from app.core.config import settings
+from app.core.embedding_profile import (
+    active_profile,
+    make_profile,
+    migration_target,
+    set_profiles,
+    vector_fields
+)
+from app.core.ollam_client import get_embeddings
+from app.db.indexes import ensure_vector_index
+from app.db.mongodb import migrations_collection
+from app.db.partitions import chunk_partitions
+from app.utils.chunk_codec import decode_chunk_text
+from app.utils.vectors import normalize_with_norm
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_ID = "active_profile"
+MIGRATION_ID = "migration"
+PROFILE_KEYS = ("model", "dim", "field", "index")
+# A migration is "running" while back-filling and "ready" once every chunk
+# has a target vector; ingestion dual-writes in both states.
+IN_PROGRESS = ("running", "ready")
+
+_worker = None
+_worker_lock = threading.Lock()
+_stop = threading.Event()
+
+
+class MigrationError(Exception):
+    pass
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _profile(doc):
+    return {key: doc[key] for key in PROFILE_KEYS}
+
+
+def load_profiles():
+    active = migrations_collection.find_one({"_id": ACTIVE_ID})
+    migration = migrations_collection.find_one(
+        {"_id": MIGRATION_ID, "status": {"$in": list(IN_PROGRESS)}}
+    )
+    set_profiles(
+        _profile(active) if active else None,
+        _profile(migration) if migration else None
+    )
+
+
+def start_migration(model: str, dim: int):
+    current = migrations_collection.find_one({"_id": MIGRATION_ID})
+    if current and current["status"] in IN_PROGRESS:
+        raise MigrationError("An embedding migration is already in progress")
+
+    source = active_profile()
+    if source["model"] == model and source["dim"] == dim:
+        raise MigrationError(f"{model} ({dim} dims) is already the active embedding")
+
+    target = make_profile(model, dim)
+    state = {
+        "_id": MIGRATION_ID,
+        **target,
+        "source": source,
+        "status": "running",
+        "partition": 0,
+        "last_id": None,
+        "processed": 0,
+        "last_error": None,
+        "started_at": _now(),
+        "updated_at": _now()
+    }
+    migrations_collection.replace_one({"_id": MIGRATION_ID}, state, upsert=True)
+
+    ensure_vector_index(target)
+    load_profiles()
+    return state
+
+
+def reopen_migration():
+    """Send a "ready" migration back to "running" from the first partition.
+
+    Chunks can still arrive without the target vector after the back-fill
+    finished (processes whose profiles are stale, snapshot imports); the
+    rescan only visits chunks missing the target field, so it stays cheap.
+    """
+    migrations_collection.update_one(
+        {"_id": MIGRATION_ID, "status": "ready"},
+        {"$set": {"status": "running", "partition": 0, "last_id": None, "updated_at": _now()}}
+    )
+    return migrations_collection.find_one({"_id": MIGRATION_ID})
+
+
+def run_migration(batch_size: int = None, pause: float = None, stop_event=None):
+    """Back-fill target vectors from the last checkpoint until done or stopped.
+
+    Chunks are walked partition by partition in _id order; the partition
+    and last processed _id are checkpointed after every batch so an
+    interrupted run resumes where it stopped.
+    """
+    batch_size = batch_size or settings.MIGRATION_BATCH_SIZE
+    pause = settings.MIGRATION_PAUSE_SECONDS if pause is None else pause
+    stop_event = stop_event or threading.Event()
+
+    state = migrations_collection.find_one({"_id": MIGRATION_ID})
+    if not state or state["status"] != "running":
+        return state
+
+    target = _profile(state)
+    collections = chunk_partitions()
+    partition = min(state.get("partition", 0), len(collections) - 1)
+    last_id = state["last_id"]
+
+    while not stop_event.is_set():
+        chunks = collections[partition]
+
+        # Chunks dual-written at ingest already carry the target vector
+        query = {target["field"]: {"$exists": False}}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+
+        batch = list(
+            chunks.find(query, {"text": 1, "text_z": 1, "text_codec": 1})
+            .sort("_id", 1)
+            .limit(batch_size)
+        )
+
+        if not batch and partition + 1 < len(collections):
+            partition += 1
+            last_id = None
+            migrations_collection.update_one(
+                {"_id": MIGRATION_ID},
+                {"$set": {"partition": partition, "last_id": None, "updated_at": _now()}}
+            )
+            continue
+
+        if not batch:
+            migrations_collection.update_one(
+                {"_id": MIGRATION_ID},
+                {"$set": {"status": "ready", "updated_at": _now()}}
+            )
+            break
+
+        with background_scope():
+            vectors = get_embeddings([decode_chunk_text(doc) for doc in batch], target)
+        chunks.bulk_write(
+            [
+                UpdateOne({"_id": doc["_id"]}, {"$set": vector_fields(target, vector)})
+                for doc, vector in zip(batch, vectors)
+            ],
+            ordered=False
+        )
+
+        last_id = batch[-1]["_id"]
+        migrations_collection.update_one(
+            {"_id": MIGRATION_ID},
+            {
+                "$set": {"last_id": last_id, "updated_at": _now()},
+                "$inc": {"processed": len(batch)}
+            }
+        )
+
+        # Throttle so the back-fill never starves live embedding traffic
+        stop_event.wait(pause)
+
+    return migrations_collection.find_one({"_id": MIGRATION_ID})
+
+
+def normalize_chunks(batch_size: int = None, on_batch=None):
+    """Rewrite vectors stored before NORMALIZE_EMBEDDINGS as unit vectors
+    plus their norm, for the active and any migration target field.
+
+    Chunks that already carry <field>_norm are skipped, so the pass is
+    safe to re-run after an interruption. Returns {field: chunks updated}.
+    """
+    batch_size = batch_size or settings.MIGRATION_BATCH_SIZE
+    fields = [active_profile()["field"]]
+    target = migration_target()
+    if target and target["field"] not in fields:
+        fields.append(target["field"])
+
+    updated = {field: 0 for field in fields}
+    for field in fields:
+        for chunks in chunk_partitions():
+            last_id = None
+            while True:
+                query = {field: {"$exists": True}, f"{field}_norm": {"$exists": False}}
+                if last_id is not None:
+                    query["_id"] = {"$gt": last_id}
+
+                batch = list(chunks.find(query, {field: 1}).sort("_id", 1).limit(batch_size))
+                if not batch:
+                    break
+
+                operations = []
+                for doc in batch:
+                    vector, norm = normalize_with_norm(doc[field])
+                    operations.append(
+                        UpdateOne({"_id": doc["_id"]}, {"$set": {field: vector, f"{field}_norm": norm}})
+                    )
+                chunks.bulk_write(operations, ordered=False)
+
+                last_id = batch[-1]["_id"]
+                updated[field] += len(batch)
+                if on_batch:
+                    on_batch(field, updated[field])
+
+    return updated
+
+
+def cutover_migration():
+    state = migrations_collection.find_one({"_id": MIGRATION_ID})
+    if not state or state["status"] != "ready":
+        raise MigrationError("The embedding migration is not ready for cut-over")
+
+    target = _profile(state)
+    if any(
+        chunks.find_one({target["field"]: {"$exists": False}}, {"_id": 1})
+        for chunks in chunk_partitions()
+    ):
+        reopen_migration()
+        raise MigrationError("Some chunks have no target vector yet, resume the migration")
+
+    migrations_collection.replace_one(
+        {"_id": ACTIVE_ID},
+        {"_id": ACTIVE_ID, **target, "activated_at": _now()},
+        upsert=True
+    )
+    migrations_collection.update_one(
+        {"_id": MIGRATION_ID},
+        {"$set": {"status": "completed", "updated_at": _now()}}
+    )
+    load_profiles()
+    return active_profile()
+
+
+def migration_progress():
+    state = migrations_collection.find_one({"_id": MIGRATION_ID})
+    if not state:
+        return {"status": "idle", "active": active_profile()}
+
+    total = sum(chunks.estimated_document_count() for chunks in chunk_partitions())
+    percent = 100.0 if not total else min(100.0, 100 * state["processed"] / total)
+    if state["status"] != "running":
+        percent = 100.0
+
+    return {
+        "status": state["status"],
+        "active": active_profile(),
+        "source": state["source"],
+        "target": _profile(state),
+        "processed": state["processed"],
+        "total": total,
+        "percent": round(percent, 1),
+        "worker_running": worker_running(),
+        "last_error": state.get("last_error"),
+        "updated_at": state["updated_at"]
+    }
+
+
+def _run_worker():
+    try:
+        run_migration(stop_event=_stop)
+    except Exception as exc:
+        logger.exception("Embedding migration stopped")
+        migrations_collection.update_one(
+            {"_id": MIGRATION_ID},
+            {"$set": {"last_error": str(exc), "updated_at": _now()}}
+        )
+
+
+def start_worker():
+    global _worker
+
+    with _worker_lock:
+        if worker_running():
+            return False
+        _stop.clear()
+        _worker = threading.Thread(target=_run_worker, name="embedding-migration", daemon=True)
+        _worker.start()
+        return True
+
+
+def stop_worker():
+    _stop.set()
+
+
+def worker_running():
+    return _worker is not None and _worker.is_alive()
+
+
+async def keep_profiles_fresh(interval: int):
+    # Picks up a cut-over performed by another process
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(load_profiles)
+        except Exception as exc:
+            logger.warning("Embedding profile refresh failed: %s", exc)
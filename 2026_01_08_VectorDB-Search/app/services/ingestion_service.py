@@ -1,6 +1,11 @@
-from app.db.mongodb import chunks_collection
+from app.db.partitions import partition_for
 from app.core.ollam_client import get_embedding
 from app.utils.text_splitter import split_text
+from app.core.embedding_profile import migration_target
+from app.services.chunk_documents import build_chunk_document
+from app.core.tracing import span
+from app.core.config import settings
+from app.services.work_queue import enqueue_chunks
 from fastapi import UploadFile, File
 from app.services.pdf_ingestion_service import ingest_pdf
 import shutil
@@ -10,24 +15,39 @@ import uuid
 
 def ingest_document(text: str):
     doc_id = str(uuid.uuid4())
-    chunks = split_text(text)
+    with span("split"):
+        chunks = split_text(text)
+
+    if settings.INGEST_QUEUE:
+        return {
+            "message": "Document queued for embedding",
+            "doc_id": doc_id,
+            "chunks": len(chunks),
+            "jobs": enqueue_chunks(doc_id, chunks)
+        }
 
     documents = []
+    target = migration_target()
 
     for idx, chunk in enumerate(chunks):
         embedding = get_embedding(chunk)
+        target_embedding = get_embedding(chunk, target) if target else None
 
-        documents.append({
-            "doc_id": doc_id,
-            "chunk_index": idx,
-            "text": chunk,
-            "embedding": embedding
-        })
+        documents.append(
+            build_chunk_document(doc_id, idx, chunk, embedding, target_embedding)
+        )
 
-    chunks_collection.insert_many(documents)
+    with span("insert"):
+        partition_for(doc_id).insert_many(documents)
 
     return {
         "message": "Document stored and indexed in MongoDB Atlas",
         "doc_id": doc_id,
         "chunks": len(documents)
     }
+
+
+def delete_document(doc_id: str):
+    # Served by the doc_id index, removes every chunk in a single round trip
+    result = partition_for(doc_id).delete_many({"doc_id": doc_id})
+    return result.deleted_count
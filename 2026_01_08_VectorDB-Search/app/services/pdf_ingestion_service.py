@@ -2,34 +2,51 @@ import uuid
 import os
 from app.utils.pdf_reader import extract_text_from_pdf
 from app.utils.text_splitter import split_text
+from app.core.embedding_profile import migration_target
+from app.services.chunk_documents import build_chunk_document
+from app.core.tracing import span
 from app.core.ollam_client import get_embedding
-from app.db.mongodb import chunks_collection
+from app.db.partitions import partition_for
+from app.core.config import settings
+from app.services.work_queue import enqueue_chunks
 
 
 
 def ingest_pdf(file_path: str):
-    extracted_text = extract_text_from_pdf(file_path)
+    with span("extract"):
+        extracted_text = extract_text_from_pdf(file_path)
 
     if not extracted_text:
         return {"message": "No readable text found in PDF"}
 
     doc_id = str(uuid.uuid4())
-    chunks = split_text(extracted_text)
+    with span("split"):
+        chunks = split_text(extracted_text)
+
+    if settings.INGEST_QUEUE:
+        jobs = enqueue_chunks(doc_id, chunks)
+        os.remove(file_path)
+        return {
+            "message": "PDF queued for embedding",
+            "doc_id": doc_id,
+            "chunks": len(chunks),
+            "jobs": jobs
+        }
 
     documents = []
+    target = migration_target()
 
     for idx, chunk in enumerate(chunks):
         embedding = get_embedding(chunk)
+        target_embedding = get_embedding(chunk, target) if target else None
 
-        documents.append({
-            "doc_id": doc_id,
-            "chunk_index": idx,
-            "text": chunk,
-            "embedding": embedding
-        })
+        documents.append(
+            build_chunk_document(doc_id, idx, chunk, embedding, target_embedding)
+        )
 
     if documents:
-        chunks_collection.insert_many(documents)
+        with span("insert"):
+            partition_for(doc_id).insert_many(documents)
 
     # Cleanup temp file
     os.remove(file_path)
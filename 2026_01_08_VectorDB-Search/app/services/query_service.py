@@ -1,32 +1,299 @@
+import heapq
+import itertools
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import pymongo
+from pymongo.errors import PyMongoError
+
+from app.core.cache import answer_cache, cached_copy, embedding_cache
+from app.core.config import settings
+from app.core.deadline import current_deadline, run_within_deadline, DeadlineExceeded
 from app.db.mongodb import chunks_collection
+from app.db.partitions import chunk_partitions, group_by_partition, partitioned
 from app.core.ollam_client import get_embedding, generate_answer
+from app.core.embedding_profile import active_profile
+from app.core.generation import requested_options
+from app.core.tracing import span
+from app.utils.chunk_codec import decode_chunk_text, chunk_preview, PREVIEW_CHARS
+from app.utils.scoring import cosine_scores
+from app.utils.vectors import l2_normalize
+
+# retrieve: ranked chunks only, no LLM call
+# answer: LLM answer plus chunk previews
+# answer+sources: LLM answer plus the full text of every chunk used
+QUERY_MODES = ("retrieve", "answer", "answer+sources")
+
+# Atlas rejects $vectorSearch with numCandidates (and so limit) above this
+MAX_NUM_CANDIDATES = 10000
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+class SearchResults(list):
+    """Ranked chunks, plus the partitions that did not answer in time."""
+    skipped_partitions = ()
+
+
+def _search_executor():
+    # Shared across requests; rebuilt in a forked child like the clients
+    global _executor, _executor_pid
+
+    pid = os.getpid()
+    if _executor is None or _executor_pid != pid:
+        with _executor_lock:
+            if _executor is None or _executor_pid != pid:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.PARTITION_SEARCH_THREADS,
+                    thread_name_prefix="partition-search"
+                )
+                _executor_pid = pid
+    return _executor
+
+
+def chunk_projection(mode: str = "answer"):
+    projection = {
+        "_id": 0,
+        "doc_id": 1,
+        "chunk_index": 1,
+        # Uncompressed chunks store no preview field and get one computed
+        # server side, so retrieval never has to ship the full text
+        "preview": {
+            "$ifNull": ["$preview", {"$substrCP": ["$text", 0, PREVIEW_CHARS]}]
+        },
+        "score": {"$meta": "vectorSearchScore"}
+    }
+
+    if mode != "retrieve":
+        projection.update({"text": 1, "text_z": 1, "text_codec": 1})
+
+    return projection
+
+
+def query_vector(embedding):
+    # Stored vectors are unit length, so the query must be too for dotProduct
+    return l2_normalize(embedding) if settings.NORMALIZE_EMBEDDINGS else embedding
 
 
-def query_document(question: str, top_k: int = 5):
-    query_embedding = get_embedding(question)
+def embed_question(question: str):
+    """Query vector for question, from the embedding cache when possible."""
+    profile = active_profile()
+    key = (profile["model"], profile["dim"], question)
+    embedding = embedding_cache.get(key)
+    if embedding is None:
+        embedding = query_vector(run_within_deadline("embed", get_embedding, question))
+        embedding_cache.put(key, embedding)
+    return embedding
+
+
+def answer_key(question: str, top_k: int, mode: str, neighbors: int):
+    # Generation options change the answer, so they are part of the key;
+    # the budget cap is left out since it moves with every deadline
+    options, budget = requested_options()
+    options = json.dumps({**options, "budget": budget}, sort_keys=True)
+    return (question, mode, top_k, neighbors, active_profile()["field"], options)
+
+
+def rescore_chunks(results, query_embedding, profile, top_k: int):
+    """Re-rank candidates by exact cosine similarity, computed locally as
+    one matrix-vector product, and strip the vectors from the results."""
+    field = profile["field"]
+    candidates = [r for r in results if r.get(field) is not None]
+    if not candidates:
+        return results[:top_k]
+
+    scores = cosine_scores(
+        [r[field] for r in candidates],
+        query_embedding,
+        unit_rows=[f"{field}_norm" in r for r in candidates]
+    )
+    ranked = sorted(zip(scores.tolist(), range(len(candidates))), reverse=True)[:top_k]
+
+    rescored = SearchResults()
+    for score, position in ranked:
+        chunk = {k: v for k, v in candidates[position].items() if k not in (field, f"{field}_norm")}
+        chunk["score"] = score
+        rescored.append(chunk)
+    rescored.skipped_partitions = getattr(results, "skipped_partitions", ())
+    return rescored
+
+
+def search_chunks(query_embedding, top_k: int = 5, mode: str = "answer"):
+    profile = active_profile()
+    deadline = current_deadline()
+
+    rescore = settings.RESCORE_FACTOR > 0
+    limit = min(top_k * settings.RESCORE_FACTOR if rescore else top_k, MAX_NUM_CANDIDATES)
+    projection = chunk_projection(mode)
+    if rescore:
+        projection.update({profile["field"]: 1, f"{profile['field']}_norm": 1})
+
+    num_candidates = min(max(settings.VECTOR_NUM_CANDIDATES, limit), MAX_NUM_CANDIDATES)
+    if deadline and deadline.remaining_ms() < settings.DEADLINE_REDUCED_SEARCH_MS:
+        # A smaller candidate set answers faster at some cost in recall
+        num_candidates = max(settings.VECTOR_NUM_CANDIDATES // 4, limit)
+        deadline.degrade("reduced_candidates")
 
     pipeline = [
         {
             "$vectorSearch": {
-                "index": "vector_index",
-                "path": "embedding",
+                "index": profile["index"],
+                "path": profile["field"],
                 "queryVector": query_embedding,
-                "numCandidates": 100,
-                "limit": top_k
+                "numCandidates": num_candidates,
+                "limit": limit
             }
         },
         {
-            "$project": {
-                "_id": 0,
-                "chunk_index": 1,
-                "text": 1,
-                "score": {"$meta": "vectorSearchScore"}
-            }
+            "$project": projection
+        }
+    ]
+
+    with span("search"):
+        results = _run_search(pipeline, limit, deadline)
+
+    if rescore:
+        with span("rescore"):
+            results = rescore_chunks(results, query_embedding, profile, top_k)
+    return results
+
+
+def _run_search(pipeline, limit: int, deadline):
+    if partitioned():
+        return search_partitions(pipeline, limit)
+    if deadline is None:
+        return SearchResults(chunks_collection.aggregate(pipeline))
+
+    remaining = deadline.remaining()
+    if remaining <= 0:
+        raise DeadlineExceeded("search")
+    try:
+        # Client-side operation timeout: also sent to the server as maxTimeMS
+        with pymongo.timeout(remaining):
+            return SearchResults(chunks_collection.aggregate(pipeline))
+    except PyMongoError as exc:
+        if getattr(exc, "timeout", False):
+            raise DeadlineExceeded("search") from exc
+        raise
+
+
+def search_partitions(pipeline, top_k: int):
+    """Run the pipeline on every partition concurrently and merge the
+    per-partition rankings into a global top_k.
+
+    A partition that errors or misses PARTITION_TIMEOUT_MS is skipped so
+    one slow shard cannot stall the query; skipped partitions are listed
+    on the result.
+    """
+    timeout_ms = settings.PARTITION_TIMEOUT_MS
+    deadline = current_deadline()
+    if deadline is not None:
+        timeout_ms = min(timeout_ms, deadline.remaining_ms())
+        if timeout_ms <= 0:
+            raise DeadlineExceeded("search")
+    executor = _search_executor()
+
+    futures = {
+        executor.submit(lambda c: list(c.aggregate(pipeline, maxTimeMS=timeout_ms)), collection): index
+        for index, collection in enumerate(chunk_partitions())
+    }
+    # maxTimeMS bounds the server side; the wait bounds the network too
+    done, not_done = wait(futures, timeout=timeout_ms / 1000)
+
+    rankings = []
+    skipped = [futures[future] for future in not_done]
+    for future in done:
+        try:
+            rankings.append(future.result())
+        except Exception as exc:
+            logger.warning("Partition %s search failed: %s", futures[future], exc)
+            skipped.append(futures[future])
+
+    if skipped:
+        logger.warning("Partitions %s skipped for this query", sorted(skipped))
+
+    # Each partition already returns its hits best first: a k-way heap
+    # merge only looks at as many entries as it emits
+    merged = heapq.merge(*rankings, key=lambda r: r["score"], reverse=True)
+    results = SearchResults(itertools.islice(merged, top_k))
+    results.skipped_partitions = sorted(skipped)
+    return results
+
+
+def format_chunks(results, include_text: bool = False):
+    chunks = []
+    for r in results:
+        chunk = {
+            "doc_id": r.get("doc_id"),
+            "chunk_index": r["chunk_index"],
+            "score": round(r["score"], 3),
+            "preview": chunk_preview(r) + "..."
         }
+        if include_text:
+            chunk["text"] = decode_chunk_text(r)
+        chunks.append(chunk)
+    return chunks
+
+
+def neighbor_keys(results, radius: int):
+    """{doc_id: [chunk_index, ...]} within radius of each hit, minus the hits."""
+    have = {(r.get("doc_id"), r["chunk_index"]) for r in results}
+    wanted = {}
+    for r in results:
+        doc_id = r.get("doc_id")
+        if doc_id is None:
+            continue
+        for idx in range(max(r["chunk_index"] - radius, 0), r["chunk_index"] + radius + 1):
+            if (doc_id, idx) not in have:
+                wanted.setdefault(doc_id, set()).add(idx)
+    return {doc_id: sorted(indexes) for doc_id, indexes in wanted.items()}
+
+
+def fetch_neighbors(results, radius: int):
+    """Adjacent chunks of the hits, in one query served by the
+    (doc_id, chunk_index) index (one per partition when partitioned)."""
+    clauses = [
+        {"doc_id": doc_id, "chunk_index": {"$in": indexes}}
+        for doc_id, indexes in neighbor_keys(results, radius).items()
     ]
+    if not clauses:
+        return []
+
+    projection = {"_id": 0, "doc_id": 1, "chunk_index": 1, "text": 1, "text_z": 1, "text_codec": 1}
+    with span("neighbors"):
+        if not partitioned():
+            return list(chunks_collection.find({"$or": clauses}, projection))
+
+        neighbors = []
+        for collection, group in group_by_partition(clauses, doc_id=lambda c: c["doc_id"]):
+            neighbors.extend(collection.find({"$or": group}, projection))
+        return neighbors
+
 
-    results = list(chunks_collection.aggregate(pipeline))
+def order_context(results, neighbors):
+    """Hits plus neighbors, deduplicated and grouped per document in the
+    rank order of each document's best hit, in reading order within it."""
+    documents = {}
+    for position, r in enumerate(list(results) + list(neighbors)):
+        # Legacy chunks without a doc_id cannot be related to anything
+        key = r.get("doc_id") or ("no-doc", position)
+        documents.setdefault(key, {}).setdefault(r["chunk_index"], r)
 
+    return [
+        chunks[idx]
+        for chunks in documents.values()
+        for idx in sorted(chunks)
+    ]
+
+
+def answer_from_chunks(question: str, results, include_text: bool = False, context_chunks=None):
     if not results:
         return {
             "answer": "No relevant information found.",
@@ -34,21 +301,66 @@ def query_document(question: str, top_k: int = 5):
         }
 
     # Build context (FULL chunks)
-    context = "\n".join(r["text"] for r in results)
+    context = "\n".join(decode_chunk_text(r) for r in (context_chunks or results))
 
-    answer = generate_answer(context, question)
-
-    # Reduce response payload
-    chunks_used = [
-        {
-            "chunk_index": r["chunk_index"],
-            "score": round(r["score"], 3),
-            "preview": r["text"][:400] + "..."
-        }
-        for r in results
-    ]
+    deadline = current_deadline()
+    if deadline and deadline.remaining_ms() < settings.DEADLINE_MIN_GENERATE_MS:
+        # Not enough time left for the LLM: return what was retrieved
+        deadline.degrade("answer_skipped")
+        answer = None
+    else:
+        try:
+            answer = run_within_deadline("generate", generate_answer, context, question)
+        except DeadlineExceeded:
+            deadline.degrade("answer_timeout")
+            answer = None
 
     return {
         "answer": answer,
-        "chunks_used": chunks_used
+        "chunks_used": format_chunks(results, include_text)
     }
+
+
+def query_document(question: str, top_k: int = 5, mode: str = "answer", neighbors: int = None):
+    """Answer a question from the top_k chunks.
+
+    With neighbors=N the ±N chunks around each hit are added to the LLM
+    context, which often beats raising top_k.
+    """
+    if mode not in QUERY_MODES:
+        raise ValueError(f"Unknown query mode: {mode}")
+    neighbors = settings.NEIGHBOR_CHUNKS if neighbors is None else neighbors
+
+    key = answer_key(question, top_k, mode, neighbors) if answer_cache.enabled else None
+    if key is not None:
+        cached = answer_cache.get(key)
+        if cached is not None:
+            return cached_copy(cached)
+
+    results = search_chunks(embed_question(question), top_k, mode)
+
+    if mode == "retrieve":
+        response = {"chunks_used": format_chunks(results)}
+    elif neighbors > 0 and results:
+        context_chunks = order_context(results, fetch_neighbors(results, neighbors))
+        response = answer_from_chunks(
+            question, results, include_text=(mode == "answer+sources"), context_chunks=context_chunks
+        )
+        response["context_chunks"] = [
+            {"doc_id": c.get("doc_id"), "chunk_index": c["chunk_index"]}
+            for c in context_chunks
+        ]
+    else:
+        response = answer_from_chunks(question, results, include_text=(mode == "answer+sources"))
+
+    if getattr(results, "skipped_partitions", None):
+        response["partitions_skipped"] = results.skipped_partitions
+
+    deadline = current_deadline()
+    if deadline and deadline.degraded:
+        response["degraded"] = list(deadline.degraded)
+
+    # Partial answers (degraded, partitions missing) are never cached
+    if key is not None and "degraded" not in response and "partitions_skipped" not in response:
+        answer_cache.put(key, cached_copy(response))
+    return response
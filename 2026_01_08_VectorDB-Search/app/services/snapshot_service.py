@@ -0,0 +1,263 @@
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+from bson import json_util
+
+from app.core.config import settings
+from app.core.embedding_profile import active_profile, migration_target
+from app.db.partitions import chunk_partitions, group_by_partition, partitioned
+
+SNAPSHOT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+
+# Text and metadata columns; vector fields add <field>_model / <field>_dim
+BASE_COLUMNS = {
+    "doc_id": "string",
+    "chunk_index": "int64",
+    "text": "string",
+    "text_z": "binary",
+    "text_codec": "string",
+    "preview": "string"
+}
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise RuntimeError(
+            "Parquet snapshots require the 'pyarrow' package; use the jsonl format instead"
+        ) from exc
+    return pyarrow
+
+
+def default_format() -> str:
+    try:
+        _pyarrow()
+    except RuntimeError:
+        return "jsonl"
+    return "parquet"
+
+
+def snapshot_columns(profiles):
+    columns = dict(BASE_COLUMNS)
+    for profile in profiles:
+        columns[f"{profile['field']}_model"] = "string"
+        columns[f"{profile['field']}_dim"] = "int64"
+        columns[f"{profile['field']}_norm"] = "float64"
+    return columns
+
+
+class _ParquetWriter:
+    def __init__(self, path, columns):
+        pa = _pyarrow()
+        self._pa = pa
+        self._schema = pa.schema([(name, getattr(pa, kind)()) for name, kind in columns.items()])
+        self._writer = pa.parquet.ParquetWriter(path, self._schema, compression="zstd")
+
+    def write(self, rows):
+        self._writer.write_table(self._pa.Table.from_pylist(rows, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+class _JsonlWriter:
+    def __init__(self, path, columns):
+        self._file = open(path, "w", encoding="utf-8")
+
+    def write(self, rows):
+        # json_util keeps compressed text_z bytes intact
+        self._file.writelines(json_util.dumps(row) + "\n" for row in rows)
+
+    def close(self):
+        self._file.close()
+
+
+def _read_metadata(path, fmt, batch_size):
+    if fmt == "parquet":
+        parquet = _pyarrow().parquet.ParquetFile(path)
+        for batch in parquet.iter_batches(batch_size=batch_size):
+            yield batch.to_pylist()
+        return
+
+    with open(path, encoding="utf-8") as f:
+        rows = []
+        for line in f:
+            rows.append(json_util.loads(line))
+            if len(rows) == batch_size:
+                yield rows
+                rows = []
+        if rows:
+            yield rows
+
+
+def export_snapshot(directory: str, fmt: str = None, batch_size: int = None):
+    """Dump every chunk partition to directory as a columnar snapshot.
+
+    Each vector field becomes a float32 <field>.npy matrix (rows missing
+    that field are NaN), and text plus metadata go to chunks.parquet, or
+    chunks.jsonl when pyarrow is not installed. Row i of every file is
+    the same chunk.
+    """
+    fmt = fmt or default_format()
+    batch_size = batch_size or settings.SNAPSHOT_BATCH_SIZE
+    started = time.perf_counter()
+
+    profiles = [p for p in (active_profile(), migration_target()) if p]
+    columns = snapshot_columns(profiles)
+    os.makedirs(directory, exist_ok=True)
+
+    # The count is taken up front to size the matrices; chunks written
+    # while the export runs may or may not be included
+    collections = chunk_partitions()
+    count = sum(collection.count_documents({}) for collection in collections)
+    matrices = {
+        p["field"]: np.lib.format.open_memmap(
+            os.path.join(directory, f"{p['field']}.npy"),
+            mode="w+", dtype=np.float32, shape=(count, p["dim"])
+        )
+        for p in profiles
+    }
+
+    metadata_name = f"chunks.{fmt}"
+    writer = (_ParquetWriter if fmt == "parquet" else _JsonlWriter)(
+        os.path.join(directory, metadata_name), columns
+    )
+
+    projection = {"_id": 0, **{name: 1 for name in columns}, **{field: 1 for field in matrices}}
+    cursors = [
+        collection.find({}, projection, batch_size=batch_size).sort("_id", 1)
+        for collection in collections
+    ]
+
+    written = 0
+    rows = []
+    try:
+        for doc in itertools.islice(itertools.chain.from_iterable(cursors), count):
+            for field, matrix in matrices.items():
+                vector = doc.get(field)
+                if vector is not None and len(vector) == matrix.shape[1]:
+                    matrix[written] = vector
+                else:
+                    matrix[written] = np.nan
+            rows.append({name: doc.get(name) for name in columns})
+            written += 1
+
+            if len(rows) == batch_size:
+                writer.write(rows)
+                rows = []
+        if rows:
+            writer.write(rows)
+    finally:
+        writer.close()
+        for matrix in matrices.values():
+            matrix.flush()
+
+    manifest = {
+        "version": SNAPSHOT_VERSION,
+        "count": written,
+        "metadata": metadata_name,
+        "format": fmt,
+        "vectors": [
+            {"field": p["field"], "model": p["model"], "dim": p["dim"], "file": f"{p['field']}.npy"}
+            for p in profiles
+        ],
+        "created_at": time.time()
+    }
+    with open(os.path.join(directory, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    elapsed = time.perf_counter() - started
+    return {**manifest, "elapsed_ms": round(elapsed * 1000, 1)}
+
+
+def load_manifest(directory: str):
+    with open(os.path.join(directory, MANIFEST_NAME), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version: {manifest.get('version')}")
+    return manifest
+
+
+def _snapshot_documents(rows, vectors, start):
+    documents = []
+    for offset, row in enumerate(rows):
+        document = {name: value for name, value in row.items() if value is not None}
+        for field, matrix in vectors.items():
+            vector = matrix[start + offset]
+            if np.isnan(vector[0]):
+                # The chunk had no vector for this field when exported
+                document.pop(f"{field}_model", None)
+                document.pop(f"{field}_dim", None)
+                document.pop(f"{field}_norm", None)
+                continue
+            document[field] = vector.tolist()
+        documents.append(document)
+    return documents
+
+
+def import_snapshot(directory: str, drop: bool = False, batch_size: int = None):
+    """Bulk-load a snapshot written by export_snapshot into the chunk partitions.
+
+    Vectors are memory-mapped rather than read into memory, and rows are
+    written with unordered insert_many batches, SNAPSHOT_INSERT_CONCURRENCY
+    at a time. No embeddings are recomputed.
+    """
+    manifest = load_manifest(directory)
+    batch_size = batch_size or settings.SNAPSHOT_BATCH_SIZE
+    started = time.perf_counter()
+
+    vectors = {
+        entry["field"]: np.load(os.path.join(directory, entry["file"]), mmap_mode="r")
+        for entry in manifest["vectors"]
+    }
+
+    if drop:
+        for collection in chunk_partitions():
+            collection.delete_many({})
+
+    metadata = os.path.join(directory, manifest["metadata"])
+    max_in_flight = settings.SNAPSHOT_INSERT_CONCURRENCY * 2
+    in_flight = set()
+    inserted = 0
+
+    def insert(documents):
+        if not partitioned():
+            chunk_partitions()[0].insert_many(documents, ordered=False)
+        else:
+            # Rows are routed by doc_id, so a snapshot can be restored into
+            # a different partition layout than it was exported from
+            for collection, group in group_by_partition(documents, doc_id=lambda d: d["doc_id"]):
+                collection.insert_many(group, ordered=False)
+        return len(documents)
+
+    def settle(done):
+        nonlocal inserted
+        for future in done:
+            in_flight.discard(future)
+            inserted += future.result()
+
+    with ThreadPoolExecutor(max_workers=settings.SNAPSHOT_INSERT_CONCURRENCY) as writers:
+        start = 0
+        for rows in _read_metadata(metadata, manifest["format"], batch_size):
+            if len(in_flight) >= max_in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                settle(done)
+            in_flight.add(writers.submit(insert, _snapshot_documents(rows, vectors, start)))
+            start += len(rows)
+
+        settle(wait(in_flight).done)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "inserted": inserted,
+        "vectors": [entry["field"] for entry in manifest["vectors"]],
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "chunks_per_second": round(inserted / elapsed, 1) if elapsed else 0.0
+    }
@@ -0,0 +1,214 @@
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from pymongo import ReturnDocument, ReplaceOne
+
+from app.core.admission import background_scope
+from app.core.config import settings
+from app.core.embedding_profile import migration_target
+from app.core.ollam_client import get_embeddings
+from app.core.tracing import span
+from app.db.mongodb import jobs_collection
+from app.db.partitions import group_by_partition
+from app.services.chunk_documents import build_chunk_document
+
+logger = logging.getLogger(__name__)
+
+# queued: waiting, or waiting to be retried once visible_at passes
+# leased: held by a worker until visible_at, then up for grabs again
+JOB_STATUSES = ("queued", "leased", "done", "failed")
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _job(items):
+    now = _now()
+    return {
+        "_id": str(uuid.uuid4()),
+        "status": "queued",
+        "doc_ids": sorted({item["doc_id"] for item in items}),
+        "items": items,
+        "attempts": 0,
+        "visible_at": now,
+        "created_at": now
+    }
+
+
+def enqueue_batch(batch):
+    """Queue one batch of (doc_id, chunk_index, text) as a single job."""
+    items = [
+        {"doc_id": doc_id, "chunk_index": idx, "text": text}
+        for doc_id, idx, text in batch
+    ]
+    job = _job(items)
+    with span("enqueue"):
+        jobs_collection.insert_one(job)
+    return job["_id"]
+
+
+def enqueue_chunks(doc_id: str, chunks):
+    """Queue a document's chunks in BULK_EMBED_BATCH_SIZE jobs; returns the job count."""
+    size = settings.BULK_EMBED_BATCH_SIZE
+    jobs = [
+        _job([
+            {"doc_id": doc_id, "chunk_index": idx, "text": chunk}
+            for idx, chunk in enumerate(chunks[start:start + size], start)
+        ])
+        for start in range(0, len(chunks), size)
+    ]
+    if jobs:
+        with span("enqueue"):
+            jobs_collection.insert_many(jobs)
+    return len(jobs)
+
+
+def lease_job(worker_id: str, visibility_timeout: float = None):
+    """Atomically claim the oldest visible job, or return None.
+
+    A lease only hides the job until visible_at; a worker that dies
+    mid-job simply lets it become visible to the others again.
+    """
+    visibility_timeout = visibility_timeout or settings.JOB_VISIBILITY_TIMEOUT
+    now = _now()
+
+    return jobs_collection.find_one_and_update(
+        {
+            "status": {"$in": ["queued", "leased"]},
+            "visible_at": {"$lte": now},
+            "attempts": {"$lt": settings.JOB_MAX_ATTEMPTS}
+        },
+        {
+            "$set": {
+                "status": "leased",
+                "worker": worker_id,
+                "visible_at": now + timedelta(seconds=visibility_timeout),
+                "leased_at": now
+            },
+            "$inc": {"attempts": 1}
+        },
+        sort=[("visible_at", 1)],
+        return_document=ReturnDocument.AFTER
+    )
+
+
+def process_job(job):
+    """Embed a job's chunks and upsert them, so a job that runs twice
+    (after a lease expired) never duplicates chunks."""
+    items = job["items"]
+    texts = [item["text"] for item in items]
+    target = migration_target()
+    with background_scope():
+        embeddings = get_embeddings(texts)
+        target_embeddings = get_embeddings(texts, target) if target else [None] * len(texts)
+
+    documents = [
+        build_chunk_document(item["doc_id"], item["chunk_index"], item["text"], embedding, target_embedding)
+        for item, embedding, target_embedding in zip(items, embeddings, target_embeddings)
+    ]
+    with span("insert"):
+        for collection, group in group_by_partition(documents, doc_id=lambda d: d["doc_id"]):
+            collection.bulk_write(
+                [
+                    ReplaceOne({"doc_id": d["doc_id"], "chunk_index": d["chunk_index"]}, d, upsert=True)
+                    for d in group
+                ],
+                ordered=False
+            )
+
+
+def complete_job(job, worker_id: str):
+    # Matching on the worker skips jobs whose lease was lost to another worker
+    jobs_collection.update_one(
+        {"_id": job["_id"], "status": "leased", "worker": worker_id},
+        {"$set": {"status": "done", "finished_at": _now()}, "$unset": {"items": ""}}
+    )
+
+
+def fail_job(job, worker_id: str, error: str):
+    attempts = job.get("attempts", 0)
+    exhausted = attempts >= settings.JOB_MAX_ATTEMPTS
+    backoff = settings.JOB_RETRY_BACKOFF * 2 ** max(attempts - 1, 0)
+
+    jobs_collection.update_one(
+        {"_id": job["_id"], "status": "leased", "worker": worker_id},
+        {"$set": {
+            "status": "failed" if exhausted else "queued",
+            "visible_at": _now() + timedelta(seconds=backoff),
+            "error": error
+        }}
+    )
+
+
+def fail_expired_jobs():
+    """Mark jobs whose last permitted lease expired as failed."""
+    result = jobs_collection.update_many(
+        {
+            "status": "leased",
+            "visible_at": {"$lte": _now()},
+            "attempts": {"$gte": settings.JOB_MAX_ATTEMPTS}
+        },
+        {"$set": {"status": "failed", "error": "Lease expired on the final attempt"}}
+    )
+    return result.modified_count
+
+
+def run_job(job, worker_id: str):
+    try:
+        process_job(job)
+    except Exception as exc:
+        logger.warning("Job %s failed on attempt %s: %s", job["_id"], job.get("attempts"), exc)
+        fail_job(job, worker_id, str(exc))
+        return False
+
+    complete_job(job, worker_id)
+    return True
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def run_worker(worker_id: str = None, stop_event=None, poll_interval: float = None, exit_when_idle: bool = False):
+    """Lease and process jobs until stop_event is set.
+
+    Returns the number of jobs completed. With exit_when_idle the worker
+    returns as soon as no job is visible, which benchmarks and one-off
+    drains use.
+    """
+    worker_id = worker_id or default_worker_id()
+    poll_interval = settings.JOB_POLL_INTERVAL if poll_interval is None else poll_interval
+    completed = 0
+
+    while stop_event is None or not stop_event.is_set():
+        job = lease_job(worker_id)
+        if job is None:
+            fail_expired_jobs()
+            if exit_when_idle:
+                break
+            if stop_event is not None:
+                stop_event.wait(poll_interval)
+            else:
+                time.sleep(poll_interval)
+            continue
+
+        if run_job(job, worker_id):
+            completed += 1
+
+    return completed
+
+
+def queue_status(doc_id: str = None):
+    match = {"doc_ids": doc_id} if doc_id else {}
+    counts = {status: 0 for status in JOB_STATUSES}
+    for row in jobs_collection.aggregate([
+        {"$match": match},
+        {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+    ]):
+        counts[row["_id"]] = row["count"]
+    return counts
@@ -0,0 +1,64 @@
+import zlib
+
+from app.core.config import settings
+
+PREVIEW_CHARS = 400
+
+CODECS = ("none", "zlib", "zstd")
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError as exc:
+        raise RuntimeError(
+            "CHUNK_TEXT_COMPRESSION=zstd requires the 'zstandard' package"
+        ) from exc
+    return zstandard
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    if codec == "zlib":
+        return zlib.compress(data, 6)
+    if codec == "zstd":
+        return _zstd().ZstdCompressor(level=3).compress(data)
+    raise ValueError(f"Unknown chunk text codec: {codec}")
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zlib":
+        return zlib.decompress(data)
+    if codec == "zstd":
+        return _zstd().ZstdDecompressor().decompress(data)
+    raise ValueError(f"Unknown chunk text codec: {codec}")
+
+
+def encode_chunk_text(text: str, codec: str = None):
+    """Stored text fields of a chunk: the plain text, or with a codec
+    configured the text compressed into text_z plus a small plain preview."""
+    codec = codec or settings.CHUNK_TEXT_COMPRESSION
+
+    if codec == "none":
+        # The preview is a prefix of text, derived on read by chunk_preview
+        # and chunk_projection instead of being stored twice
+        return {"text": text}
+
+    return {
+        "preview": text[:PREVIEW_CHARS],
+        "text_z": compress(text.encode("utf-8"), codec),
+        "text_codec": codec
+    }
+
+
+def decode_chunk_text(doc: dict) -> str:
+    if "text_z" in doc:
+        return decompress(doc["text_z"], doc["text_codec"]).decode("utf-8")
+    return doc["text"]
+
+
+def chunk_preview(doc: dict) -> str:
+    # Uncompressed chunks, and those written before previews existed, only
+    # carry the full text
+    if "preview" in doc:
+        return doc["preview"]
+    return doc["text"][:PREVIEW_CHARS]
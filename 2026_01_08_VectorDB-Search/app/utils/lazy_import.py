@@ -0,0 +1,16 @@
+import importlib.util
+import sys
+
+
+def lazy_import(name: str):
+    """Return a module that is only executed on first attribute access."""
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
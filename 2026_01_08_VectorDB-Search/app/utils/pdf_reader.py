@@ -1,8 +1,11 @@
-from pypdf import PdfReader
+from app.utils.lazy_import import lazy_import
+
+# Deferred so pypdf is only loaded by processes that actually read PDFs
+pypdf = lazy_import("pypdf")
 
 
 def extract_text_from_pdf(file_path: str) -> str:
-    reader = PdfReader(file_path)
+    reader = pypdf.PdfReader(file_path)
     text = ""
 
     for page in reader.pages:
@@ -0,0 +1,38 @@
+from app.utils.lazy_import import lazy_import
+
+# Deferred: only local rescoring and benchmarks need NumPy
+np = lazy_import("numpy")
+
+
+def as_matrix(vectors):
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def dot_scores(matrix, query):
+    """Scores of every row against query as one matrix-vector product.
+
+    Equals cosine similarity when rows and query are unit length, which is
+    how vectors are stored with NORMALIZE_EMBEDDINGS.
+    """
+    return as_matrix(matrix) @ as_matrix(query)
+
+
+def cosine_scores(matrix, query, unit_rows=None):
+    """Cosine similarity of every row against query.
+
+    Rows flagged in unit_rows are known to be unit length (a stored norm
+    exists) and skip the norm computation; the rest, e.g. chunks written
+    before normalization, are divided by their norms.
+    """
+    matrix = as_matrix(matrix)
+    query = as_matrix(query)
+    query_norm = np.linalg.norm(query)
+    scores = matrix @ (query / query_norm if query_norm else query)
+
+    if unit_rows is None or not all(unit_rows):
+        raw = ~np.asarray(unit_rows, dtype=bool) if unit_rows is not None else slice(None)
+        norms = np.linalg.norm(matrix[raw], axis=1)
+        norms[norms == 0] = 1.0
+        scores[raw] /= norms
+
+    return scores
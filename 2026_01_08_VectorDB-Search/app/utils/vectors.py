@@ -0,0 +1,21 @@
+import math
+
+
+def l2_normalize(vector):
+    return normalize_with_norm(vector)[0]
+
+
+def normalize_with_norm(vector):
+    """Return (unit-length vector, original L2 norm)."""
+    norm = math.sqrt(sum(x * x for x in vector))
+    if norm == 0:
+        return list(vector), 0.0
+    return [x / norm for x in vector], norm
+
+
+def truncate_embedding(embedding, dim: int):
+    # Matryoshka models front-load information, so the leading dims are a
+    # usable embedding on their own once re-normalized to unit length
+    if dim <= 0 or len(embedding) <= dim:
+        return embedding
+    return l2_normalize(embedding[:dim])
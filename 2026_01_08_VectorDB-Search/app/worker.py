@@ -0,0 +1,68 @@
+"""Ingestion worker: leases chunk-embedding jobs from the work queue.
+
+    python -m app.worker [--id NAME] [--drain]
+
+Run any number of these, on any number of hosts, against the same
+MongoDB. The API enqueues when INGEST_QUEUE is enabled.
+"""
+import argparse
+import logging
+import signal
+import sys
+import threading
+
+from app.core.config import settings
+from app.core.ollam_client import preload_models
+from app.db.mongodb import close_client
+from app.services.embedding_migration import load_profiles
+from app.services.work_queue import run_worker, default_worker_id
+
+logger = logging.getLogger(__name__)
+
+
+def refresh_profiles(stop, interval: float):
+    # Picks up migrations started or cut over while the worker runs
+    while not stop.wait(interval):
+        try:
+            load_profiles()
+        except Exception as exc:
+            logger.warning("Embedding profile refresh failed: %s", exc)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.worker")
+    parser.add_argument("--id", default=None, help="Worker id (default: host:pid)")
+    parser.add_argument("--drain", action="store_true", help="Exit once the queue is empty")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    worker_id = args.id or default_worker_id()
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        # A job being processed is finished before the worker exits
+        signal.signal(signum, lambda *_: stop.set())
+
+    load_profiles()
+    try:
+        preload_models()
+    except Exception as exc:
+        logger.warning("Model warm-up failed: %s", exc)
+
+    if settings.PROFILE_REFRESH_INTERVAL > 0:
+        threading.Thread(
+            target=refresh_profiles,
+            args=(stop, settings.PROFILE_REFRESH_INTERVAL),
+            daemon=True
+        ).start()
+
+    logger.info("Worker %s started", worker_id)
+    completed = run_worker(worker_id, stop, exit_when_idle=args.drain)
+    logger.info("Worker %s stopped after %s jobs", worker_id, completed)
+
+    close_client()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""Recall and scoring latency of truncated (Matryoshka) embeddings.
+
+Uses the real mxbai-embed-large vectors in chunk_embeddings.json: every
+chunk is used as a query, the exact top-k at full dimensionality is the
+ground truth, and each truncated dimensionality is scored against it.
+
+    python -m benchmarks.embedding_dims --dims 256 512 1024 --top-k 5
+"""
+import argparse
+import json
+import os
+import time
+
+from app.utils.vectors import l2_normalize, truncate_embedding
+
+DEFAULT_DATASET = os.path.join(
+    os.path.dirname(__file__), "..", "chunk_embeddings.json"
+)
+
+
+def load_embeddings(path: str = DEFAULT_DATASET):
+    with open(path) as f:
+        return [doc["embedding"] for doc in json.load(f)]
+
+
+def dot(a, b):
+    return sum(x * y for x, y in zip(a, b))
+
+
+def top_k(query, corpus, k: int, exclude: int):
+    scored = [
+        (dot(query, vector), idx)
+        for idx, vector in enumerate(corpus)
+        if idx != exclude
+    ]
+    scored.sort(reverse=True)
+    return [idx for _, idx in scored[:k]]
+
+
+def run(embeddings, dims, k: int = 5, repeat: int = 3):
+    full = [l2_normalize(e) for e in embeddings]
+    truth = [top_k(q, full, k, exclude=i) for i, q in enumerate(full)]
+
+    report = []
+    for dim in dims:
+        corpus = [l2_normalize(truncate_embedding(e, dim)) for e in embeddings]
+
+        hits = 0
+        started = time.perf_counter()
+        for _ in range(repeat):
+            results = [top_k(q, corpus, k, exclude=i) for i, q in enumerate(corpus)]
+        elapsed = time.perf_counter() - started
+
+        for found, expected in zip(results, truth):
+            hits += len(set(found) & set(expected))
+
+        queries = len(corpus) * repeat
+        report.append({
+            "dim": dim,
+            "recall_at_k": hits / (len(truth) * k),
+            "ms_per_query": elapsed * 1000 / queries,
+            "bytes_per_vector": dim * 4
+        })
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dataset", default=DEFAULT_DATASET)
+    parser.add_argument("--dims", type=int, nargs="+", default=[256, 512, 1024])
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    embeddings = load_embeddings(args.dataset)
+    print(f"{len(embeddings)} chunks, recall@{args.top_k} vs. full dimensionality")
+    print(f"{'dim':>6} {'recall':>8} {'ms/query':>10} {'bytes/vec':>10}")
+    for row in run(embeddings, args.dims, args.top_k, args.repeat):
+        print(
+            f"{row['dim']:>6} {row['recall_at_k']:>8.3f} "
+            f"{row['ms_per_query']:>10.3f} {row['bytes_per_vector']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Replay a /query log against an instance and compare two runs.
+
+The log is the JSONL written with QUERY_LOG_PATH. Requests are re-issued
+at their original spacing divided by --speed (0 sends them back to back,
+bounded by --concurrency), and every response is stored in the log's own
+record shape, so either a log or a replay can be a side of a comparison.
+
+    python -m benchmarks.replay run queries.jsonl --target http://localhost:8000 --speed 2 --out new.jsonl
+    python -m benchmarks.replay compare queries.jsonl new.jsonl
+"""
+import argparse
+import json
+import re
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+PERCENTILES = (50, 90, 99)
+
+
+def load_records(path: str):
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                records.append(json.loads(line))
+    return sorted(records, key=lambda r: r["ts"])
+
+
+def write_records(path: str, records):
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+
+def replay_one(client, record):
+    started = time.perf_counter()
+    try:
+        response = client.get("/query", params=record["params"])
+        status = response.status_code
+        body = response.json() if status == 200 else {}
+        chunks = [[c.get("doc_id"), c["chunk_index"]] for c in body.get("chunks_used", [])]
+    except Exception:
+        # Transport errors, a non-JSON body or an unexpected shape all count
+        # as a failed request rather than leaving a hole in the results
+        status, body, chunks = 0, {}, []
+    latency_ms = (time.perf_counter() - started) * 1000
+
+    return {
+        # The original timestamp keeps replays aligned with their log
+        "ts": record["ts"],
+        "params": record["params"],
+        "status": status,
+        "latency_ms": round(latency_ms, 2),
+        "answer": body.get("answer"),
+        "chunks": chunks,
+        "degraded": body.get("degraded", [])
+    }
+
+
+def replay(records, client, speed: float = 1.0, concurrency: int = 32):
+    """Re-issue the logged queries through client (anything with an
+    httpx-style get), keeping their relative timing scaled by speed.
+
+    A request is sent late rather than dropped when every slot is busy;
+    results keep the order of the log.
+    """
+    results = [None] * len(records)
+    slots = threading.BoundedSemaphore(concurrency)
+
+    def run(index):
+        try:
+            results[index] = replay_one(client, records[index])
+        finally:
+            slots.release()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        started = time.perf_counter()
+        first_ts = records[0]["ts"] if records else 0
+        for index, record in enumerate(records):
+            if speed > 0:
+                delay = (record["ts"] - first_ts) / speed - (time.perf_counter() - started)
+                if delay > 0:
+                    time.sleep(delay)
+            slots.acquire()
+            pool.submit(run, index)
+
+    return results
+
+
+def percentile(values, pct: float):
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def latency_summary(records):
+    ok = [r["latency_ms"] for r in records if r["status"] == 200]
+    summary = {f"p{pct}": percentile(ok, pct) for pct in PERCENTILES}
+    summary["mean"] = statistics.fmean(ok) if ok else None
+    summary["requests"] = len(records)
+    summary["errors"] = sum(1 for r in records if r["status"] != 200)
+    summary["degraded"] = sum(1 for r in records if r.get("degraded"))
+    return summary
+
+
+def _tokens(text):
+    return set(re.findall(r"\w+", (text or "").lower()))
+
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def compare(baseline, candidate):
+    """Latency distributions of both runs, plus how much the answers and
+    retrieved chunks of the queries both runs served agree."""
+    pairs = [
+        (a, b) for a, b in zip(baseline, candidate)
+        if a["params"] == b["params"] and a["status"] == 200 and b["status"] == 200
+    ]
+    chunk_overlap = [jaccard({tuple(c) for c in a["chunks"]}, {tuple(c) for c in b["chunks"]}) for a, b in pairs]
+    answer_overlap = [jaccard(_tokens(a["answer"]), _tokens(b["answer"])) for a, b in pairs]
+
+    return {
+        "baseline": latency_summary(baseline),
+        "candidate": latency_summary(candidate),
+        "compared": len(pairs),
+        "chunk_overlap": statistics.fmean(chunk_overlap) if pairs else None,
+        "identical_chunks": sum(1 for o in chunk_overlap if o == 1.0),
+        "answer_overlap": statistics.fmean(answer_overlap) if pairs else None,
+        "identical_answers": sum(1 for a, b in pairs if a["answer"] == b["answer"])
+    }
+
+
+def _ms(value):
+    return "-" if value is None else f"{value:.1f}"
+
+
+def print_report(report):
+    print(f"{'':>10} {'requests':>9} {'errors':>7} {'p50':>8} {'p90':>8} {'p99':>8} {'mean':>8}")
+    for side in ("baseline", "candidate"):
+        s = report[side]
+        print(
+            f"{side:>10} {s['requests']:>9} {s['errors']:>7} {_ms(s['p50']):>8} "
+            f"{_ms(s['p90']):>8} {_ms(s['p99']):>8} {_ms(s['mean']):>8}"
+        )
+    if report["compared"]:
+        print(
+            f"{report['compared']} queries compared: chunk overlap {report['chunk_overlap']:.3f} "
+            f"({report['identical_chunks']} identical), answer overlap {report['answer_overlap']:.3f} "
+            f"({report['identical_answers']} identical)"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Replay a log against a target instance")
+    run_parser.add_argument("log")
+    run_parser.add_argument("--target", default="http://localhost:8000")
+    run_parser.add_argument("--speed", type=float, default=1.0, help="Time scale; 0 replays back to back")
+    run_parser.add_argument("--concurrency", type=int, default=32)
+    run_parser.add_argument("--timeout", type=float, default=120.0)
+    run_parser.add_argument("--out", required=True, help="Where to write the replay results")
+
+    compare_parser = commands.add_parser("compare", help="Compare two logs or replay results")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        records = load_records(args.log)
+        limits = httpx.Limits(max_connections=args.concurrency)
+        with httpx.Client(base_url=args.target, timeout=args.timeout, limits=limits) as client:
+            results = replay(records, client, args.speed, args.concurrency)
+        write_records(args.out, results)
+        print_report(compare(records, results))
+    else:
+        print_report(compare(load_records(args.baseline), load_records(args.candidate)))
+
+
+if __name__ == "__main__":
+    main()
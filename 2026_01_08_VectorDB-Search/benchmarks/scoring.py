@@ -0,0 +1,83 @@
+"""Cost of scoring a query against a candidate set, per storage layout.
+
+Compares cosine similarity on raw vectors (norms recomputed per query, as
+rescoring had to before NORMALIZE_EMBEDDINGS) with a plain dot product on
+unit vectors, in pure Python and as one NumPy matrix-vector product. The
+bundled chunk_embeddings.json vectors are tiled up to --candidates rows.
+
+    python -m benchmarks.scoring --candidates 100 1000 10000
+"""
+import argparse
+import math
+import time
+
+from app.utils.scoring import as_matrix, cosine_scores, dot_scores
+from app.utils.vectors import l2_normalize
+from benchmarks.embedding_dims import DEFAULT_DATASET, load_embeddings
+
+
+def python_cosine(matrix, query):
+    query_norm = math.sqrt(sum(x * x for x in query))
+    return [
+        sum(x * y for x, y in zip(row, query)) / (math.sqrt(sum(x * x for x in row)) * query_norm)
+        for row in matrix
+    ]
+
+
+def python_dot(matrix, query):
+    return [sum(x * y for x, y in zip(row, query)) for row in matrix]
+
+
+def tile(embeddings, count: int):
+    return [embeddings[i % len(embeddings)] for i in range(count)]
+
+
+def timed(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) * 1000 / repeat
+
+
+def run(embeddings, sizes, repeat: int = 10):
+    query = embeddings[0]
+    unit_query = l2_normalize(query)
+
+    report = []
+    for size in sizes:
+        raw = tile(embeddings, size)
+        unit = [l2_normalize(row) for row in raw]
+        raw_matrix, unit_matrix = as_matrix(raw), as_matrix(unit)
+        # Python is orders of magnitude slower: fewer rounds keep runs short
+        python_repeat = max(1, repeat // 10)
+
+        report.append({
+            "candidates": size,
+            "python_cosine_ms": timed(lambda: python_cosine(raw, query), python_repeat),
+            "python_dot_ms": timed(lambda: python_dot(unit, unit_query), python_repeat),
+            "numpy_cosine_ms": timed(lambda: cosine_scores(raw_matrix, query), repeat),
+            "numpy_dot_ms": timed(lambda: dot_scores(unit_matrix, unit_query), repeat)
+        })
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dataset", default=DEFAULT_DATASET)
+    parser.add_argument("--candidates", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    embeddings = load_embeddings(args.dataset)
+    print(f"{len(embeddings[0])}-dim vectors, ms per query")
+    print(f"{'rows':>7} {'py cosine':>10} {'py dot':>10} {'np cosine':>10} {'np dot':>10}")
+    for row in run(embeddings, args.candidates, args.repeat):
+        print(
+            f"{row['candidates']:>7} {row['python_cosine_ms']:>10.3f} {row['python_dot_ms']:>10.3f} "
+            f"{row['numpy_cosine_ms']:>10.3f} {row['numpy_dot_ms']:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""A tiny HTTP stand-in for the Ollama API, for tests and benchmarks.
+
+Serves /api/embeddings, /api/embed, /api/generate and /api/tags with
+fixed responses, an adjustable artificial latency, an on/off failure
+switch and an optional list of installed models, so pooling, hedging and throughput can be measured without a GPU.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StandInOllama:
+    def __init__(self, delay: float = 0.0, dim: int = 1024, name: str = "standin"):
+        self.delay = delay
+        self.dim = dim
+        self.name = name
+        self.failing = False
+        # None serves any model; a list answers others with Ollama's 404
+        self.models = None
+        self.requests = 0
+        self._lock = threading.Lock()
+
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status: int, body: dict):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                if standin.failing:
+                    return self._reply(500, {"error": "node down"})
+                self._reply(200, {"models": []})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                with standin._lock:
+                    standin.requests += 1
+                if standin.delay:
+                    time.sleep(standin.delay)
+                if standin.failing:
+                    return self._reply(500, {"error": "node down"})
+                if standin.models is not None and request.get("model") not in standin.models:
+                    return self._reply(404, {"error": f"model '{request.get('model')}' not found"})
+
+                vector = [0.1] * standin.dim
+                if self.path == "/api/embeddings":
+                    self._reply(200, {"embedding": vector})
+                elif self.path == "/api/embed":
+                    inputs = request.get("input", [])
+                    count = 1 if isinstance(inputs, str) else len(inputs)
+                    self._reply(200, {"model": request.get("model"), "embeddings": [vector] * count})
+                elif self.path == "/api/generate":
+                    self._reply(200, {"model": request.get("model"), "response": standin.name, "done": True})
+                else:
+                    self._reply(404, {"error": "not found"})
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,105 @@
+"""Throughput of the ingestion work queue with 1..N worker processes.
+
+Needs a reachable MongoDB (MONGO_URI); embeddings come from a local
+stand-in Ollama with a fixed per-call latency, so the numbers show how
+well leasing scales rather than how fast a GPU is. Throw-away
+collections are created and dropped for the run.
+
+    python -m benchmarks.work_queue_scaling --workers 1 2 4 --jobs 64 --delay 0.05
+"""
+import argparse
+import multiprocessing
+import os
+import time
+import uuid
+
+from benchmarks.standin_ollama import StandInOllama
+
+
+def _worker(worker_id, barrier):
+    # Imported in the child so settings pick up the benchmark environment
+    from app.services.work_queue import run_worker
+
+    barrier.wait()
+    run_worker(worker_id, poll_interval=0.01, exit_when_idle=True)
+
+
+def run(worker_counts, jobs: int, batch_size: int, delay: float):
+    with StandInOllama(delay=delay) as standin:
+        suffix = uuid.uuid4().hex[:8]
+        os.environ.update({
+            "OLLAMA_HOSTS": standin.url,
+            "CHUNKS_COLLECTION": f"bench_chunks_{suffix}",
+            "JOBS_COLLECTION": f"bench_jobs_{suffix}",
+            "BULK_EMBED_BATCH_SIZE": str(batch_size)
+        })
+
+        from app.db.mongodb import get_db
+        from app.services.work_queue import enqueue_chunks, queue_status
+
+        db = get_db()
+        context = multiprocessing.get_context("spawn")
+        rows = []
+
+        try:
+            for count in worker_counts:
+                db[os.environ["CHUNKS_COLLECTION"]].drop()
+                db[os.environ["JOBS_COLLECTION"]].drop()
+
+                for doc in range(jobs):
+                    enqueue_chunks(f"bench-{doc}", [f"chunk {doc}-{i}" for i in range(batch_size)])
+
+                barrier = context.Barrier(count + 1)
+                workers = [
+                    context.Process(target=_worker, args=(f"bench-{i}", barrier))
+                    for i in range(count)
+                ]
+                for process in workers:
+                    process.start()
+
+                # Timing starts once every worker has finished importing
+                barrier.wait()
+                started = time.perf_counter()
+                for process in workers:
+                    process.join()
+                elapsed = time.perf_counter() - started
+
+                done = queue_status()["done"]
+                rows.append({
+                    "workers": count,
+                    "seconds": elapsed,
+                    "jobs_done": done,
+                    "chunks_per_second": done * batch_size / elapsed
+                })
+        finally:
+            db[os.environ["CHUNKS_COLLECTION"]].drop()
+            db[os.environ["JOBS_COLLECTION"]].drop()
+
+    baseline = rows[0]["chunks_per_second"] / rows[0]["workers"]
+    for row in rows:
+        row["speedup"] = row["chunks_per_second"] / baseline
+        row["efficiency"] = row["speedup"] / row["workers"]
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--jobs", type=int, default=64)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--delay", type=float, default=0.05, help="Stand-in latency per embed call (s)")
+    args = parser.parse_args()
+
+    rows = run(args.workers, args.jobs, args.batch_size, args.delay)
+
+    print(f"{args.jobs} jobs x {args.batch_size} chunks, {args.delay * 1000:.0f} ms per embed call")
+    print(f"{'workers':>8} {'seconds':>8} {'chunks/s':>9} {'speedup':>8} {'efficiency':>10}")
+    for row in rows:
+        print(
+            f"{row['workers']:>8} {row['seconds']:>8.2f} {row['chunks_per_second']:>9.1f} "
+            f"{row['speedup']:>8.2f} {row['efficiency']:>10.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
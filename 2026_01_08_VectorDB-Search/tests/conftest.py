@@ -6,6 +6,13 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 
 from fastapi.testclient import TestClient
 from app.main import app
+from app.core.cache import clear_caches
+
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    """Start every test with empty query caches"""
+    clear_caches()
 
 
 @pytest.fixture
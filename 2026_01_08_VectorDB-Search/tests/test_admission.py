@@ -0,0 +1,112 @@
+import threading
+import pytest
+
+from app.core import admission, ollam_client
+from app.core.admission import AdmissionLimiter, Overloaded, background_scope
+
+
+def test_limiter_caps_concurrency():
+    """Test that no more than max_concurrency callers hold a slot"""
+    limiter = AdmissionLimiter("test", max_concurrency=2, max_queue=10, max_wait=5)
+    release = threading.Event()
+    peak = []
+
+    def work():
+        with limiter.slot():
+            peak.append(limiter.in_flight)
+            release.wait(1)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert max(peak) <= 2
+    assert limiter.admitted == 4
+
+
+def test_limiter_rejects_when_queue_full():
+    """Test that callers beyond the queue bound fail fast with 429"""
+    limiter = AdmissionLimiter("test", max_concurrency=1, max_queue=0, max_wait=5)
+
+    with limiter.slot():
+        with pytest.raises(Overloaded) as excinfo:
+            with limiter.slot():
+                pass
+
+    assert excinfo.value.status_code == 429
+    assert excinfo.value.retry_after >= 1
+    assert limiter.rejected == 1
+
+
+def test_limiter_rejects_after_max_wait():
+    """Test that a caller waiting longer than max_wait gets 503"""
+    limiter = AdmissionLimiter("test", max_concurrency=1, max_queue=5, max_wait=0.01)
+
+    with limiter.slot():
+        with pytest.raises(Overloaded) as excinfo:
+            with limiter.slot():
+                pass
+
+    assert excinfo.value.status_code == 503
+    metrics = limiter.metrics()
+    assert metrics["queue_depth"] == 0
+    assert metrics["wait_ms"]["max"] >= 10
+
+
+def test_background_embeds_wait_on_their_own_limiter(monkeypatch):
+    """Test that bulk embeds neither fail on nor take the interactive embed slots"""
+    interactive = AdmissionLimiter("embed", max_concurrency=1, max_queue=5, max_wait=0.01)
+    background = AdmissionLimiter("background_embed", max_concurrency=1, max_queue=None, max_wait=None)
+    monkeypatch.setattr(admission, "embed_limiter", interactive)
+    monkeypatch.setattr(admission, "background_embed_limiter", background)
+    monkeypatch.setattr(
+        ollam_client, "_call", lambda method, hedge=False, **kwargs: {"embeddings": [[0.1] * 4]}
+    )
+
+    done = []
+
+    def bulk_embed():
+        with background_scope():
+            done.append(ollam_client.get_embeddings(["chunk"], {"model": "m", "dim": 4}))
+
+    with background.slot():
+        # Far past the interactive max_wait, the queued bulk embed still waits
+        worker = threading.Thread(target=bulk_embed)
+        worker.start()
+        worker.join(0.1)
+        assert worker.is_alive()
+        # and a live query embed is admitted meanwhile
+        assert ollam_client.get_embeddings(["query"], {"model": "m", "dim": 4})
+    worker.join(1)
+
+    assert len(done) == 1
+    assert background.rejected == interactive.rejected == 0
+    assert interactive.admitted == 1
+
+
+def test_overloaded_query_returns_retry_after(client, monkeypatch):
+    """Test that an overloaded Ollama returns 503 with Retry-After"""
+    def overloaded(text):
+        raise Overloaded("embed", "queue wait exceeded", 503, 3)
+
+    monkeypatch.setattr("app.services.query_service.get_embedding", overloaded)
+
+    response = client.get("/query?q=test")
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "3"
+    assert "embed" in response.json()["error"]
+
+
+def test_admission_metrics_endpoint(client):
+    """Test that queue depth and wait metrics are exposed"""
+    response = client.get("/metrics/admission")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data) == {"embed", "background_embed", "generate"}
+    assert "queue_depth" in data["embed"]
+    assert "p95" in data["generate"]["wait_ms"]
@@ -0,0 +1,125 @@
+import json
+import threading
+import time
+import pytest
+
+
+def test_batch_query_streams_ndjson_with_indexes(client, monkeypatch):
+    """Test that every question comes back as one NDJSON line with its index"""
+    embedded = []
+
+    def fake_get_embeddings(texts):
+        embedded.append(list(texts))
+        return [[float(i)] * 1024 for i in range(len(texts))]
+
+    monkeypatch.setattr(
+        "app.services.batch_query_service.get_embeddings",
+        fake_get_embeddings
+    )
+    monkeypatch.setattr(
+        "app.services.query_service.chunks_collection.aggregate",
+        lambda pipeline: [
+            {"text": "GlideCloud chunk", "score": 0.9, "chunk_index": 0}
+        ]
+    )
+    monkeypatch.setattr(
+        "app.services.query_service.generate_answer",
+        lambda context, question: f"Answer to {question}"
+    )
+
+    questions = ["What is GlideCloud?", "Who founded it?", "Where is it?"]
+    response = client.post("/query/batch", json={"questions": questions})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert embedded == [questions]
+    assert sorted(line["index"] for line in lines) == [0, 1, 2]
+    for line in lines:
+        assert line["answer"] == f"Answer to {questions[line['index']]}"
+        assert line["question"] == questions[line["index"]]
+
+
+def test_batch_query_reports_per_question_errors(client, monkeypatch):
+    """Test that a failing search only fails its own question"""
+    monkeypatch.setattr(
+        "app.services.batch_query_service.get_embeddings",
+        lambda texts: [[1.0] + [0.0] * 1023, [0.0, 1.0] + [0.0] * 1022]
+    )
+
+    def fake_aggregate(pipeline):
+        if pipeline[0]["$vectorSearch"]["queryVector"][1] == 1.0:
+            raise RuntimeError("search failed")
+        return []
+
+    monkeypatch.setattr(
+        "app.services.query_service.chunks_collection.aggregate",
+        fake_aggregate
+    )
+
+    response = client.post("/query/batch", json={"questions": ["ok", "broken"]})
+
+    lines = {line["index"]: line for line in map(json.loads, response.text.splitlines())}
+    assert lines[0]["answer"] == "No relevant information found."
+    assert lines[1]["error"] == "search failed"
+
+
+def test_batch_query_caps_generation_concurrency(monkeypatch):
+    """Test that concurrent LLM generations never exceed the configured cap"""
+    from app.core.config import settings
+    from app.services.batch_query_service import query_batch
+
+    monkeypatch.setattr(settings, "BATCH_GENERATE_CONCURRENCY", 2)
+    monkeypatch.setattr(
+        "app.services.batch_query_service.get_embeddings",
+        lambda texts: [[0.1] * 1024 for _ in texts]
+    )
+    monkeypatch.setattr(
+        "app.services.query_service.chunks_collection.aggregate",
+        lambda pipeline: [{"text": "chunk", "score": 0.9, "chunk_index": 0}]
+    )
+
+    lock = threading.Lock()
+    active = {"now": 0, "peak": 0}
+
+    def slow_generate(context, question):
+        with lock:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+        time.sleep(0.02)
+        with lock:
+            active["now"] -= 1
+        return "Answer"
+
+    monkeypatch.setattr("app.services.query_service.generate_answer", slow_generate)
+
+    results = list(query_batch([f"q{i}" for i in range(8)]))
+
+    assert len(results) == 8
+    assert active["peak"] == 2
+
+
+def test_batch_query_rejects_empty_batch(client):
+    """Test that an empty question list is rejected"""
+    response = client.post("/query/batch", json={"questions": []})
+
+    assert response.status_code == 422
+
+
+def test_get_embeddings_uses_single_batched_call(monkeypatch):
+    """Test that batch embedding issues one ollama.embed call"""
+    from app.core.ollam_client import get_embeddings
+
+    calls = []
+
+    def fake_embed(model, input, keep_alive=None):
+        calls.append(input)
+        return {"embeddings": [[0.1] * 1024 for _ in input]}
+
+    monkeypatch.setattr("app.core.ollam_client.ollama.embed", fake_embed)
+
+    result = get_embeddings(["a", "b", "c"])
+
+    assert len(calls) == 1
+    assert len(result) == 3
@@ -0,0 +1,206 @@
+import io
+import os
+import time
+import zipfile
+import pytest
+
+from app.core import ollam_client
+from app.core.config import settings
+from app.services.bulk_ingestion_service import TooManyFiles, stage_uploads
+
+SAMPLE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app", "sample_data"))
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """Mock embeddings and inserts, recording every batch"""
+    calls = {"embed": [], "insert": [], "delete": []}
+
+    def fake_get_embeddings(texts, profile=None):
+        calls["embed"].append(list(texts))
+        return [[0.1] * 1024 for _ in texts]
+
+    monkeypatch.setattr("app.services.bulk_ingestion_service.get_embeddings", fake_get_embeddings)
+    monkeypatch.setattr(
+        "app.db.mongodb.chunks_collection.insert_many",
+        lambda docs, ordered=True: calls["insert"].append(docs)
+    )
+    monkeypatch.setattr(
+        "app.db.mongodb.chunks_collection.delete_many",
+        lambda query: calls["delete"].append(query)
+    )
+    return calls
+
+
+def fake_pdf(name):
+    return ("files", (name, io.BytesIO(b"%PDF-1.4 " + name.encode()), "application/pdf"))
+
+
+def test_bulk_upload_batches_chunks_across_documents(client, monkeypatch, pipeline):
+    """Test that chunks from several PDFs share cross-document embedding batches"""
+    monkeypatch.setattr(settings, "INGEST_PROCESSES", 0)
+    monkeypatch.setattr(settings, "BULK_EMBED_BATCH_SIZE", 4)
+    monkeypatch.setattr(
+        "app.services.bulk_ingestion_service.extract_chunks",
+        lambda path: [f"{os.path.basename(path)} chunk {i}" for i in range(3)]
+    )
+
+    response = client.post("/upload-pdfs", files=[fake_pdf("a.pdf"), fake_pdf("b.pdf"), fake_pdf("c.pdf")])
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [f["filename"] for f in data["files"]] == ["a.pdf", "b.pdf", "c.pdf"]
+    assert all(f["chunks"] == 3 and f["doc_id"] for f in data["files"])
+    assert len({f["doc_id"] for f in data["files"]}) == 3
+    assert data["stats"]["chunks"] == 9
+
+    assert sorted(len(batch) for batch in pipeline["embed"]) == [1, 4, 4]
+    mixed = [batch for batch in pipeline["insert"] if len({d["doc_id"] for d in batch}) > 1]
+    assert mixed
+
+
+def test_bulk_upload_extracts_pdfs_from_zip(client, monkeypatch, pipeline):
+    """Test that PDFs inside a ZIP archive are ingested and other members skipped"""
+    monkeypatch.setattr(settings, "INGEST_PROCESSES", 0)
+    monkeypatch.setattr(
+        "app.services.bulk_ingestion_service.extract_chunks",
+        lambda path: ["chunk"]
+    )
+
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("docs/one.pdf", b"%PDF-1.4 one")
+        zf.writestr("../two.PDF", b"%PDF-1.4 two")
+        zf.writestr("notes.txt", b"not a pdf")
+    archive.seek(0)
+
+    response = client.post(
+        "/upload-pdfs",
+        files=[("files", ("bundle.zip", archive, "application/zip"))]
+    )
+
+    names = [f["filename"] for f in response.json()["files"]]
+    assert sorted(names) == ["bundle.zip/../two.PDF", "bundle.zip/docs/one.pdf"]
+
+
+def test_bulk_upload_rejects_too_many_files_before_staging(client, monkeypatch, pipeline, tmp_path):
+    """Test that uploads over BULK_MAX_FILES are refused without writing them to disk"""
+    monkeypatch.setattr(settings, "BULK_MAX_FILES", 2)
+    staged_dirs = []
+    monkeypatch.setattr(
+        "app.api.routes.tempfile.mkdtemp",
+        lambda prefix: staged_dirs.append(prefix) or str(tmp_path)
+    )
+
+    response = client.post("/upload-pdfs", files=[fake_pdf("a.pdf"), fake_pdf("b.pdf"), fake_pdf("c.pdf")])
+
+    assert response.status_code == 413
+    assert staged_dirs == []
+
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        for name in ("one.pdf", "two.pdf", "three.pdf"):
+            zf.writestr(name, b"%PDF-1.4")
+    archive.seek(0)
+
+    class Upload:
+        filename = "bundle.zip"
+        file = archive
+
+    with pytest.raises(TooManyFiles):
+        stage_uploads([Upload()], str(tmp_path))
+    assert os.listdir(tmp_path) == []
+    assert pipeline["embed"] == []
+
+
+def test_bulk_upload_reports_unsupported_and_empty_files(client, monkeypatch, pipeline):
+    """Test per-file errors for unsupported uploads and unreadable PDFs"""
+    monkeypatch.setattr(settings, "INGEST_PROCESSES", 0)
+    monkeypatch.setattr(
+        "app.services.bulk_ingestion_service.extract_chunks",
+        lambda path: [] if "empty" in path else ["chunk"]
+    )
+
+    response = client.post(
+        "/upload-pdfs",
+        files=[
+            fake_pdf("good.pdf"),
+            fake_pdf("empty.pdf"),
+            ("files", ("notes.txt", io.BytesIO(b"text"), "text/plain"))
+        ]
+    )
+
+    files = {f["filename"]: f for f in response.json()["files"]}
+    assert "error" not in files["good.pdf"]
+    assert files["empty.pdf"]["error"] == "No readable text found"
+    assert files["notes.txt"]["error"] == "Only PDF or ZIP files are supported"
+
+
+def test_bulk_upload_removes_documents_of_failed_batches(client, monkeypatch, pipeline):
+    """Test that a failed embedding batch fails and cleans up its documents"""
+    monkeypatch.setattr(settings, "INGEST_PROCESSES", 0)
+    monkeypatch.setattr(
+        "app.services.bulk_ingestion_service.extract_chunks",
+        lambda path: ["chunk"]
+    )
+
+    def failing_embeddings(texts, profile=None):
+        raise ConnectionError("Ollama is down")
+
+    monkeypatch.setattr("app.services.bulk_ingestion_service.get_embeddings", failing_embeddings)
+
+    response = client.post("/upload-pdfs", files=[fake_pdf("a.pdf")])
+
+    data = response.json()
+    assert data["files"][0]["error"] == "Ollama is down"
+    assert data["stats"]["failed"] == 1
+    assert pipeline["delete"] == [{"doc_id": {"$in": [data["files"][0]["doc_id"]]}}]
+
+
+def test_bulk_ingest_extracts_real_pdfs_in_processes(monkeypatch, pipeline, tmp_path):
+    """Test parallel extraction of the bundled sample PDFs in worker processes"""
+    from app.services.bulk_ingestion_service import ingest_pdf_files
+
+    monkeypatch.setattr(settings, "INGEST_PROCESSES", 2)
+
+    files = []
+    for name in sorted(os.listdir(SAMPLE_DIR)):
+        path = tmp_path / name
+        path.write_bytes(open(os.path.join(SAMPLE_DIR, name), "rb").read())
+        files.append({"filename": name, "path": str(path)})
+
+    result = ingest_pdf_files(files)
+
+    assert result["stats"]["failed"] == 0
+    assert all(f["chunks"] > 0 for f in result["files"])
+    assert sum(len(batch) for batch in pipeline["insert"]) == result["stats"]["chunks"]
+    assert not any(path.exists() for path in tmp_path.iterdir())
+
+
+def test_bulk_upload_server_timing(client, monkeypatch, pipeline):
+    """Test that bulk uploads report embed and insert timings separately from extraction"""
+    def slow_embed(method, hedge=False, **kwargs):
+        time.sleep(0.05)
+        return {"embeddings": [[0.1] * 1024 for _ in kwargs["input"]]}
+
+    monkeypatch.setattr(settings, "INGEST_PROCESSES", 0)
+    monkeypatch.setattr(settings, "BULK_EMBED_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "BULK_EMBED_CONCURRENCY", 1)
+    monkeypatch.setattr(
+        "app.services.bulk_ingestion_service.extract_chunks",
+        lambda path: [f"{os.path.basename(path)} chunk {i}" for i in range(4)]
+    )
+    # The real client records the embed span; only the Ollama call is faked
+    monkeypatch.setattr("app.services.bulk_ingestion_service.get_embeddings", ollam_client.get_embeddings)
+    monkeypatch.setattr("app.core.ollam_client._call", slow_embed)
+
+    response = client.post("/upload-pdfs?debug=timing", files=[fake_pdf("a.pdf"), fake_pdf("b.pdf")])
+
+    header = response.headers["server-timing"]
+    for stage in ("extract", "embed", "insert"):
+        assert f"{stage};dur=" in header
+    stages = response.json()["timing"]["stages"]
+    assert stages["embed"]["count"] == 4
+    assert stages["insert"]["count"] == 4
+    # Waiting on the embedder is not charged to extraction
+    assert stages["extract"]["ms"] < stages["embed"]["ms"] / 2
@@ -0,0 +1,170 @@
+import json
+import time
+import pytest
+
+from app.core.cache import LRUCache, answer_cache, embedding_cache
+from app.core.config import settings
+from app.services import cache_warmup
+
+CHUNKS = [{"doc_id": "d", "chunk_index": 0, "text": "GlideCloud builds cloud tools.", "score": 0.9}]
+
+
+@pytest.fixture
+def answers_cached(monkeypatch):
+    monkeypatch.setattr(answer_cache, "max_size", 16)
+
+
+@pytest.fixture
+def ollama_calls(monkeypatch):
+    calls = {"embed": 0, "embed_batch": [], "generate": 0}
+
+    def embed(text):
+        calls["embed"] += 1
+        return [0.1] * 1024
+
+    def embed_batch(texts):
+        calls["embed_batch"].append(list(texts))
+        return [[0.1] * 1024 for _ in texts]
+
+    def generate(context, question):
+        calls["generate"] += 1
+        return f"answer to {question}"
+
+    monkeypatch.setattr("app.services.query_service.get_embedding", embed)
+    monkeypatch.setattr("app.services.cache_warmup.get_embeddings", embed_batch)
+    monkeypatch.setattr("app.services.query_service.generate_answer", generate)
+    monkeypatch.setattr("app.services.query_service.chunks_collection.aggregate", lambda pipeline: CHUNKS)
+    return calls
+
+
+def write_log(path, questions, ts=None):
+    with open(path, "w") as f:
+        for q in questions:
+            f.write(json.dumps({
+                "ts": ts or time.time(), "params": {"q": q, "mode": "answer", "top_k": 5, "deadline_ms": 900},
+                "status": 200
+            }) + "\n")
+
+
+def test_lru_cache_evicts_and_expires():
+    """Test that the cache drops the least recently used and expired entries"""
+    lru = LRUCache("test", max_size=2, ttl=0.05)
+    lru.put("a", 1)
+    lru.put("b", 2)
+    lru.get("a")
+    lru.put("c", 3)
+
+    assert lru.get("b") is None
+    assert lru.get("a") == 1
+    time.sleep(0.06)
+    assert lru.get("c") is None
+    assert lru.stats()["hits"] == 2
+
+
+def test_repeated_question_reuses_query_embedding(client, ollama_calls):
+    """Test that asking the same question twice embeds it once"""
+    client.get("/query", params={"q": "What is GlideCloud?"})
+    client.get("/query", params={"q": "What is GlideCloud?"})
+
+    assert ollama_calls["embed"] == 1
+    assert ollama_calls["generate"] == 2
+
+
+def test_answer_cache_serves_repeats_until_documents_change(client, ollama_calls, answers_cached, monkeypatch):
+    """Test that cached answers are reused and dropped on ingest"""
+    monkeypatch.setattr(
+        "app.api.routes.ingest_document", lambda text: {"doc_id": "new", "chunks": 1}
+    )
+
+    first = client.get("/query", params={"q": "What is GlideCloud?"}).json()
+    second = client.get("/query", params={"q": "What is GlideCloud?"}).json()
+    client.get("/query", params={"q": "What is GlideCloud?", "temperature": 0})
+    client.post("/documents", json={"text": "New facts"})
+    client.get("/query", params={"q": "What is GlideCloud?"})
+
+    assert first == second
+    assert ollama_calls["generate"] == 3
+
+
+def test_answer_cache_serves_budget_mode_repeats(client, ollama_calls, answers_cached):
+    """Test that budget-mode answers are cached even though each deadline caps num_predict differently"""
+    params = {"q": "What is GlideCloud?", "budget": True}
+    first = client.get("/query", params={**params, "deadline_ms": 5000}).json()
+    second = client.get("/query", params={**params, "deadline_ms": 8000}).json()
+    client.get("/query", params={"q": "What is GlideCloud?", "budget": False})
+
+    assert first == second
+    assert ollama_calls["generate"] == 2
+
+
+def test_popular_from_log_ranks_recent_successes(tmp_path):
+    """Test that the log source counts recent successful queries only"""
+    path = tmp_path / "queries.jsonl"
+    write_log(path, ["b", "a", "b", "c", "b", "a"])
+    with open(path, "a") as f:
+        f.write(json.dumps({"ts": time.time(), "params": {"q": "failed"}, "status": 504}) + "\n")
+        f.write(json.dumps({"ts": 1.0, "params": {"q": "old"}, "status": 200}) + "\n")
+        f.write('{"ts": 1')
+
+    popular = cache_warmup.popular_from_log(str(path), limit=2, since=time.time() - 60)
+
+    assert [p["q"] for p in popular] == ["b", "a"]
+    assert "deadline_ms" not in popular[0]
+
+
+def test_warm_caches_fills_embeddings_and_answers(tmp_path, ollama_calls, answers_cached, monkeypatch):
+    """Test that warm-up batches embeddings and pre-computes answers for popular queries"""
+    path = tmp_path / "queries.jsonl"
+    write_log(path, ["first", "second", "first"])
+    monkeypatch.setattr(settings, "QUERY_LOG_PATH", str(path))
+
+    summary = cache_warmup.warm_caches(source="log", budget_seconds=5)
+
+    assert summary["complete"] is True
+    assert (summary["queries"], summary["embeddings"], summary["answers"]) == (2, 2, 2)
+    assert ollama_calls["embed_batch"] == [["first", "second"]]
+    assert ollama_calls["embed"] == 0
+    assert embedding_cache.stats()["size"] == 2
+    assert answer_cache.stats()["size"] == 2
+
+
+def test_warm_caches_stops_at_budget(tmp_path, ollama_calls, answers_cached, monkeypatch):
+    """Test that a slow warm-up gives up at its time budget"""
+    path = tmp_path / "queries.jsonl"
+    write_log(path, [f"question {i}" for i in range(20)])
+    monkeypatch.setattr(settings, "QUERY_LOG_PATH", str(path))
+    monkeypatch.setattr(settings, "DEADLINE_MIN_GENERATE_MS", 0)
+    monkeypatch.setattr(settings, "DEADLINE_REDUCED_SEARCH_MS", 0)
+
+    def slow_generate(context, question):
+        time.sleep(0.05)
+        return "answer"
+
+    monkeypatch.setattr("app.services.query_service.generate_answer", slow_generate)
+
+    started = time.perf_counter()
+    summary = cache_warmup.warm_caches(source="log", budget_seconds=0.3)
+
+    assert time.perf_counter() - started < 1.0
+    assert summary["complete"] is False
+    assert 0 < summary["answers"] < 20
+
+
+def test_startup_warms_caches_before_serving(tmp_path, ollama_calls, monkeypatch):
+    """Test that the lifespan warms the caches when a source is configured"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    path = tmp_path / "queries.jsonl"
+    write_log(path, ["warm question"])
+    monkeypatch.setattr(settings, "QUERY_LOG_PATH", str(path))
+    monkeypatch.setattr(settings, "CACHE_WARMUP_SOURCE", "log")
+    monkeypatch.setattr(settings, "OLLAMA_WARMUP", False)
+    monkeypatch.setattr("app.main.load_profiles", lambda: None)
+    monkeypatch.setattr("app.main.ensure_indexes", lambda: None)
+
+    with TestClient(app) as client:
+        assert client.get("/metrics/cache").json()["query_embeddings"]["size"] == 1
+        client.get("/query", params={"q": "warm question"})
+
+    assert ollama_calls["embed"] == 0
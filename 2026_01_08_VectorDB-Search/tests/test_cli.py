@@ -0,0 +1,106 @@
+import io
+import json
+import os
+import pytest
+
+from app import cli
+from app.core.config import settings
+
+
+@pytest.fixture
+def corpus(tmp_path, monkeypatch):
+    """A directory of text files with embeddings and Mongo writes mocked"""
+    for name in ("a.txt", "b.md", "nested/c.txt"):
+        path = tmp_path / name
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(f"contents of {name}")
+    (tmp_path / "ignored.png").write_bytes(b"\x89PNG")
+
+    calls = {"embed": [], "insert": [], "delete": []}
+
+    def fake_get_embeddings(texts, profile=None):
+        calls["embed"].append(list(texts))
+        return [[0.1] * 1024 for _ in texts]
+
+    monkeypatch.setattr(settings, "INGEST_PROCESSES", 0)
+    monkeypatch.setattr("app.cli.load_profiles", lambda: None)
+    monkeypatch.setattr("app.services.bulk_ingestion_service.get_embeddings", fake_get_embeddings)
+    monkeypatch.setattr(
+        "app.db.mongodb.chunks_collection.insert_many",
+        lambda docs, ordered=True: calls["insert"].append(docs)
+    )
+    monkeypatch.setattr(
+        "app.db.mongodb.chunks_collection.delete_many",
+        lambda query: calls["delete"].append(query)
+    )
+    return tmp_path, calls
+
+
+def test_cli_ingest_writes_checkpoint(corpus):
+    """Test that the CLI ingests PDF and text files and checkpoints each one"""
+    directory, calls = corpus
+    out = io.StringIO()
+
+    summary = cli.ingest_directory(str(directory), out=out)
+
+    assert summary["files"] == 3
+    assert summary["ingested"] == 3
+    assert summary["failed"] == 0
+
+    stored = {d["doc_id"] for batch in calls["insert"] for d in batch}
+    checkpoint = cli.load_checkpoint(str(directory / cli.CHECKPOINT_NAME))
+    assert set(checkpoint) == set(cli.discover_files(str(directory)))
+    assert {entry["doc_id"] for entry in checkpoint.values()} == stored
+    assert "chunks/s" in out.getvalue() and "ETA" in out.getvalue()
+
+
+def test_cli_ingest_resumes_from_checkpoint(corpus):
+    """Test that a second run skips completed files and clears partial chunks"""
+    directory, calls = corpus
+    checkpoint = directory / cli.CHECKPOINT_NAME
+    done = str(directory / "a.txt")
+    checkpoint.write_text(
+        json.dumps({"path": done, "doc_id": cli.stable_doc_id(done), "chunks": 1}) + "\n"
+        + '{"path": "truncated'
+    )
+
+    summary = cli.ingest_directory(str(directory), out=io.StringIO())
+
+    assert summary["skipped"] == 1
+    assert summary["ingested"] == 2
+
+    embedded = [text for batch in calls["embed"] for text in batch]
+    assert "contents of a.txt" not in embedded
+
+    cleared = calls["delete"][0]["doc_id"]["$in"]
+    assert cli.stable_doc_id(done) not in cleared
+    assert cli.stable_doc_id(str(directory / "b.md")) in cleared
+
+
+def test_cli_failed_files_are_not_checkpointed(corpus, monkeypatch):
+    """Test that a file whose embedding fails is retried on the next run"""
+    directory, calls = corpus
+    monkeypatch.setattr(settings, "BULK_EMBED_BATCH_SIZE", 1)
+    monkeypatch.setattr(settings, "BULK_EMBED_CONCURRENCY", 1)
+
+    def flaky(texts, profile=None):
+        if any("b.md" in text for text in texts):
+            raise RuntimeError("ollama down")
+        return [[0.1] * 1024 for _ in texts]
+
+    monkeypatch.setattr("app.services.bulk_ingestion_service.get_embeddings", flaky)
+    monkeypatch.setattr(
+        "app.db.mongodb.chunks_collection.delete_many",
+        lambda query: None
+    )
+
+    assert cli.main(["ingest", str(directory)]) == 1
+
+    checkpoint = cli.load_checkpoint(str(directory / cli.CHECKPOINT_NAME))
+    assert str(directory / "b.md") not in checkpoint
+    assert len(checkpoint) == 2
+
+
+def test_cli_rejects_missing_directory(tmp_path):
+    """Test that ingest exits with an error for a path that is not a directory"""
+    assert cli.main(["ingest", os.path.join(str(tmp_path), "missing")]) == 2
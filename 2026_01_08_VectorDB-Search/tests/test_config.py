@@ -34,10 +34,10 @@ def test_ollama_client_embedding(monkeypatch):
     """Test Ollama embedding client"""
     from app.core.ollam_client import get_embedding
     
-    mock_response = {"embedding": [0.1] * 1024}
+    mock_response = {"embeddings": [[0.1] * 1024]}
     monkeypatch.setattr(
-        "app.core.ollam_client.ollama.embeddings",
-        lambda model, prompt: mock_response
+        "app.core.ollam_client.ollama.embed",
+        lambda model, input, keep_alive=None: mock_response
     )
     
     result = get_embedding("test text")
@@ -53,7 +53,7 @@ def test_ollama_client_generate_answer(monkeypatch):
     mock_response = {"response": "This is a test answer"}
     monkeypatch.setattr(
         "app.core.ollam_client.ollama.generate",
-        lambda model, prompt: mock_response
+        lambda model, prompt, options=None, keep_alive=None: mock_response
     )
     
     result = generate_answer("Test context", "What is this?")
@@ -67,11 +67,11 @@ def test_ollama_client_embedding_format(monkeypatch):
     from app.core.ollam_client import get_embedding
     
     expected_embedding = [0.1, 0.2, 0.3] * 341 + [0.1]  # 1024 elements
-    mock_response = {"embedding": expected_embedding}
+    mock_response = {"embeddings": [expected_embedding]}
     
     monkeypatch.setattr(
-        "app.core.ollam_client.ollama.embeddings",
-        lambda model, prompt: mock_response
+        "app.core.ollam_client.ollama.embed",
+        lambda model, input, keep_alive=None: mock_response
     )
     
     result = get_embedding("test")
@@ -84,10 +84,10 @@ def test_ollama_client_with_empty_text(monkeypatch):
     """Test Ollama client with empty text"""
     from app.core.ollam_client import get_embedding
     
-    mock_response = {"embedding": [0.0] * 1024}
+    mock_response = {"embeddings": [[0.0] * 1024]}
     monkeypatch.setattr(
-        "app.core.ollam_client.ollama.embeddings",
-        lambda model, prompt: mock_response
+        "app.core.ollam_client.ollama.embed",
+        lambda model, input, keep_alive=None: mock_response
     )
     
     result = get_embedding("")
@@ -101,11 +101,11 @@ def test_ollama_client_with_long_text(monkeypatch):
     from app.core.ollam_client import get_embedding
     
     long_text = "word " * 10000
-    mock_response = {"embedding": [0.1] * 1024}
+    mock_response = {"embeddings": [[0.1] * 1024]}
     
     monkeypatch.setattr(
-        "app.core.ollam_client.ollama.embeddings",
-        lambda model, prompt: mock_response
+        "app.core.ollam_client.ollama.embed",
+        lambda model, input, keep_alive=None: mock_response
     )
     
     result = get_embedding(long_text)
@@ -120,12 +120,12 @@ def test_ollama_client_embedding_model_used(monkeypatch):
     
     called_with = {}
     
-    def mock_embeddings(model, prompt):
+    def mock_embeddings(model, input, keep_alive=None):
         called_with['model'] = model
-        return {"embedding": [0.1] * 1024}
+        return {"embeddings": [[0.1] * 1024]}
     
     monkeypatch.setattr(
-        "app.core.ollam_client.ollama.embeddings",
+        "app.core.ollam_client.ollama.embed",
         mock_embeddings
     )
     
@@ -140,7 +140,7 @@ def test_ollama_client_generate_model_used(monkeypatch):
     
     called_with = {}
     
-    def mock_generate(model, prompt):
+    def mock_generate(model, prompt, options=None, keep_alive=None):
         called_with['model'] = model
         return {"response": "test response"}
     
@@ -179,3 +179,20 @@ def test_config_env_file_loading():
     mongo_uri = os.getenv('MONGO_URI')
     # The test assumes .env exists, adjust as needed
     # This test validates the config can read from env
+
+
+def test_ollama_client_embedding_truncated_to_configured_dim(monkeypatch):
+    """Test that embeddings are truncated to EMBEDDING_DIM and re-normalized"""
+    from app.core.ollam_client import get_embedding
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "EMBEDDING_DIM", 256)
+    monkeypatch.setattr(
+        "app.core.ollam_client.ollama.embed",
+        lambda model, input, keep_alive=None: {"embeddings": [[0.5] * 1024]}
+    )
+
+    result = get_embedding("test")
+
+    assert len(result) == 256
+    assert sum(x * x for x in result) == pytest.approx(1.0)
@@ -0,0 +1,101 @@
+import time
+import pytest
+
+from app.core.admission import AdmissionLimiter, Overloaded
+from app.core.config import settings
+from app.core.deadline import deadline_scope
+
+CHUNK = {"text": "GlideCloud builds cloud tools.", "score": 0.9, "chunk_index": 0, "doc_id": "d"}
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """Mock embedding and search, recording the search pipelines"""
+    calls = []
+
+    def aggregate(pipeline):
+        calls.append(pipeline)
+        return [dict(CHUNK)]
+
+    monkeypatch.setattr("app.services.query_service.get_embedding", lambda text: [0.1] * 1024)
+    monkeypatch.setattr("app.services.query_service.chunks_collection.aggregate", aggregate)
+    return calls
+
+
+def slow(seconds, value=None):
+    def call(*args, **kwargs):
+        time.sleep(seconds)
+        return value
+    return call
+
+
+def test_query_without_pressure_is_not_degraded(client, pipeline, monkeypatch):
+    """Test that a query well within the default deadline is answered in full"""
+    monkeypatch.setattr("app.services.query_service.generate_answer", lambda context, question: "answer")
+
+    data = client.get("/query", params={"q": "What is GlideCloud?"}).json()
+
+    assert data["answer"] == "answer"
+    assert "degraded" not in data
+    assert pipeline[0][0]["$vectorSearch"]["numCandidates"] == settings.VECTOR_NUM_CANDIDATES
+
+
+def test_slow_generation_returns_chunks_without_answer(client, pipeline, monkeypatch):
+    """Test that generation is abandoned at the deadline and chunks are still returned"""
+    monkeypatch.setattr(settings, "DEADLINE_MIN_GENERATE_MS", 0)
+    monkeypatch.setattr(settings, "DEADLINE_REDUCED_SEARCH_MS", 0)
+    monkeypatch.setattr("app.services.query_service.generate_answer", slow(1.0, "late"))
+
+    started = time.perf_counter()
+    response = client.get("/query", params={"q": "What is GlideCloud?", "deadline_ms": 200})
+
+    assert time.perf_counter() - started < 0.8
+    data = response.json()
+    assert response.status_code == 200
+    assert data["answer"] is None
+    assert data["chunks_used"][0]["chunk_index"] == 0
+    assert data["degraded"] == ["answer_timeout"]
+
+
+def test_short_deadline_header_skips_answer_and_shrinks_search(client, pipeline, monkeypatch):
+    """Test that a tight header deadline degrades search and skips the LLM up front"""
+    def no_generation(context, question):
+        raise AssertionError("generation should have been skipped")
+
+    monkeypatch.setattr("app.services.query_service.generate_answer", no_generation)
+
+    data = client.get(
+        "/query",
+        params={"q": "What is GlideCloud?", "top_k": 3},
+        headers={"X-Request-Deadline-Ms": "500"}
+    ).json()
+
+    assert data["answer"] is None
+    assert data["degraded"] == ["reduced_candidates", "answer_skipped"]
+    assert pipeline[0][0]["$vectorSearch"]["numCandidates"] == settings.VECTOR_NUM_CANDIDATES // 4
+
+
+def test_embedding_past_deadline_returns_504(client, pipeline, monkeypatch):
+    """Test that a request whose embedding misses the deadline fails fast with 504"""
+    monkeypatch.setattr("app.services.query_service.get_embedding", slow(1.0, [0.1] * 1024))
+
+    started = time.perf_counter()
+    response = client.get("/query", params={"q": "What is GlideCloud?", "deadline_ms": 100})
+
+    assert time.perf_counter() - started < 0.8
+    assert response.status_code == 504
+    assert response.json()["stage"] == "embed"
+    assert pipeline == []
+
+
+def test_admission_wait_is_bounded_by_deadline():
+    """Test that a queued caller gives up at its deadline rather than max_wait"""
+    limiter = AdmissionLimiter("test", max_concurrency=1, max_queue=4, max_wait=5.0)
+
+    with limiter.slot():
+        with deadline_scope(0.1):
+            started = time.perf_counter()
+            with pytest.raises(Overloaded):
+                with limiter.slot():
+                    pass
+            assert time.perf_counter() - started < 1.0
@@ -9,7 +9,7 @@ def test_upload_document_success(client, monkeypatch):
     )
 
     monkeypatch.setattr(
-        "app.services.ingestion_service.chunks_collection.insert_many",
+        "app.db.mongodb.chunks_collection.insert_many",
         lambda docs: True
     )
 
@@ -29,7 +29,7 @@ def test_upload_document_success(client, monkeypatch):
 def test_upload_document_empty_text(client, monkeypatch):
     """Test document upload with empty text"""
     monkeypatch.setattr(
-        "app.services.ingestion_service.chunks_collection.insert_many",
+        "app.db.mongodb.chunks_collection.insert_many",
         lambda docs: True
     )
 
@@ -52,7 +52,7 @@ def test_upload_document_large_text(client, monkeypatch):
     )
 
     monkeypatch.setattr(
-        "app.services.ingestion_service.chunks_collection.insert_many",
+        "app.db.mongodb.chunks_collection.insert_many",
         lambda docs: True
     )
 
@@ -76,7 +76,7 @@ def test_upload_document_special_characters(client, monkeypatch):
     )
 
     monkeypatch.setattr(
-        "app.services.ingestion_service.chunks_collection.insert_many",
+        "app.db.mongodb.chunks_collection.insert_many",
         lambda docs: True
     )
 
@@ -96,7 +96,7 @@ def test_upload_document_response_structure(client, monkeypatch):
     )
 
     monkeypatch.setattr(
-        "app.services.ingestion_service.chunks_collection.insert_many",
+        "app.db.mongodb.chunks_collection.insert_many",
         lambda docs: True
     )
 
@@ -116,3 +116,43 @@ def test_upload_document_response_structure(client, monkeypatch):
     assert isinstance(data["doc_id"], str)
     assert isinstance(data["chunks"], int)
     assert data["chunks"] >= 1
+
+
+def test_delete_document_success(client, monkeypatch):
+    """Test deleting all chunks of a document"""
+    captured = {}
+
+    class FakeResult:
+        deleted_count = 3
+
+    def fake_delete_many(query):
+        captured["query"] = query
+        return FakeResult()
+
+    monkeypatch.setattr(
+        "app.db.mongodb.chunks_collection.delete_many",
+        fake_delete_many
+    )
+
+    response = client.delete("/documents/abc-123")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["doc_id"] == "abc-123"
+    assert data["chunks_deleted"] == 3
+    assert captured["query"] == {"doc_id": "abc-123"}
+
+
+def test_delete_document_not_found(client, monkeypatch):
+    """Test deleting a document that does not exist"""
+    class FakeResult:
+        deleted_count = 0
+
+    monkeypatch.setattr(
+        "app.db.mongodb.chunks_collection.delete_many",
+        lambda query: FakeResult()
+    )
+
+    response = client.delete("/documents/missing")
+
+    assert response.status_code == 404
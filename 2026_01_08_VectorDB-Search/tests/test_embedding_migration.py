@@ -0,0 +1,259 @@
+import threading
+import pytest
+
+from app.core import embedding_profile
+from app.core.embedding_profile import make_profile, active_profile
+from app.services import embedding_migration
+
+
+class FakeCursor(list):
+    def sort(self, key, direction):
+        return FakeCursor(sorted(self, key=lambda doc: doc[key], reverse=direction < 0))
+
+    def limit(self, n):
+        return FakeCursor(self[:n])
+
+
+def matches(doc, query):
+    for key, condition in query.items():
+        if isinstance(condition, dict):
+            if "$exists" in condition and (key in doc) != condition["$exists"]:
+                return False
+            if "$gt" in condition and not doc.get(key, -1) > condition["$gt"]:
+                return False
+            if "$in" in condition and doc.get(key) not in condition["$in"]:
+                return False
+        elif doc.get(key) != condition:
+            return False
+    return True
+
+
+class FakeCollection:
+    def __init__(self, docs=None):
+        self.docs = {doc["_id"]: doc for doc in (docs or [])}
+
+    def find(self, query, projection=None):
+        return FakeCursor(dict(d) for d in self.docs.values() if matches(d, query))
+
+    def find_one(self, query, projection=None):
+        found = self.find(query)
+        return found[0] if found else None
+
+    def replace_one(self, query, doc, upsert=False):
+        self.docs[doc["_id"]] = dict(doc)
+
+    def update_one(self, query, update):
+        doc = self.find_one(query)
+        if doc is None:
+            return
+        doc = self.docs[doc["_id"]]
+        doc.update(update.get("$set", {}))
+        for key, value in update.get("$inc", {}).items():
+            doc[key] = doc.get(key, 0) + value
+
+    def bulk_write(self, requests, ordered=True):
+        for request in requests:
+            self.update_one(request._filter, request._doc)
+
+    def estimated_document_count(self):
+        return len(self.docs)
+
+
+@pytest.fixture
+def stores(monkeypatch):
+    chunks = FakeCollection([
+        {"_id": i, "doc_id": "d", "chunk_index": i, "text": f"chunk {i}",
+         "embedding": [0.1] * 4}
+        for i in range(5)
+    ])
+    migrations = FakeCollection()
+
+    monkeypatch.setattr(embedding_migration, "chunk_partitions", lambda: [chunks])
+    monkeypatch.setattr(embedding_migration, "migrations_collection", migrations)
+    monkeypatch.setattr(embedding_migration, "ensure_vector_index", lambda profile: "created")
+    monkeypatch.setattr(
+        embedding_migration,
+        "get_embeddings",
+        lambda texts, profile: [[0.5] * profile["dim"] for _ in texts]
+    )
+
+    yield chunks, migrations
+
+    embedding_profile.set_profiles(None, None)
+
+
+def test_make_profile_uses_safe_field_and_index_names():
+    """Test that model names map to valid field and index names"""
+    profile = make_profile("nomic-embed-text:latest", 768)
+
+    assert profile["field"] == "embedding_nomic_embed_text_latest_768"
+    assert profile["index"].endswith("_nomic_embed_text_latest_768")
+    assert "." not in profile["field"]
+
+
+def test_ingest_stamps_model_and_dimension(monkeypatch):
+    """Test that ingested chunks record the model and dimension of their vector"""
+    from app.services.ingestion_service import ingest_document
+
+    stored = []
+    monkeypatch.setattr("app.services.ingestion_service.get_embedding", lambda text: [0.1] * 1024)
+    monkeypatch.setattr(
+        "app.db.mongodb.chunks_collection.insert_many",
+        lambda docs: stored.extend(docs)
+    )
+
+    ingest_document("Stamp me")
+
+    assert stored[0]["embedding_model"] == active_profile()["model"]
+    assert stored[0]["embedding_dim"] == active_profile()["dim"]
+
+
+def test_ingest_dual_writes_during_migration(monkeypatch):
+    """Test that new chunks get both vectors while a migration is in progress"""
+    from app.services.ingestion_service import ingest_document
+
+    target = make_profile("new-model", 8)
+    embedding_profile.set_profiles(None, target)
+    stored = []
+
+    monkeypatch.setattr(
+        "app.services.ingestion_service.get_embedding",
+        lambda text, profile=None: [0.2] * (profile["dim"] if profile else 1024)
+    )
+    monkeypatch.setattr(
+        "app.db.mongodb.chunks_collection.insert_many",
+        lambda docs: stored.extend(docs)
+    )
+
+    try:
+        ingest_document("Dual write")
+    finally:
+        embedding_profile.set_profiles(None, None)
+
+    assert len(stored[0]["embedding"]) == 1024
+    assert len(stored[0][target["field"]]) == 8
+    assert stored[0][f"{target['field']}_model"] == "new-model"
+
+
+def test_migration_backfills_and_checkpoints(stores):
+    """Test that the worker back-fills target vectors and records progress"""
+    chunks, migrations = stores
+
+    state = embedding_migration.start_migration("new-model", 8)
+    result = embedding_migration.run_migration(batch_size=2, pause=0)
+
+    field = state["field"]
+    assert all(len(doc[field]) == 8 for doc in chunks.docs.values())
+    assert all(doc["embedding"] == [0.1] * 4 for doc in chunks.docs.values())
+    assert result["status"] == "ready"
+    assert result["processed"] == 5
+    assert result["last_id"] == 4
+
+
+def test_migration_resumes_from_checkpoint(stores, monkeypatch):
+    """Test that a stopped migration resumes after the last checkpoint"""
+    chunks, migrations = stores
+    embedding_migration.start_migration("new-model", 8)
+
+    stop = threading.Event()
+    calls = []
+
+    def embed_then_stop(texts, profile):
+        calls.append(len(texts))
+        stop.set()
+        return [[0.5] * 8 for _ in texts]
+
+    monkeypatch.setattr(embedding_migration, "get_embeddings", embed_then_stop)
+    first = embedding_migration.run_migration(batch_size=2, pause=0, stop_event=stop)
+    assert first["status"] == "running"
+    assert first["last_id"] == 1
+
+    resumed = []
+    monkeypatch.setattr(
+        embedding_migration,
+        "get_embeddings",
+        lambda texts, profile: resumed.extend(texts) or [[0.5] * 8 for _ in texts]
+    )
+    second = embedding_migration.run_migration(batch_size=2, pause=0)
+
+    assert resumed == ["chunk 2", "chunk 3", "chunk 4"]
+    assert second["processed"] == 5
+
+
+def test_queries_use_old_vectors_until_cutover(stores):
+    """Test that the active profile only switches at cut-over"""
+    embedding_migration.start_migration("new-model", 8)
+    embedding_migration.run_migration(batch_size=10, pause=0)
+
+    assert active_profile()["field"] == "embedding"
+
+    active = embedding_migration.cutover_migration()
+
+    assert active["model"] == "new-model"
+    assert active_profile()["field"] == make_profile("new-model", 8)["field"]
+    assert embedding_migration.migration_progress()["status"] == "completed"
+
+
+def test_cutover_rejected_before_backfill_finishes(stores):
+    """Test that cut-over is refused while the back-fill is still running"""
+    embedding_migration.start_migration("new-model", 8)
+
+    with pytest.raises(embedding_migration.MigrationError):
+        embedding_migration.cutover_migration()
+
+
+def test_chunks_added_after_ready_are_backfilled_on_resume(client, stores, monkeypatch):
+    """Test that a chunk missing the target vector after "ready" reopens the migration instead of blocking cut-over"""
+    chunks, migrations = stores
+    monkeypatch.setattr(embedding_migration, "start_worker", lambda: True)
+    state = embedding_migration.start_migration("new-model", 8)
+    embedding_migration.run_migration(batch_size=2, pause=0)
+
+    # Written by a process that had not picked up the migration yet
+    chunks.docs[5] = {"_id": 5, "doc_id": "late", "chunk_index": 0, "text": "late chunk", "embedding": [0.1] * 4}
+
+    with pytest.raises(embedding_migration.MigrationError):
+        embedding_migration.cutover_migration()
+    assert migrations.docs["migration"]["status"] == "running"
+
+    migrations.docs["migration"]["status"] = "ready"
+    assert client.post("/migrations/embedding/resume").json()["status"] == "running"
+
+    result = embedding_migration.run_migration(batch_size=2, pause=0)
+    assert result["status"] == "ready"
+    assert len(chunks.docs[5][state["field"]]) == 8
+    assert embedding_migration.cutover_migration()["model"] == "new-model"
+
+
+def test_migration_api_reports_conflicts(client, stores):
+    """Test that starting a second migration returns 409"""
+    embedding_migration.start_migration("new-model", 8)
+
+    response = client.post("/migrations/embedding", json={"model": "other", "dim": 256})
+
+    assert response.status_code == 409
+
+
+def test_migration_progress_api(client, stores):
+    """Test that progress reports processed and total chunks"""
+    embedding_migration.start_migration("new-model", 8)
+    embedding_migration.run_migration(batch_size=2, pause=0)
+
+    data = client.get("/migrations/embedding").json()
+
+    assert data["status"] == "ready"
+    assert data["processed"] == 5
+    assert data["total"] == 5
+    assert data["percent"] == 100.0
+
+
+def test_normalize_chunks_rewrites_raw_vectors_once(stores):
+    """Test that the normalize pass stores unit vectors and norms and skips done chunks"""
+    chunks, _ = stores
+    chunks.docs[4].update({"embedding": [1.0, 0.0, 0.0, 0.0], "embedding_norm": 1.0})
+
+    assert embedding_migration.normalize_chunks(batch_size=2) == {"embedding": 4}
+
+    assert chunks.docs[0]["embedding"] == pytest.approx([0.5] * 4)
+    assert chunks.docs[0]["embedding_norm"] == pytest.approx(0.2)
+    assert embedding_migration.normalize_chunks(batch_size=2) == {"embedding": 0}
@@ -0,0 +1,68 @@
+import pytest
+
+from app.core import generation
+from app.core.config import settings
+from app.core.deadline import deadline_scope
+from app.core.generation import generation_options, generation_scope, record_generation
+
+
+@pytest.fixture(autouse=True)
+def reset_rates(monkeypatch):
+    monkeypatch.setattr(generation, "_observed", {"tokens_per_second": None, "prefill_ms": None})
+
+
+def test_default_options_come_from_settings(monkeypatch):
+    """Test that configured defaults are sent and unset options are left out"""
+    monkeypatch.setattr(settings, "LLM_NUM_PREDICT", 256)
+    monkeypatch.setattr(settings, "LLM_TEMPERATURE", 0.1)
+    monkeypatch.setattr(settings, "LLM_STOP", "###,Question:")
+
+    assert generation_options() == {"num_predict": 256, "temperature": 0.1, "stop": ["###", "Question:"]}
+
+
+def test_request_overrides_are_capped(monkeypatch):
+    """Test that per-request options win but cannot lift num_predict past the cap"""
+    monkeypatch.setattr(settings, "LLM_MAX_NUM_PREDICT", 1000)
+
+    with generation_scope({"num_predict": 64, "num_ctx": 4096, "temperature": None}):
+        assert generation_options() == {"num_predict": 64, "num_ctx": 4096}
+    with generation_scope({"num_predict": -1}):
+        assert generation_options()["num_predict"] == 1000
+
+
+def test_budget_mode_derives_num_predict_from_deadline(monkeypatch):
+    """Test that the latency budget caps num_predict by the time left and the observed rate"""
+    monkeypatch.setattr(settings, "LLM_NUM_PREDICT", 512)
+    record_generation({"eval_count": 100, "eval_duration": 2 * 10**9, "prompt_eval_duration": 200 * 10**6})
+
+    with deadline_scope(2.2), generation_scope({"budget": True}):
+        # (2.2s - 0.2s prefill) * 50 tokens/s
+        assert generation_options()["num_predict"] == pytest.approx(100, abs=2)
+    with deadline_scope(0.1), generation_scope({"budget": True}):
+        assert generation_options()["num_predict"] == settings.LLM_MIN_PREDICT
+    with deadline_scope(2.2):
+        assert generation_options()["num_predict"] == 512
+
+
+def test_query_passes_generation_options_to_ollama(client, monkeypatch):
+    """Test that /query options reach the generate call"""
+    sent = {}
+
+    def fake_generate(model, prompt, options=None, keep_alive=None):
+        sent.update(options)
+        return {"response": "answer"}
+
+    monkeypatch.setattr("app.services.query_service.get_embedding", lambda text: [0.1] * 1024)
+    monkeypatch.setattr(
+        "app.services.query_service.chunks_collection.aggregate",
+        lambda pipeline: [{"doc_id": "d", "chunk_index": 0, "text": "context", "score": 0.9}]
+    )
+    monkeypatch.setattr("app.core.ollam_client.ollama.generate", fake_generate)
+
+    response = client.get(
+        "/query",
+        params={"q": "question", "num_predict": 32, "temperature": 0, "stop": ["\n\n", "###"]}
+    )
+
+    assert response.json()["answer"] == "answer"
+    assert sent == {"num_predict": 32, "temperature": 0, "stop": ["\n\n", "###"]}
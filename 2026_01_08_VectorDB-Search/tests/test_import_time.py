@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Generous budget for a cold interpreter; the point is to catch regressions
+# like a heavy dependency sneaking back into the import path
+IMPORT_BUDGET_MS = int(os.getenv("IMPORT_BUDGET_MS", "1500"))
+
+DEFERRED_MODULES = {"ollama", "pypdf", "numpy"}
+
+
+def import_profile(module: str):
+    env = dict(os.environ, MONGO_URI=os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = int(cumulative) / 1000
+
+    return timings
+
+
+def test_app_import_defers_heavy_dependencies():
+    """Test that importing the app does not load Ollama or pypdf"""
+    timings = import_profile("app.main")
+
+    assert "app.main" in timings
+    assert DEFERRED_MODULES.isdisjoint(timings)
+
+
+def test_app_import_time_budget():
+    """Benchmark app import time and guard it against regressions"""
+    timings = import_profile("app.main")
+    elapsed_ms = timings["app.main"]
+
+    assert elapsed_ms < IMPORT_BUDGET_MS, f"app.main import took {elapsed_ms:.1f} ms"
@@ -0,0 +1,88 @@
+import pytest
+from pymongo.errors import OperationFailure
+
+from app.core.config import settings
+from app.db import indexes
+
+
+class FakeCollection:
+    def __init__(self, search_indexes=None, search_supported=True):
+        self.search_indexes = search_indexes or []
+        self.search_supported = search_supported
+        self.btree = []
+        self.created = []
+        self.updated = []
+
+    def create_index(self, keys):
+        self.btree.append(keys)
+
+    def list_search_indexes(self, name):
+        if not self.search_supported:
+            raise OperationFailure("not supported")
+        return [i for i in self.search_indexes if i["name"] == name]
+
+    def create_search_index(self, model):
+        self.created.append(model.document)
+
+    def update_search_index(self, name, definition):
+        self.updated.append((name, definition))
+
+
+def test_vector_index_definition_uses_settings():
+    """Test that vector index dimensions and similarity come from config"""
+    field = indexes.vector_index_definition()["fields"][0]
+
+    assert field["path"] == "embedding"
+    assert field["numDimensions"] == settings.EMBEDDING_DIM
+    assert field["similarity"] == settings.VECTOR_SIMILARITY
+
+
+def test_ensure_indexes_creates_missing_indexes(monkeypatch):
+    """Test that all indexes are created on an empty collection"""
+    collection = FakeCollection()
+    jobs = FakeCollection()
+    monkeypatch.setattr(indexes, "chunk_partitions", lambda: [collection])
+    monkeypatch.setattr(indexes, "jobs_collection", jobs)
+
+    assert indexes.ensure_indexes() == "created"
+    assert [("doc_id", 1)] in collection.btree
+    assert [("status", 1), ("visible_at", 1)] in jobs.btree
+    assert [("doc_id", 1), ("chunk_index", 1)] in collection.btree
+    assert collection.created[0]["name"] == settings.VECTOR_INDEX_NAME
+    assert collection.created[0]["type"] == "vectorSearch"
+
+
+def test_ensure_vector_index_is_idempotent(monkeypatch):
+    """Test that a matching vector index is left untouched"""
+    collection = FakeCollection(search_indexes=[{
+        "name": settings.VECTOR_INDEX_NAME,
+        "latestDefinition": indexes.vector_index_definition()
+    }])
+    monkeypatch.setattr(indexes, "chunk_partitions", lambda: [collection])
+
+    assert indexes.ensure_vector_index() == "unchanged"
+    assert collection.created == []
+    assert collection.updated == []
+
+
+def test_ensure_vector_index_updates_changed_definition(monkeypatch):
+    """Test that a stale vector index definition is updated"""
+    stale = indexes.vector_index_definition()
+    stale["fields"][0]["numDimensions"] = 1
+    collection = FakeCollection(search_indexes=[{
+        "name": settings.VECTOR_INDEX_NAME,
+        "latestDefinition": stale
+    }])
+    monkeypatch.setattr(indexes, "chunk_partitions", lambda: [collection])
+
+    assert indexes.ensure_vector_index() == "updated"
+    assert collection.updated[0][0] == settings.VECTOR_INDEX_NAME
+
+
+def test_ensure_vector_index_without_atlas(monkeypatch):
+    """Test that non-Atlas deployments skip search index provisioning"""
+    collection = FakeCollection(search_supported=False)
+    monkeypatch.setattr(indexes, "chunk_partitions", lambda: [collection])
+
+    assert indexes.ensure_vector_index() == "unsupported"
+    assert collection.created == []
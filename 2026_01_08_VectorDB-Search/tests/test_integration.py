@@ -23,7 +23,7 @@ class TestAPIIntegration:
             return True
         
         monkeypatch.setattr(
-            "app.services.ingestion_service.chunks_collection.insert_many",
+            "app.db.mongodb.chunks_collection.insert_many",
             capture_insert_many
         )
         
@@ -87,7 +87,7 @@ class TestAPIIntegration:
         
         # Mock DB insert
         monkeypatch.setattr(
-            "app.services.pdf_ingestion_service.chunks_collection.insert_many",
+            "app.db.mongodb.chunks_collection.insert_many",
             lambda docs: True
         )
         
@@ -117,7 +117,7 @@ class TestAPIIntegration:
         )
         
         monkeypatch.setattr(
-            "app.services.ingestion_service.chunks_collection.insert_many",
+            "app.db.mongodb.chunks_collection.insert_many",
             lambda docs: True
         )
         
@@ -191,7 +191,7 @@ class TestResponseValidation:
         )
         
         monkeypatch.setattr(
-            "app.services.ingestion_service.chunks_collection.insert_many",
+            "app.db.mongodb.chunks_collection.insert_many",
             lambda docs: True
         )
         
@@ -253,7 +253,7 @@ class TestPerformance:
         )
         
         monkeypatch.setattr(
-            "app.services.ingestion_service.chunks_collection.insert_many",
+            "app.db.mongodb.chunks_collection.insert_many",
             lambda docs: True
         )
         
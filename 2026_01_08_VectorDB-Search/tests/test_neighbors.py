@@ -0,0 +1,79 @@
+from app.services import query_service
+
+
+def chunk(doc_id, idx, score=None):
+    doc = {"doc_id": doc_id, "chunk_index": idx, "text": f"{doc_id}-{idx}", "preview": f"{doc_id}-{idx}"}
+    if score is not None:
+        doc["score"] = score
+    return doc
+
+
+def test_neighbor_keys_skip_hits_and_negative_indexes():
+    """Test that neighbor windows exclude the hits themselves and start at 0"""
+    results = [chunk("a", 0, 0.9), chunk("a", 2, 0.8), chunk("b", 5, 0.7)]
+
+    assert query_service.neighbor_keys(results, 1) == {"a": [1, 3], "b": [4, 6]}
+
+
+def test_order_context_groups_documents_in_reading_order():
+    """Test that context is deduplicated and ordered by document rank then chunk index"""
+    results = [chunk("b", 5, 0.9), chunk("a", 1, 0.8)]
+    neighbors = [chunk("a", 0), chunk("b", 4), chunk("b", 6), chunk("a", 2), chunk("b", 4)]
+
+    ordered = query_service.order_context(results, neighbors)
+
+    assert [(c["doc_id"], c["chunk_index"]) for c in ordered] == [
+        ("b", 4), ("b", 5), ("b", 6), ("a", 0), ("a", 1), ("a", 2)
+    ]
+
+
+def test_query_with_neighbors_fetches_once_and_expands_context(client, monkeypatch):
+    """Test that ?neighbors=N adds adjacent chunks with a single indexed query"""
+    finds = []
+    contexts = []
+
+    def find(query, projection):
+        finds.append(query)
+        return [
+            chunk(clause["doc_id"], idx)
+            for clause in query["$or"]
+            for idx in clause["chunk_index"]["$in"]
+            if idx < 4
+        ]
+
+    monkeypatch.setattr("app.services.query_service.get_embedding", lambda text: [0.1] * 1024)
+    monkeypatch.setattr(
+        "app.services.query_service.chunks_collection.aggregate",
+        lambda pipeline: [chunk("a", 3, 0.9), chunk("a", 1, 0.8)]
+    )
+    monkeypatch.setattr("app.services.query_service.chunks_collection.find", find)
+    monkeypatch.setattr(
+        "app.services.query_service.generate_answer",
+        lambda context, question: contexts.append(context) or "answer"
+    )
+
+    data = client.get("/query", params={"q": "question", "top_k": 2, "neighbors": 1}).json()
+
+    assert finds == [{"$or": [{"doc_id": "a", "chunk_index": {"$in": [0, 2, 4]}}]}]
+    assert [c["chunk_index"] for c in data["context_chunks"]] == [0, 1, 2, 3]
+    assert contexts == ["a-0\na-1\na-2\na-3"]
+    assert [c["chunk_index"] for c in data["chunks_used"]] == [3, 1]
+
+
+def test_query_without_neighbors_does_not_fetch(client, monkeypatch):
+    """Test that neighbor expansion is off by default"""
+    def no_find(*args, **kwargs):
+        raise AssertionError("no neighbor query expected")
+
+    monkeypatch.setattr("app.services.query_service.get_embedding", lambda text: [0.1] * 1024)
+    monkeypatch.setattr(
+        "app.services.query_service.chunks_collection.aggregate",
+        lambda pipeline: [chunk("a", 3, 0.9)]
+    )
+    monkeypatch.setattr("app.services.query_service.chunks_collection.find", no_find)
+    monkeypatch.setattr("app.services.query_service.generate_answer", lambda context, question: "answer")
+
+    data = client.get("/query", params={"q": "question"}).json()
+
+    assert data["answer"] == "answer"
+    assert "context_chunks" not in data
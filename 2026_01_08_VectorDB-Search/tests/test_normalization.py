@@ -0,0 +1,83 @@
+import pytest
+
+from app.core.config import settings
+from app.core.embedding_profile import active_profile, vector_fields
+from app.db import indexes
+from app.utils.scoring import cosine_scores, dot_scores
+
+
+def test_vector_fields_store_unit_vector_and_norm():
+    """Test that ingested vectors are stored at unit length with their norm"""
+    fields = vector_fields(active_profile(), [3.0, 4.0])
+
+    assert fields["embedding"] == pytest.approx([0.6, 0.8])
+    assert fields["embedding_norm"] == pytest.approx(5.0)
+
+
+def test_vector_fields_raw_when_normalization_disabled(monkeypatch):
+    """Test that NORMALIZE_EMBEDDINGS=false keeps the raw vector"""
+    monkeypatch.setattr(settings, "NORMALIZE_EMBEDDINGS", False)
+
+    fields = vector_fields(active_profile(), [3.0, 4.0])
+
+    assert fields["embedding"] == [3.0, 4.0]
+    assert "embedding_norm" not in fields
+
+
+def test_cosine_scores_match_dot_scores_on_unit_rows():
+    """Test that cosine of raw rows equals the dot product of their unit vectors"""
+    raw = [[3.0, 4.0], [1.0, 0.0], [0.0, 2.0]]
+    unit = [[0.6, 0.8], [1.0, 0.0], [0.0, 1.0]]
+    query = [2.0, 0.0]
+
+    expected = [0.6, 1.0, 0.0]
+    assert cosine_scores(raw, query) == pytest.approx(expected)
+    assert dot_scores(unit, [1.0, 0.0]) == pytest.approx(expected)
+    # Mixed: only the first row still needs its norm divided out
+    assert cosine_scores([[3.0, 4.0], [1.0, 0.0]], query, unit_rows=[False, True]) == pytest.approx([0.6, 1.0])
+
+
+def test_rescoring_reorders_candidates_by_exact_similarity(client, monkeypatch):
+    """Test that RESCORE_FACTOR fetches extra candidates and re-ranks them locally"""
+    pipelines = []
+
+    def aggregate(pipeline):
+        pipelines.append(pipeline)
+        return [
+            {"doc_id": "d", "chunk_index": 0, "text": "far", "score": 0.99,
+             "embedding": [0.0, 1.0], "embedding_norm": 1.0},
+            {"doc_id": "d", "chunk_index": 1, "text": "near", "score": 0.5,
+             "embedding": [3.0, 0.1]},
+            {"doc_id": "d", "chunk_index": 2, "text": "mid", "score": 0.4,
+             "embedding": [0.6, 0.8], "embedding_norm": 1.0}
+        ]
+
+    monkeypatch.setattr(settings, "RESCORE_FACTOR", 3)
+    monkeypatch.setattr("app.services.query_service.get_embedding", lambda text: [2.0, 0.0])
+    monkeypatch.setattr("app.services.query_service.chunks_collection.aggregate", aggregate)
+
+    data = client.get("/query", params={"q": "question", "top_k": 2, "mode": "retrieve"}).json()
+
+    search = pipelines[0][0]["$vectorSearch"]
+    assert search["limit"] == 6
+    assert search["queryVector"] == [1.0, 0.0]
+    assert pipelines[0][1]["$project"]["embedding"] == 1
+    assert [c["chunk_index"] for c in data["chunks_used"]] == [1, 2]
+    assert data["chunks_used"][1]["score"] == pytest.approx(0.6, abs=1e-3)
+
+
+def test_dot_product_index_definition(monkeypatch):
+    """Test that VECTOR_SIMILARITY=dotProduct reaches the vector index"""
+    monkeypatch.setattr(settings, "VECTOR_SIMILARITY", "dotProduct")
+
+    assert indexes.vector_index_definition()["fields"][0]["similarity"] == "dotProduct"
+
+
+def test_scoring_benchmark_reports_every_layout():
+    """Test the scoring benchmark on the bundled chunk embeddings"""
+    from benchmarks.scoring import load_embeddings, run
+
+    report = run(load_embeddings(), [20], repeat=1)
+
+    assert report[0]["candidates"] == 20
+    assert all(report[0][key] > 0 for key in ("python_cosine_ms", "numpy_dot_ms"))
@@ -0,0 +1,111 @@
+import threading
+import time
+import ollama
+import pytest
+
+from app.core.ollama_pool import OllamaPool, NoHealthyNode
+from benchmarks.standin_ollama import StandInOllama
+
+
+def embed(pool, hedge=False):
+    return pool.call("embeddings", hedge=hedge, model="m", prompt="text")
+
+
+def test_pool_balances_by_outstanding_requests():
+    """Test that concurrent calls are spread over all nodes"""
+    with StandInOllama(delay=0.05) as a, StandInOllama(delay=0.05) as b:
+        pool = OllamaPool([a.url, b.url])
+
+        threads = [threading.Thread(target=embed, args=(pool,)) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert a.requests + b.requests == 8
+        assert abs(a.requests - b.requests) <= 2
+        pool.close()
+
+
+def test_pool_ejects_failing_node_and_fails_over():
+    """Test that a failing node is ejected and calls move to healthy nodes"""
+    with StandInOllama() as good, StandInOllama() as bad:
+        bad.failing = True
+        pool = OllamaPool([bad.url, good.url], failure_threshold=2, eject_seconds=60)
+
+        for _ in range(4):
+            assert len(embed(pool)["embedding"]) == 1024
+
+        status = {node["host"]: node for node in pool.status()}
+        assert status[bad.url]["healthy"] is False
+        assert status[good.url]["healthy"] is True
+
+        requests_before = bad.requests
+        embed(pool)
+        assert bad.requests == requests_before
+        pool.close()
+
+
+def test_pool_raises_client_errors_without_ejecting_nodes():
+    """Test that a missing model is reported as-is and never counts against a node"""
+    with StandInOllama() as a, StandInOllama() as b:
+        a.models = b.models = ["m"]
+        pool = OllamaPool([a.url, b.url], failure_threshold=1, eject_seconds=60)
+
+        for _ in range(3):
+            with pytest.raises(ollama.ResponseError) as excinfo:
+                pool.call("embeddings", model="missing", prompt="text")
+            assert excinfo.value.status_code == 404
+
+        # No failover: each bad request reached exactly one node
+        assert a.requests + b.requests == 3
+        assert all(node["healthy"] and node["consecutive_failures"] == 0 for node in pool.status())
+        assert len(embed(pool)["embedding"]) == 1024
+        pool.close()
+
+
+def test_health_check_ejects_and_restores_nodes():
+    """Test that active health checks eject and later re-admit a node"""
+    with StandInOllama() as node:
+        pool = OllamaPool([node.url], eject_seconds=60)
+
+        node.failing = True
+        assert pool.check_health()[0]["healthy"] is False
+        with pytest.raises(NoHealthyNode):
+            embed(pool)
+
+        node.failing = False
+        assert pool.check_health()[0]["healthy"] is True
+        assert embed(pool)["embedding"]
+        pool.close()
+
+
+def test_hedged_embedding_beats_slow_node():
+    """Test that a hedged request is answered by the fast node"""
+    with StandInOllama(delay=1.0) as slow, StandInOllama() as fast:
+        pool = OllamaPool([slow.url, fast.url], hedge=True, hedge_min_delay=0.05)
+
+        started = time.monotonic()
+        result = embed(pool, hedge=True)
+        elapsed = time.monotonic() - started
+
+        assert len(result["embedding"]) == 1024
+        assert elapsed < 0.5
+        assert slow.requests == 1
+        assert fast.requests == 1
+        pool.close()
+
+
+def test_ollama_client_uses_pool_when_hosts_configured(monkeypatch):
+    """Test that OLLAMA_HOSTS routes client calls through the pool"""
+    from app.core import ollama_pool
+    from app.core.config import settings
+    from app.core.ollam_client import generate_answer
+
+    with StandInOllama(name="node-a") as node:
+        monkeypatch.setattr(settings, "OLLAMA_HOSTS", node.url)
+        ollama_pool.close_pool()
+        try:
+            assert generate_answer("context", "question") == "node-a"
+        finally:
+            ollama_pool.close_pool()
@@ -0,0 +1,117 @@
+import time
+import pytest
+
+from app.core.config import settings
+from app.db import partitions
+from app.services import query_service
+from app.services.bulk_ingestion_service import embed_and_insert
+
+
+class FakePartition:
+    def __init__(self, hits=(), delay=0.0, error=None):
+        self.hits = list(hits)
+        self.delay = delay
+        self.error = error
+        self.inserted = []
+        self.calls = []
+
+    def aggregate(self, pipeline, maxTimeMS=None):
+        self.calls.append(maxTimeMS)
+        if self.delay:
+            time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return sorted(self.hits, key=lambda hit: hit["score"], reverse=True)
+
+    def insert_many(self, documents, ordered=True):
+        self.inserted.extend(documents)
+
+
+def hit(doc_id, score):
+    return {"doc_id": doc_id, "chunk_index": 0, "preview": doc_id, "text": doc_id, "score": score}
+
+
+@pytest.fixture
+def fanout(monkeypatch):
+    """Install fake partitions behind query_service"""
+    def install(*fakes):
+        monkeypatch.setattr(query_service, "partitioned", lambda: True)
+        monkeypatch.setattr(query_service, "chunk_partitions", lambda: list(fakes))
+        return fakes
+    return install
+
+
+def test_partition_routing_is_stable(monkeypatch):
+    """Test that doc_ids map to the same partition every time"""
+    monkeypatch.setattr(settings, "CHUNK_PARTITIONS", 4)
+
+    indexes = {doc_id: partitions.partition_index(doc_id) for doc_id in map(str, range(200))}
+
+    assert set(indexes.values()) == {0, 1, 2, 3}
+    assert all(partitions.partition_index(d) == i for d, i in indexes.items())
+
+
+def test_partition_collections_follow_settings(monkeypatch):
+    """Test that partition collections are named per partition and spread over clusters"""
+    monkeypatch.setattr(settings, "CHUNK_PARTITIONS", 3)
+    monkeypatch.setattr(settings, "CHUNK_PARTITION_URIS", "mongodb://a, mongodb://b")
+
+    collections = partitions.chunk_partitions()
+
+    assert [c._name for c in collections] == [f"{settings.CHUNKS_COLLECTION}_p{i}" for i in range(3)]
+    assert [c._uri for c in collections] == ["mongodb://a", "mongodb://b", "mongodb://a"]
+
+    monkeypatch.setattr(settings, "CHUNK_PARTITIONS", 1)
+    from app.db.mongodb import chunks_collection
+    assert partitions.chunk_partitions() == [chunks_collection]
+
+
+def test_bulk_insert_routes_chunks_to_their_partition(monkeypatch):
+    """Test that a cross-document batch is split by partition on insert"""
+    fakes = [FakePartition(), FakePartition()]
+    monkeypatch.setattr(settings, "CHUNK_PARTITIONS", 2)
+    monkeypatch.setattr(partitions, "chunk_partitions", lambda: fakes)
+    monkeypatch.setattr(
+        "app.services.bulk_ingestion_service.get_embeddings",
+        lambda texts, profile=None: [[0.1] * 1024 for _ in texts]
+    )
+
+    batch = [(str(doc), 0, f"text {doc}") for doc in range(20)]
+    embed_and_insert(batch)
+
+    assert sum(len(f.inserted) for f in fakes) == 20
+    for index, fake in enumerate(fakes):
+        assert all(partitions.partition_index(d["doc_id"]) == index for d in fake.inserted)
+
+
+def test_search_merges_global_top_k(fanout):
+    """Test that per-partition hits are merged into one global ranking"""
+    fanout(
+        FakePartition([hit("a", 0.9), hit("b", 0.4)]),
+        FakePartition([hit("c", 0.8), hit("d", 0.7)]),
+        FakePartition([hit("e", 0.1)])
+    )
+
+    results = query_service.search_chunks([0.1] * 1024, top_k=3, mode="retrieve")
+
+    assert [r["doc_id"] for r in results] == ["a", "c", "d"]
+    assert results.skipped_partitions == []
+
+
+def test_slow_or_failing_partition_is_skipped(fanout, monkeypatch):
+    """Test that a slow shard or a failing one cannot stall or fail the query"""
+    monkeypatch.setattr(settings, "PARTITION_TIMEOUT_MS", 100)
+    slow, broken, healthy = fanout(
+        FakePartition([hit("slow", 0.99)], delay=1.0),
+        FakePartition(error=RuntimeError("shard down")),
+        FakePartition([hit("ok", 0.5)])
+    )
+    monkeypatch.setattr(query_service, "get_embedding", lambda text: [0.1] * 1024)
+
+    started = time.perf_counter()
+    result = query_service.query_document("question", top_k=2, mode="retrieve")
+
+    assert time.perf_counter() - started < 0.8
+    assert [c["doc_id"] for c in result["chunks_used"]] == ["ok"]
+    assert result["partitions_skipped"] == [0, 1]
+    assert healthy.calls == [100]
@@ -15,7 +15,7 @@ def test_pdf_upload_success(client, monkeypatch):
     )
 
     monkeypatch.setattr(
-        "app.services.pdf_ingestion_service.chunks_collection.insert_many",
+        "app.db.mongodb.chunks_collection.insert_many",
         lambda docs: True
     )
 
@@ -96,7 +96,7 @@ def test_pdf_upload_response_structure(client, monkeypatch):
     )
 
     monkeypatch.setattr(
-        "app.services.pdf_ingestion_service.chunks_collection.insert_many",
+        "app.db.mongodb.chunks_collection.insert_many",
         lambda docs: True
     )
 
@@ -138,7 +138,7 @@ def test_pdf_upload_multiple_files_sequentially(client, monkeypatch):
     )
 
     monkeypatch.setattr(
-        "app.services.pdf_ingestion_service.chunks_collection.insert_many",
+        "app.db.mongodb.chunks_collection.insert_many",
         lambda docs: True
     )
 
@@ -166,3 +166,33 @@ def test_pdf_upload_multiple_files_sequentially(client, monkeypatch):
     doc_id_1 = response1.json()["doc_id"]
     doc_id_2 = response2.json()["doc_id"]
     assert doc_id_1 != doc_id_2
+
+
+def test_pdf_upload_server_timing(client, monkeypatch):
+    """Test that PDF uploads report extract, split and insert timings"""
+    monkeypatch.setattr(
+        "app.services.pdf_ingestion_service.extract_text_from_pdf",
+        lambda path: "Timed PDF content"
+    )
+    monkeypatch.setattr(
+        "app.services.pdf_ingestion_service.get_embedding",
+        lambda text: [0.1] * 1024
+    )
+    monkeypatch.setattr(
+        "app.db.mongodb.chunks_collection.insert_many",
+        lambda docs: True
+    )
+    monkeypatch.setattr(
+        "app.services.pdf_ingestion_service.os.remove",
+        lambda path: True
+    )
+
+    response = client.post(
+        "/upload-pdf?debug=timing",
+        files={"file": ("test.pdf", BytesIO(b"%PDF-1.4"), "application/pdf")}
+    )
+
+    header = response.headers["server-timing"]
+    for stage in ("extract", "split", "insert"):
+        assert f"{stage};dur=" in header
+    assert set(response.json()["timing"]["stages"]) == {"extract", "split", "insert"}
@@ -223,3 +223,139 @@ def test_query_api_score_rounding(client, monkeypatch):
     data = response.json()
     # Score should be rounded to 3 decimal places
     assert data["chunks_used"][0]["score"] == 0.877
+
+
+def test_query_api_retrieve_mode_skips_llm(client, monkeypatch):
+    """Test that retrieve mode returns ranked chunks without generating"""
+    captured = {}
+
+    monkeypatch.setattr(
+        "app.services.query_service.get_embedding",
+        lambda text: [0.1] * 1024
+    )
+
+    def fake_aggregate(pipeline):
+        captured["project"] = pipeline[1]["$project"]
+        return [
+            {"doc_id": "d1", "preview": "Ranked chunk", "score": 0.91, "chunk_index": 4}
+        ]
+
+    monkeypatch.setattr(
+        "app.services.query_service.chunks_collection.aggregate",
+        fake_aggregate
+    )
+
+    def fail_generate(context, question):
+        raise AssertionError("retrieve mode must not call the LLM")
+
+    monkeypatch.setattr("app.services.query_service.generate_answer", fail_generate)
+
+    response = client.get("/query?q=Test&mode=retrieve")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert "answer" not in data
+    assert data["chunks_used"][0]["doc_id"] == "d1"
+    assert data["chunks_used"][0]["preview"] == "Ranked chunk..."
+    assert "text" not in captured["project"]
+    assert "text_z" not in captured["project"]
+
+
+def test_query_api_answer_with_sources_returns_full_text(client, monkeypatch):
+    """Test that answer+sources mode returns the full chunk text"""
+    long_text = "A" * 500
+
+    monkeypatch.setattr(
+        "app.services.query_service.get_embedding",
+        lambda text: [0.1] * 1024
+    )
+    monkeypatch.setattr(
+        "app.services.query_service.chunks_collection.aggregate",
+        lambda pipeline: [{"text": long_text, "score": 0.85, "chunk_index": 0}]
+    )
+    monkeypatch.setattr(
+        "app.services.query_service.generate_answer",
+        lambda context, question: "Answer"
+    )
+
+    response = client.get("/query", params={"q": "Test", "mode": "answer+sources"})
+
+    assert response.status_code == 200
+    chunk = response.json()["chunks_used"][0]
+    assert chunk["text"] == long_text
+    assert len(chunk["preview"]) == 403
+
+
+def test_query_api_invalid_mode(client):
+    """Test that an unknown mode is rejected"""
+    response = client.get("/query?q=Test&mode=summarize")
+
+    assert response.status_code == 422
+
+
+def test_query_api_rejects_top_k_above_limit(client):
+    """Test that top_k is capped so $vectorSearch never exceeds Atlas limits"""
+    response = client.get("/query", params={"q": "Test", "top_k": 20000})
+
+    assert response.status_code == 422
+
+
+def test_search_clamps_num_candidates_to_atlas_maximum(monkeypatch):
+    """Test that a large rescore window never asks Atlas for more than 10000 candidates"""
+    from app.core.config import settings
+    from app.services.query_service import search_chunks
+
+    pipelines = []
+    monkeypatch.setattr(settings, "RESCORE_FACTOR", 200)
+    monkeypatch.setattr(
+        "app.services.query_service.chunks_collection.aggregate",
+        lambda pipeline: pipelines.append(pipeline) or []
+    )
+
+    search_chunks([0.1] * 1024, top_k=100, mode="retrieve")
+
+    stage = pipelines[0][0]["$vectorSearch"]
+    assert stage["numCandidates"] == 10000
+    assert stage["limit"] <= stage["numCandidates"]
+
+
+def test_query_api_server_timing_header(client, monkeypatch):
+    """Test that /query reports per-stage durations in Server-Timing"""
+    monkeypatch.setattr(
+        "app.core.ollam_client.ollama.embed",
+        lambda model, input, keep_alive=None: {"embeddings": [[0.1] * 1024]}
+    )
+    monkeypatch.setattr(
+        "app.core.ollam_client.ollama.generate",
+        lambda model, prompt, options=None, keep_alive=None: {"response": "Answer"}
+    )
+    monkeypatch.setattr(
+        "app.services.query_service.chunks_collection.aggregate",
+        lambda pipeline: [{"text": "Chunk", "score": 0.9, "chunk_index": 0}]
+    )
+
+    response = client.get("/query?q=Test")
+
+    assert response.status_code == 200
+    header = response.headers["server-timing"]
+    for stage in ("embed", "search", "generate", "total"):
+        assert f"{stage};dur=" in header
+    assert "timing" not in response.json()
+
+
+def test_query_api_debug_timing_in_body(client, monkeypatch):
+    """Test that ?debug=timing returns the stage breakdown in the body"""
+    monkeypatch.setattr(
+        "app.services.query_service.get_embedding",
+        lambda text: [0.1] * 1024
+    )
+    monkeypatch.setattr(
+        "app.services.query_service.chunks_collection.aggregate",
+        lambda pipeline: []
+    )
+
+    response = client.get("/query?q=Test&debug=timing")
+
+    timing = response.json()["timing"]
+    assert timing["stages"]["search"]["count"] == 1
+    assert timing["total_ms"] >= timing["stages"]["search"]["ms"]
@@ -0,0 +1,125 @@
+import json
+import pytest
+
+from app.core import query_log
+from app.core.config import settings
+from benchmarks.replay import compare, load_records, replay
+
+
+@pytest.fixture
+def log_path(tmp_path, monkeypatch):
+    path = tmp_path / "queries.jsonl"
+    monkeypatch.setattr(settings, "QUERY_LOG_PATH", str(path))
+    monkeypatch.setattr(settings, "QUERY_LOG_SAMPLE_RATE", 1.0)
+    yield path
+    query_log.close_log()
+
+
+@pytest.fixture
+def fake_rag(monkeypatch):
+    monkeypatch.setattr("app.services.query_service.get_embedding", lambda text: [0.1] * 1024)
+    monkeypatch.setattr(
+        "app.services.query_service.chunks_collection.aggregate",
+        lambda pipeline: [
+            {"doc_id": "d", "chunk_index": 2, "text": "GlideCloud builds cloud tools.", "score": 0.9},
+            {"doc_id": "d", "chunk_index": 5, "text": "It was founded in 2020.", "score": 0.7}
+        ]
+    )
+    monkeypatch.setattr(
+        "app.services.query_service.generate_answer",
+        lambda context, question: f"answer to {question}"
+    )
+
+
+def test_sampled_queries_are_logged_with_timings(client, log_path, fake_rag):
+    """Test that a sampled query is appended with params, stages, answer and chunk ids"""
+    client.get("/query", params={"q": "What is GlideCloud?", "top_k": 2})
+
+    record = json.loads(log_path.read_text().splitlines()[0])
+    assert record["params"] == {"q": "What is GlideCloud?", "mode": "answer", "top_k": 2}
+    assert record["status"] == 200
+    assert record["answer"] == "answer to What is GlideCloud?"
+    assert record["chunks"] == [["d", 2], ["d", 5]]
+    assert "search" in record["stages"]
+    assert record["latency_ms"] > 0
+
+
+def test_query_log_is_off_or_sampled(client, log_path, fake_rag, monkeypatch):
+    """Test that nothing is written at sample rate 0 or without a path"""
+    monkeypatch.setattr(settings, "QUERY_LOG_SAMPLE_RATE", 0.0)
+    client.get("/query", params={"q": "question"})
+    monkeypatch.setattr(settings, "QUERY_LOG_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(settings, "QUERY_LOG_PATH", "")
+    client.get("/query", params={"q": "question"})
+
+    assert not log_path.exists()
+
+
+def test_failed_queries_are_logged_with_status(client, log_path, monkeypatch):
+    """Test that a query that fails is still logged with its error status"""
+    def failing(text):
+        raise RuntimeError("embedding down")
+
+    monkeypatch.setattr("app.services.query_service.get_embedding", failing)
+
+    with pytest.raises(RuntimeError):
+        client.get("/query", params={"q": "question"})
+
+    assert json.loads(log_path.read_text())["status"] == 500
+
+
+def test_replay_reproduces_log_and_compares_runs(client, log_path, fake_rag):
+    """Test that a replayed log matches the original answers and chunks"""
+    for q in ("first question", "second question", "third question"):
+        client.get("/query", params={"q": q, "top_k": 2})
+    records = load_records(log_path)
+
+    results = replay(records, client, speed=0, concurrency=2)
+    report = compare(records, results)
+
+    assert [r["params"]["q"] for r in results] == ["first question", "second question", "third question"]
+    assert report["compared"] == 3
+    assert report["chunk_overlap"] == 1.0
+    assert report["identical_answers"] == 3
+    assert report["candidate"]["errors"] == 0
+    assert report["candidate"]["p50"] is not None
+
+
+def test_replay_records_broken_responses_as_failures():
+    """Test that a non-JSON 200 or an unexpected exception becomes a status 0 result"""
+    class NotJson:
+        status_code = 200
+
+        def json(self):
+            raise ValueError("Expecting value")
+
+    class FlakyClient:
+        def get(self, path, params):
+            if params["q"] == "broken":
+                raise RuntimeError("connection reset")
+            return NotJson()
+
+    records = [
+        {"ts": 0, "params": {"q": "html"}, "status": 200, "latency_ms": 1.0, "answer": "a", "chunks": [], "degraded": []},
+        {"ts": 0, "params": {"q": "broken"}, "status": 200, "latency_ms": 1.0, "answer": "a", "chunks": [], "degraded": []}
+    ]
+
+    results = replay(records, FlakyClient(), speed=0, concurrency=2)
+
+    assert [r["status"] for r in results] == [0, 0]
+    report = compare(records, results)
+    assert report["candidate"]["errors"] == 2
+    assert report["compared"] == 0
+
+
+def test_compare_reports_partial_overlap():
+    """Test that chunk and answer overlap are scored per query"""
+    base = {"ts": 0, "params": {"q": "q"}, "status": 200, "latency_ms": 10.0, "degraded": []}
+    baseline = [dict(base, answer="cloud tools", chunks=[["d", 1], ["d", 2]])]
+    candidate = [dict(base, answer="cloud tools", chunks=[["d", 1], ["d", 3]], latency_ms=30.0)]
+
+    report = compare(baseline, candidate)
+
+    assert report["chunk_overlap"] == pytest.approx(1 / 3)
+    assert report["answer_overlap"] == 1.0
+    assert report["candidate"]["p99"] == 30.0
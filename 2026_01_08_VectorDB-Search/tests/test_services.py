@@ -168,7 +168,7 @@ def test_ingest_document_service(monkeypatch):
     )
 
     monkeypatch.setattr(
-        "app.services.ingestion_service.chunks_collection.insert_many",
+        "app.db.mongodb.chunks_collection.insert_many",
         lambda docs: True
     )
 
@@ -185,7 +185,7 @@ def test_ingest_document_empty_string(monkeypatch):
     from app.services.ingestion_service import ingest_document
     
     monkeypatch.setattr(
-        "app.services.ingestion_service.chunks_collection.insert_many",
+        "app.db.mongodb.chunks_collection.insert_many",
         lambda docs: True
     )
 
@@ -210,7 +210,7 @@ def test_ingest_pdf_service(monkeypatch):
     )
 
     monkeypatch.setattr(
-        "app.services.pdf_ingestion_service.chunks_collection.insert_many",
+        "app.db.mongodb.chunks_collection.insert_many",
         lambda docs: True
     )
 
@@ -243,3 +243,77 @@ def test_ingest_pdf_empty_content(monkeypatch):
     result = ingest_pdf("empty.pdf")
 
     assert "No readable text found in PDF" in result["message"]
+
+
+def test_mongodb_client_is_created_lazily_per_process(monkeypatch):
+    """Test that the Mongo client is built on first use and rebuilt after a fork"""
+    from app.db import mongodb
+
+    mongodb.close_client()
+    assert mongodb._client is None
+
+    first = mongodb.get_client()
+    assert mongodb.get_client() is first
+
+    monkeypatch.setattr("app.db.mongodb.os.getpid", lambda: -1)
+    assert mongodb.get_client() is not first
+
+    mongodb.close_client()
+
+
+def test_query_document_with_compressed_chunks(monkeypatch):
+    """Test that compressed chunks are decompressed into the context"""
+    from app.utils.chunk_codec import encode_chunk_text
+
+    text = "GlideCloud compresses stored chunk text. " * 20
+    captured = {}
+
+    monkeypatch.setattr(
+        "app.services.query_service.get_embedding",
+        lambda text: [0.1] * 1024
+    )
+
+    monkeypatch.setattr(
+        "app.services.query_service.chunks_collection.aggregate",
+        lambda pipeline: [
+            {"chunk_index": 0, "score": 0.9, **encode_chunk_text(text, codec="zlib")}
+        ]
+    )
+
+    def fake_generate_answer(context, question):
+        captured["context"] = context
+        return "Answer"
+
+    monkeypatch.setattr(
+        "app.services.query_service.generate_answer",
+        fake_generate_answer
+    )
+
+    response = query_document("Test")
+
+    assert captured["context"] == text
+    assert response["chunks_used"][0]["preview"] == text[:400] + "..."
+
+
+def test_ingest_document_stores_preview_and_compressed_text(monkeypatch):
+    """Test that ingestion stores a preview and compressed text when enabled"""
+    from app.services.ingestion_service import ingest_document
+    from app.core.config import settings
+
+    stored = []
+
+    monkeypatch.setattr(settings, "CHUNK_TEXT_COMPRESSION", "zlib")
+    monkeypatch.setattr(
+        "app.services.ingestion_service.get_embedding",
+        lambda text: [0.1] * 1024
+    )
+    monkeypatch.setattr(
+        "app.db.mongodb.chunks_collection.insert_many",
+        lambda docs: stored.extend(docs)
+    )
+
+    ingest_document("Test document content")
+
+    assert stored[0]["preview"] == "Test document content"
+    assert stored[0]["text_codec"] == "zlib"
+    assert "text" not in stored[0]
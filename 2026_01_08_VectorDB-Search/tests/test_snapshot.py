@@ -0,0 +1,138 @@
+import json
+import os
+import numpy as np
+import pytest
+
+from app.core import embedding_profile
+from app.core.embedding_profile import make_profile
+from app.services import snapshot_service
+from app.utils.chunk_codec import encode_chunk_text, decode_chunk_text
+
+
+class FakeCursor(list):
+    def sort(self, key, direction):
+        return FakeCursor(sorted(self, key=lambda doc: doc[key], reverse=direction < 0))
+
+    def limit(self, n):
+        return FakeCursor(self[:n])
+
+
+class FakeChunks:
+    def __init__(self, docs=None):
+        self.docs = list(docs or [])
+        self.insert_calls = []
+
+    def count_documents(self, query):
+        return len(self.docs)
+
+    def find(self, query, projection=None, batch_size=None):
+        keep = {key for key, value in projection.items() if value} if projection else None
+        return FakeCursor(
+            {k: v for k, v in doc.items() if keep is None or k in keep or k == "_id"}
+            for doc in self.docs
+        )
+
+    def insert_many(self, documents, ordered=True):
+        self.insert_calls.append((len(documents), ordered))
+        self.docs.extend(dict(doc, _id=len(self.docs) + i) for i, doc in enumerate(documents))
+
+    def delete_many(self, query):
+        self.docs = []
+
+
+def sample_chunks(count):
+    docs = []
+    for i in range(count):
+        doc = {
+            "_id": i,
+            "doc_id": f"doc-{i // 3}",
+            "chunk_index": i % 3,
+            **encode_chunk_text(f"chunk number {i}", codec="zlib" if i % 2 else "none"),
+            "embedding": [float(i)] * 4,
+            "embedding_model": "mxbai-embed-large",
+            "embedding_dim": 4
+        }
+        docs.append(doc)
+    return docs
+
+
+@pytest.fixture
+def profiles():
+    embedding_profile.set_profiles({**embedding_profile.default_profile(), "dim": 4})
+    yield
+    embedding_profile.set_profiles()
+
+
+def test_snapshot_round_trip(tmp_path, monkeypatch, profiles):
+    """Test that export then import restores chunks and vectors exactly"""
+    source = FakeChunks(sample_chunks(7))
+    monkeypatch.setattr(snapshot_service, "chunk_partitions", lambda: [source])
+
+    manifest = snapshot_service.export_snapshot(str(tmp_path), fmt="jsonl", batch_size=3)
+
+    assert manifest["count"] == 7
+    vectors = np.load(tmp_path / "embedding.npy", mmap_mode="r")
+    assert vectors.dtype == np.float32 and vectors.shape == (7, 4)
+    assert json.loads((tmp_path / "manifest.json").read_text())["metadata"] == "chunks.jsonl"
+
+    target = FakeChunks()
+    monkeypatch.setattr(snapshot_service, "chunk_partitions", lambda: [target])
+
+    summary = snapshot_service.import_snapshot(str(tmp_path), batch_size=3)
+
+    assert summary["inserted"] == 7
+    assert sorted(target.insert_calls) == [(1, False), (3, False), (3, False)]
+
+    strip = lambda doc: {k: v for k, v in doc.items() if k != "_id"}
+    restored = sorted((strip(d) for d in target.docs), key=lambda d: (d["doc_id"], d["chunk_index"]))
+    expected = sorted((strip(d) for d in source.docs), key=lambda d: (d["doc_id"], d["chunk_index"]))
+    assert restored == expected
+
+
+def test_snapshot_keeps_partial_migration_vectors(tmp_path, monkeypatch, profiles):
+    """Test that chunks not yet back-filled for a migration target import without that field"""
+    target_profile = make_profile("nomic-embed-text", 2)
+    embedding_profile.set_profiles({**embedding_profile.default_profile(), "dim": 4}, target_profile)
+
+    docs = sample_chunks(2)
+    docs[0].update({
+        target_profile["field"]: [0.5, 0.5],
+        f"{target_profile['field']}_model": "nomic-embed-text",
+        f"{target_profile['field']}_dim": 2
+    })
+    exported = FakeChunks(docs)
+    monkeypatch.setattr(snapshot_service, "chunk_partitions", lambda: [exported])
+
+    snapshot_service.export_snapshot(str(tmp_path), fmt="jsonl")
+    assert os.path.exists(tmp_path / f"{target_profile['field']}.npy")
+
+    restored = FakeChunks()
+    monkeypatch.setattr(snapshot_service, "chunk_partitions", lambda: [restored])
+    snapshot_service.import_snapshot(str(tmp_path))
+
+    first, second = sorted(restored.docs, key=lambda d: d["chunk_index"])
+    assert first[target_profile["field"]] == [0.5, 0.5]
+    assert target_profile["field"] not in second
+    assert f"{target_profile['field']}_model" not in second
+
+
+def test_snapshot_parquet_round_trip(tmp_path, monkeypatch, profiles):
+    """Test that the Parquet metadata format round-trips when pyarrow is installed"""
+    pytest.importorskip("pyarrow")
+    exported = FakeChunks(sample_chunks(4))
+    monkeypatch.setattr(snapshot_service, "chunk_partitions", lambda: [exported])
+    snapshot_service.export_snapshot(str(tmp_path), fmt="parquet")
+
+    restored = FakeChunks()
+    monkeypatch.setattr(snapshot_service, "chunk_partitions", lambda: [restored])
+
+    assert snapshot_service.import_snapshot(str(tmp_path))["inserted"] == 4
+    assert sorted(decode_chunk_text(d) for d in restored.docs) == [f"chunk number {i}" for i in range(4)]
+
+
+def test_import_rejects_unknown_snapshot_version(tmp_path):
+    """Test that import refuses snapshots written by a different format version"""
+    (tmp_path / "manifest.json").write_text(json.dumps({"version": 99}))
+
+    with pytest.raises(ValueError):
+        snapshot_service.import_snapshot(str(tmp_path))
@@ -121,7 +121,7 @@ def test_pdf_reader_integration(monkeypatch):
         def __init__(self, path):
             self.pages = [MockPage(), MockPage()]
     
-    monkeypatch.setattr("app.utils.pdf_reader.PdfReader", MockPdfReader)
+    monkeypatch.setattr("app.utils.pdf_reader.pypdf.PdfReader", MockPdfReader)
     
     result = extract_text_from_pdf("test.pdf")
     
@@ -141,7 +141,7 @@ def test_pdf_reader_empty_pages(monkeypatch):
         def __init__(self, path):
             self.pages = [MockPage(), MockPage()]
     
-    monkeypatch.setattr("app.utils.pdf_reader.PdfReader", MockPdfReader)
+    monkeypatch.setattr("app.utils.pdf_reader.pypdf.PdfReader", MockPdfReader)
     
     result = extract_text_from_pdf("test.pdf")
     
@@ -167,9 +167,73 @@ def test_pdf_reader_mixed_content(monkeypatch):
                 MockPage("Page 3 content")
             ]
     
-    monkeypatch.setattr("app.utils.pdf_reader.PdfReader", MockPdfReader)
+    monkeypatch.setattr("app.utils.pdf_reader.pypdf.PdfReader", MockPdfReader)
     
     result = extract_text_from_pdf("test.pdf")
     
     assert "Page 1 content" in result
     assert "Page 3 content" in result
+
+
+def test_truncate_embedding_renormalizes():
+    """Test that truncated embeddings keep the leading dims at unit length"""
+    from app.utils.vectors import truncate_embedding
+
+    result = truncate_embedding([3.0, 4.0, 12.0, 1.0], 2)
+
+    assert result == pytest.approx([0.6, 0.8])
+
+
+def test_truncate_embedding_full_dimension_unchanged():
+    """Test that an embedding is untouched when no truncation is needed"""
+    from app.utils.vectors import truncate_embedding
+
+    embedding = [0.1] * 1024
+
+    assert truncate_embedding(embedding, 1024) is embedding
+
+
+def test_embedding_dims_benchmark_reports_recall():
+    """Test the Matryoshka benchmark on the bundled chunk embeddings"""
+    from benchmarks.embedding_dims import load_embeddings, run
+
+    report = run(load_embeddings(), [256, 1024], k=3, repeat=1)
+
+    assert [row["dim"] for row in report] == [256, 1024]
+    assert report[-1]["recall_at_k"] == 1.0
+    assert 0 < report[0]["recall_at_k"] <= 1.0
+
+
+def test_chunk_codec_zlib_roundtrip():
+    """Test that compressed chunk text decodes back to the original"""
+    from app.utils.chunk_codec import encode_chunk_text, decode_chunk_text, chunk_preview
+
+    text = "GlideCloud builds vector search. " * 100
+    fields = encode_chunk_text(text, codec="zlib")
+
+    assert "text" not in fields
+    assert len(fields["text_z"]) < len(text)
+    assert fields["preview"] == text[:400]
+    assert decode_chunk_text(fields) == text
+    assert chunk_preview(fields) == text[:400]
+
+
+def test_chunk_codec_uncompressed_and_legacy_documents():
+    """Test plain storage, which stores no separate preview, and chunks stored before previews existed"""
+    from app.utils.chunk_codec import encode_chunk_text, decode_chunk_text, chunk_preview
+
+    fields = encode_chunk_text("short text", codec="none")
+    assert fields == {"text": "short text"}
+    assert chunk_preview(fields) == "short text"
+
+    legacy = {"text": "B" * 500}
+    assert decode_chunk_text(legacy) == "B" * 500
+    assert chunk_preview(legacy) == "B" * 400
+
+
+def test_chunk_codec_rejects_unknown_codec():
+    """Test that an unknown codec is reported"""
+    from app.utils.chunk_codec import encode_chunk_text
+
+    with pytest.raises(ValueError):
+        encode_chunk_text("text", codec="lz4")
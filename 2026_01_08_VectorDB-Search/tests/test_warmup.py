@@ -0,0 +1,87 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+
+
+def test_embedding_passes_keep_alive(monkeypatch):
+    """Test that embedding calls carry the configured keep_alive"""
+    from app.core.ollam_client import get_embedding
+
+    called_with = {}
+
+    def mock_embeddings(model, input, keep_alive=None):
+        called_with.update(input=input, keep_alive=keep_alive)
+        return {"embeddings": [[0.1] * 1024]}
+
+    monkeypatch.setattr("app.core.ollam_client.ollama.embed", mock_embeddings)
+
+    get_embedding("test")
+
+    # Single texts go through /api/embed like batches do
+    assert called_with["input"] == ["test"]
+    assert called_with["keep_alive"] == settings.OLLAMA_KEEP_ALIVE
+
+
+def test_generate_passes_keep_alive(monkeypatch):
+    """Test that generation calls carry the configured keep_alive"""
+    from app.core.ollam_client import generate_answer
+
+    called_with = {}
+
+    def mock_generate(model, prompt, options=None, keep_alive=None):
+        called_with["keep_alive"] = keep_alive
+        return {"response": "ok"}
+
+    monkeypatch.setattr("app.core.ollam_client.ollama.generate", mock_generate)
+
+    generate_answer("context", "question")
+
+    assert called_with["keep_alive"] == settings.OLLAMA_KEEP_ALIVE
+
+
+def test_preload_models_loads_both_models(monkeypatch):
+    """Test that preloading touches the embedding and the LLM model"""
+    from app.core.ollam_client import preload_models, EMBED_MODEL, LLM_MODEL
+
+    loaded = []
+
+    monkeypatch.setattr(
+        "app.core.ollam_client.ollama.embed",
+        lambda model, input, keep_alive=None: loaded.append(model)
+    )
+    monkeypatch.setattr(
+        "app.core.ollam_client.ollama.generate",
+        lambda model, prompt, keep_alive=None: loaded.append(model)
+    )
+
+    preload_models()
+
+    assert loaded == [EMBED_MODEL, LLM_MODEL]
+
+
+def test_warm_up_models_tolerates_ollama_errors(monkeypatch):
+    """Test that a failing warm-up does not raise"""
+    def failing_preload():
+        raise ConnectionError("Ollama is not running")
+
+    monkeypatch.setattr("app.core.warmup.preload_models", failing_preload)
+
+    from app.core.warmup import warm_up_models
+
+    assert asyncio.run(warm_up_models()) is False
+
+
+def test_lifespan_warms_models_and_stops_keep_warm(monkeypatch):
+    """Test that startup warms the models and shutdown stops the keep-warm task"""
+    from app.main import app
+
+    calls = []
+
+    monkeypatch.setattr("app.main.ensure_indexes", lambda: "unchanged")
+    monkeypatch.setattr("app.main.load_profiles", lambda: None)
+    monkeypatch.setattr("app.core.warmup.preload_models", lambda: calls.append("warm"))
+
+    with TestClient(app):
+        assert calls == ["warm"]
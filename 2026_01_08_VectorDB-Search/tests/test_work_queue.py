@@ -0,0 +1,189 @@
+import threading
+from datetime import timedelta
+import pytest
+
+from app.core.config import settings
+from app.services import work_queue
+
+
+def matches(doc, query):
+    for key, condition in query.items():
+        value = doc.get(key)
+        if isinstance(condition, dict):
+            if "$in" in condition and value not in condition["$in"]:
+                return False
+            if "$lt" in condition and not value < condition["$lt"]:
+                return False
+            if "$lte" in condition and not value <= condition["$lte"]:
+                return False
+            if "$gte" in condition and not value >= condition["$gte"]:
+                return False
+        elif isinstance(value, list):
+            if condition not in value:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class Result:
+    def __init__(self, modified_count):
+        self.modified_count = modified_count
+
+
+class FakeJobs:
+    def __init__(self):
+        self.docs = {}
+        self._lock = threading.Lock()
+
+    def insert_one(self, doc):
+        self.docs[doc["_id"]] = dict(doc)
+
+    def insert_many(self, docs):
+        for doc in docs:
+            self.insert_one(doc)
+
+    def _apply(self, doc, update):
+        doc.update(update.get("$set", {}))
+        for key, value in update.get("$inc", {}).items():
+            doc[key] = doc.get(key, 0) + value
+        for key in update.get("$unset", {}):
+            doc.pop(key, None)
+
+    def find_one_and_update(self, query, update, sort=None, return_document=None):
+        with self._lock:
+            found = [d for d in self.docs.values() if matches(d, query)]
+            if not found:
+                return None
+            key, _ = sort[0]
+            doc = min(found, key=lambda d: d[key])
+            self._apply(doc, update)
+            return dict(doc)
+
+    def update_one(self, query, update):
+        return self.update_many(query, update, limit=1)
+
+    def update_many(self, query, update, limit=None):
+        with self._lock:
+            found = [d for d in self.docs.values() if matches(d, query)][:limit]
+            for doc in found:
+                self._apply(doc, update)
+            return Result(len(found))
+
+    def aggregate(self, pipeline):
+        counts = {}
+        for doc in self.docs.values():
+            if matches(doc, pipeline[0]["$match"]):
+                counts[doc["status"]] = counts.get(doc["status"], 0) + 1
+        return [{"_id": status, "count": count} for status, count in counts.items()]
+
+
+@pytest.fixture
+def jobs(monkeypatch):
+    jobs = FakeJobs()
+    monkeypatch.setattr(work_queue, "jobs_collection", jobs)
+    monkeypatch.setattr(settings, "BULK_EMBED_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "JOB_RETRY_BACKOFF", 0.0)
+    return jobs
+
+
+def age(jobs, seconds):
+    """Move every job's visibility into the past, as if time had passed"""
+    for doc in jobs.docs.values():
+        doc["visible_at"] -= timedelta(seconds=seconds)
+
+
+def test_enqueue_splits_chunks_into_jobs(jobs):
+    """Test that a document's chunks are queued as batch-sized jobs"""
+    assert work_queue.enqueue_chunks("doc", ["a", "b", "c"]) == 2
+
+    sizes = sorted(len(job["items"]) for job in jobs.docs.values())
+    assert sizes == [1, 2]
+    assert work_queue.queue_status("doc")["queued"] == 2
+
+
+def test_leased_job_is_hidden_until_visibility_timeout(jobs):
+    """Test that a leased job is invisible to others until its lease expires"""
+    work_queue.enqueue_chunks("doc", ["a"])
+
+    first = work_queue.lease_job("w1", visibility_timeout=60)
+    assert first["worker"] == "w1" and first["attempts"] == 1
+    assert work_queue.lease_job("w2", visibility_timeout=60) is None
+
+    age(jobs, 120)
+    second = work_queue.lease_job("w2", visibility_timeout=60)
+    assert second["_id"] == first["_id"] and second["attempts"] == 2
+
+    # The first worker lost its lease, so its late completion is ignored
+    work_queue.complete_job(first, "w1")
+    assert jobs.docs[first["_id"]]["status"] == "leased"
+
+    work_queue.complete_job(second, "w2")
+    assert jobs.docs[first["_id"]]["status"] == "done"
+    assert "items" not in jobs.docs[first["_id"]]
+
+
+def test_failed_job_is_retried_then_marked_failed(jobs, monkeypatch):
+    """Test that failures are retried up to JOB_MAX_ATTEMPTS"""
+    monkeypatch.setattr(settings, "JOB_MAX_ATTEMPTS", 2)
+    work_queue.enqueue_chunks("doc", ["a"])
+
+    def broken(job):
+        raise RuntimeError("ollama down")
+
+    monkeypatch.setattr(work_queue, "process_job", broken)
+
+    assert work_queue.run_job(work_queue.lease_job("w1"), "w1") is False
+    job = next(iter(jobs.docs.values()))
+    assert job["status"] == "queued" and job["error"] == "ollama down"
+
+    assert work_queue.run_job(work_queue.lease_job("w1"), "w1") is False
+    assert job["status"] == "failed"
+    assert work_queue.lease_job("w1") is None
+
+
+def test_expired_final_lease_is_marked_failed(jobs, monkeypatch):
+    """Test that a job whose last allowed lease expires ends up failed"""
+    monkeypatch.setattr(settings, "JOB_MAX_ATTEMPTS", 1)
+    work_queue.enqueue_chunks("doc", ["a"])
+    work_queue.lease_job("w1", visibility_timeout=60)
+
+    age(jobs, 120)
+    assert work_queue.fail_expired_jobs() == 1
+    assert work_queue.queue_status()["failed"] == 1
+
+
+def test_worker_drains_queue_with_idempotent_upserts(jobs, monkeypatch):
+    """Test that a worker embeds every job and upserts chunks by (doc_id, chunk_index)"""
+    writes = []
+    monkeypatch.setattr(work_queue, "get_embeddings", lambda texts, profile=None: [[0.1] * 1024 for _ in texts])
+    monkeypatch.setattr(
+        "app.db.mongodb.chunks_collection.bulk_write",
+        lambda requests, ordered=True: writes.extend(requests)
+    )
+
+    work_queue.enqueue_chunks("doc", ["a", "b", "c"])
+    assert work_queue.run_worker("w1", exit_when_idle=True) == 2
+
+    assert work_queue.queue_status()["done"] == 2
+    assert sorted(w._filter["chunk_index"] for w in writes) == [0, 1, 2]
+    assert all(w._upsert for w in writes)
+
+
+def test_api_only_enqueues_when_queue_enabled(client, jobs, monkeypatch):
+    """Test that /documents queues chunks instead of embedding them with INGEST_QUEUE"""
+    monkeypatch.setattr(settings, "INGEST_QUEUE", True)
+
+    def no_embedding(*args, **kwargs):
+        raise AssertionError("the API must not embed when queueing")
+
+    monkeypatch.setattr("app.services.ingestion_service.get_embedding", no_embedding)
+
+    response = client.post("/documents", json={"text": "Queued text " * 10})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["jobs"] == len(jobs.docs) >= 1
+
+    status = client.get("/jobs", params={"doc_id": data["doc_id"]}).json()
+    assert status["jobs"]["queued"] == data["jobs"]